@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Stub `regolancer` binary for benchmarks.
+
+Reads the generated --config, sleeps for a configurable latency and
+exits 0 with the configured probability. Successful runs append a
+row to the config's `stat` CSV and every run rewrites
+`node_cache_filename`, like the real binary does.
+
+Env:
+  FAKE_REGOLANCER_LATENCY       mean run time in seconds (default 1.0)
+  FAKE_REGOLANCER_JITTER        +/- uniform jitter in seconds (default 0)
+  FAKE_REGOLANCER_SUCCESS_RATE  probability of success (default 0.3)
+  FAKE_REGOLANCER_RUNS_LOG      optional file, one line appended per run
+  FAKE_REGOLANCER_IGNORE_TIMEOUT  when true, ignore timeout_rebalance
+                                  (to exercise the orchestrator's watchdog)
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--config", required=True)
+    args, _ = parser.parse_known_args()
+
+    with open(args.config) as f:
+        cfg = json.load(f)
+
+    latency = float(os.getenv("FAKE_REGOLANCER_LATENCY", "1.0"))
+    jitter = float(os.getenv("FAKE_REGOLANCER_JITTER", "0"))
+    success_rate = float(os.getenv("FAKE_REGOLANCER_SUCCESS_RATE", "0.3"))
+    runs_log = os.getenv("FAKE_REGOLANCER_RUNS_LOG")
+    ignore_timeout = os.getenv("FAKE_REGOLANCER_IGNORE_TIMEOUT", "false").lower() == "true"
+
+    started = time.time()
+    duration = max(0.0, latency + random.uniform(-jitter, jitter))
+    timed_out = False
+
+    timeout = cfg.get("timeout_rebalance")
+    if timeout and not ignore_timeout and duration > timeout:
+        duration = float(timeout)
+        timed_out = True
+
+    time.sleep(duration)
+    ok = not timed_out and random.random() < success_rate
+
+    src = (cfg.get("from") or ["?"])[0]
+    tgt = (cfg.get("to") or ["?"])[0]
+    amount = int(cfg.get("amount") or 0)
+
+    if ok and cfg.get("stat"):
+        fee_msat = amount * random.randint(0, 500) // 1000
+        with open(cfg["stat"], "a") as f:
+            f.write(f"{int(time.time())},{src},{tgt},{amount * 1000},{fee_msat}\n")
+
+    cache = cfg.get("node_cache_filename")
+    if cache:
+        try:
+            with open(cache) as f:
+                nodes = f.read().splitlines()
+        except OSError:
+            nodes = []
+        nodes = sorted(set(nodes) | {src, tgt})
+        with open(cache, "w") as f:
+            f.write("\n".join(nodes) + "\n")
+
+    if runs_log:
+        with open(runs_log, "a") as f:
+            f.write(f"{started:.3f},{time.time() - started:.3f},{int(ok)},{src},{tgt},{amount}\n")
+
+    print("rebalance succeeded" if ok else "rebalance failed")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
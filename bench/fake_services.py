@@ -0,0 +1,262 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for the LNDg and LightningOS HTTP APIs.
+
+Serves synthetic data shaped like the endpoints the orchestrator,
+report.py and the LOS sync read, so throughput can be measured
+without a live node.
+"""
+
+import argparse
+import asyncio
+import random
+import threading
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List
+
+from aiohttp import web
+
+# =========================
+# SYNTHETIC DATA
+# =========================
+
+def make_channels(count: int, seed: int = 1) -> List[Dict[str, Any]]:
+    """
+    Build `count` LNDg-shaped channel records with a mix of
+    sources (AR off, high local) and targets (AR on, low local)
+    """
+    rnd = random.Random(seed)
+    channels: List[Dict[str, Any]] = []
+
+    for i in range(count):
+        capacity = rnd.choice([1_000_000, 2_000_000, 5_000_000, 10_000_000])
+        local = int(capacity * rnd.random())
+        auto_rebalance = rnd.random() < 0.5
+
+        channels.append({
+            "chan_id": str(800_000_000_000_000_000 + i),
+            "remote_pubkey": f"02{i:064x}"[:66],
+            "alias": f"peer-{i}",
+            "capacity": capacity,
+            "local_balance": local,
+            "remote_balance": capacity - local,
+            "pending_outbound": 0,
+            "is_open": True,
+            "is_active": True,
+            "auto_rebalance": auto_rebalance,
+            "ar_in_target": rnd.choice([40, 50, 60]),
+            "ar_out_target": rnd.choice([5, 20, 40]),
+            "ar_amt_target": 100_000,
+            "ar_max_cost": rnd.choice([50, 65, 90]),
+            "local_fee_rate": rnd.choice([0, 50, 200, 500, 1000]),
+            "remote_fee_rate": rnd.choice([0, 10, 100, 500]),
+        })
+
+    return channels
+
+
+def make_history(channels: List[Dict[str, Any]], count: int, days: int, seed: int = 2):
+    """
+    Build `count` LNDg rebalances, LNDg forwards and LOS attempts
+    spread over the last `days` days, newest first
+    """
+    rnd = random.Random(seed)
+    now = datetime.now(timezone.utc)
+    step = timedelta(days=days) / max(count, 1)
+
+    rebalances = []
+    forwards = []
+    attempts = []
+
+    for i in range(count):
+        ts = (now - step * i).isoformat().replace("+00:00", "Z")
+        ch_in = rnd.choice(channels)["chan_id"] if channels else "0"
+        ch_out = rnd.choice(channels)["chan_id"] if channels else "0"
+
+        rebalances.append({
+            "id": count - i,
+            "status": 2,
+            "value": rnd.randint(10_000, 500_000),
+            "requested": ts,
+            "stop": ts,
+        })
+        forwards.append({
+            "id": count - i,
+            "forward_date": ts,
+            "chan_id_in": ch_in,
+            "chan_id_out": ch_out,
+            "amt_in_msat": rnd.randint(1_000_000, 2_000_000_000),
+            "amt_out_msat": rnd.randint(1_000_000, 2_000_000_000),
+            "fee": rnd.random() * 100,
+        })
+        attempts.append({
+            "id": count - i,
+            "status": "succeeded" if rnd.random() < 0.7 else "failed",
+            "amount_sat": rnd.randint(10_000, 500_000),
+            "finished_at": ts,
+        })
+
+    return rebalances, forwards, attempts
+
+
+def make_los_channels(channels: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Mirror LNDg channels as LOS /api/rebalance/channels records
+    """
+    out = []
+
+    for ch in channels:
+        out.append({
+            "channel_id": int(ch["chan_id"]),
+            "peer_alias": ch["alias"],
+            "target_outbound_pct": 100 - ch["ar_in_target"],
+            "auto_enabled": ch["auto_rebalance"],
+            "excluded_as_source": ch["ar_out_target"] >= 100,
+            "eligible_as_target": ch["auto_rebalance"],
+            "eligible_as_source": not ch["auto_rebalance"],
+            "econ_ratio": ch["ar_max_cost"] / 100,
+            "econ_ratio_override": None,
+            "use_default_econ_ratio": True,
+        })
+
+    return out
+
+# =========================
+# HTTP APP
+# =========================
+
+def _paginate(request: web.Request, items: List[Dict[str, Any]]) -> Dict[str, Any]:
+    try:
+        limit = int(request.query.get("limit") or request.query.get("page_size") or 100)
+        offset = int(request.query.get("offset") or 0)
+    except ValueError:
+        raise web.HTTPBadRequest(text="invalid limit/offset")
+
+    limit = max(1, limit)
+    page = items[offset:offset + limit]
+
+    next_url = None
+    if offset + limit < len(items):
+        next_url = str(request.url.update_query(limit=limit, offset=offset + limit))
+
+    return {
+        "count": len(items),
+        "next": next_url,
+        "previous": None,
+        "results": page,
+    }
+
+
+def build_app(
+    channels: List[Dict[str, Any]],
+    rebalances: List[Dict[str, Any]],
+    forwards: List[Dict[str, Any]],
+    attempts: List[Dict[str, Any]],
+    econ_ratio: float = 0.9,
+) -> web.Application:
+    """
+    aiohttp app serving the LNDg and LOS endpoints on one port
+    """
+    by_id = {ch["chan_id"]: ch for ch in channels}
+    los_channels = make_los_channels(channels)
+    stats = {"requests": 0, "puts": 0}
+
+    @web.middleware
+    async def count_requests(request, handler):
+        stats["requests"] += 1
+        return await handler(request)
+
+    async def lndg_channels(request):
+        return web.json_response(_paginate(request, channels))
+
+    async def lndg_channel_update(request):
+        ch = by_id.get(request.match_info["chan_id"])
+        if ch is None:
+            raise web.HTTPNotFound()
+        ch.update(await request.json())
+        stats["puts"] += 1
+        return web.json_response(ch)
+
+    async def lndg_rebalancer(request):
+        status = request.query.get("status")
+        items = rebalances
+        if status is not None:
+            items = [rb for rb in rebalances if str(rb["status"]) == status]
+        return web.json_response(_paginate(request, items))
+
+    async def lndg_forwards(request):
+        return web.json_response(_paginate(request, forwards))
+
+    async def los_history(request):
+        return web.json_response({"attempts": attempts})
+
+    async def los_config(request):
+        return web.json_response({"econ_ratio": econ_ratio})
+
+    async def los_channels_handler(request):
+        return web.json_response({"channels": los_channels})
+
+    app = web.Application(middlewares=[count_requests])
+    app["stats"] = stats
+
+    app.router.add_get("/api/channels/", lndg_channels)
+    app.router.add_put("/api/channels/{chan_id}/", lndg_channel_update)
+    app.router.add_get("/api/rebalancer/", lndg_rebalancer)
+    app.router.add_get("/api/forwards/", lndg_forwards)
+
+    app.router.add_get("/api/rebalance/history", los_history)
+    app.router.add_get("/api/rebalance/config", los_config)
+    app.router.add_get("/api/rebalance/channels", los_channels_handler)
+
+    return app
+
+
+def start_in_thread(app: web.Application, host: str, port: int):
+    """
+    Run `app` on a private event loop in a daemon thread.
+    Returns a callable that stops the server.
+    """
+    loop = asyncio.new_event_loop()
+    runner = web.AppRunner(app, access_log=None)
+
+    loop.run_until_complete(runner.setup())
+    loop.run_until_complete(web.TCPSite(runner, host, port).start())
+
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+
+    def stop():
+        asyncio.run_coroutine_threadsafe(runner.cleanup(), loop).result(timeout=10)
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join(timeout=10)
+
+    return stop
+
+# =========================
+# MAIN
+# =========================
+
+def main():
+    parser = argparse.ArgumentParser(description="Fake LNDg/LOS API server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8889)
+    parser.add_argument("--channels", type=int, default=2000)
+    parser.add_argument("--history", type=int, default=5000)
+    parser.add_argument("--history-days", type=int, default=30)
+    args = parser.parse_args()
+
+    channels = make_channels(args.channels)
+    rebalances, forwards, attempts = make_history(channels, args.history, args.history_days)
+
+    print(f"[FAKE] {len(channels)} channels on http://{args.host}:{args.port}")
+    web.run_app(
+        build_app(channels, rebalances, forwards, attempts),
+        host=args.host,
+        port=args.port,
+        access_log=None,
+        print=None,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,274 @@
+#!/usr/bin/env python3
+"""
+Benchmark harness for orchestrator.py and report.py.
+
+Starts the fake LNDg/LOS server (or replays a recorded archive, see
+traffic.py), points the orchestrator at a scratch
+base directory with the stub regolancer, runs it for a fixed time and
+then runs report.py once. Prints pairs/hour, cycle latency, CPU time
+and RSS for both.
+
+Example:
+  python bench/run_bench.py --channels 2000 --duration 120 --workers 2
+"""
+
+import argparse
+import json
+import os
+import re
+import shutil
+import signal
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+from fake_services import build_app, make_channels, make_history, start_in_thread
+from traffic import build_replay_app, read_archive
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(BENCH_DIR)
+
+CYCLE_RE = re.compile(r"CYCLE FINISHED .*duration=(\d+)s")
+
+# =========================
+# HELPERS
+# =========================
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def proc_usage(pid: int):
+    """
+    CPU seconds (user + sys) and peak RSS in MB of a live process,
+    excluding its children
+    """
+    with open(f"/proc/{pid}/stat") as f:
+        fields = f.read().rsplit(")", 1)[1].split()
+
+    ticks = os.sysconf("SC_CLK_TCK")
+    cpu = (int(fields[11]) + int(fields[12])) / ticks
+
+    peak_kb = 0
+    with open(f"/proc/{pid}/status") as f:
+        for line in f:
+            if line.startswith("VmHWM:"):
+                peak_kb = int(line.split()[1])
+
+    return cpu, peak_kb / 1024
+
+
+def write_scratch(base_dir: str, template: dict):
+    os.makedirs(base_dir, exist_ok=True)
+
+    stub = os.path.join(base_dir, "regolancer")
+    shutil.copy(os.path.join(BENCH_DIR, "fake_regolancer.py"), stub)
+    os.chmod(stub, 0o755)
+
+    with open(os.path.join(base_dir, "config.template.json"), "w") as f:
+        json.dump(template, f, indent=2)
+
+
+def base_env(args, base_dir: str, api_url: str) -> dict:
+    env = dict(os.environ)
+    env.update({
+        "ORCHESTRATOR_BASE_DIR": base_dir,
+        "LNDG_BASE_URL": api_url,
+        "LOS_BASE_URL": api_url,
+        "LNDG_USER": "bench",
+        "LNDG_PASS": "bench",
+        "TELEGRAM_TOKEN": "",
+        "TELEGRAM_CHAT_ID": "",
+        "DRY_RUN": "false",
+        "RUN_FOREVER": "true",
+        "MAX_WORKERS": str(args.workers),
+        "MAX_CYCLE_SECONDS": str(args.max_cycle_seconds),
+        "MIN_RUN_SECONDS": str(args.min_run_seconds),
+        "SLEEP_SECONDS": str(args.sleep_seconds),
+        "REGOLANCER_LIVE_LOGS": "false",
+        "LOG_OPERATIONAL": "false",
+        "SYNC_LOS_TO_LNDG": "false",
+        "ENABLE_DAILY_REPORT": "false",
+        "SEND_REBALANCE_MSG_REGO_ORCH": "false",
+        "SEND_REBALANCE_MSG_LNDG": "false",
+        "SEND_REBALANCE_MSG_LOS": "false",
+        "FAKE_REGOLANCER_LATENCY": str(args.latency),
+        "FAKE_REGOLANCER_JITTER": str(args.jitter),
+        "FAKE_REGOLANCER_SUCCESS_RATE": str(args.success_rate),
+        "FAKE_REGOLANCER_RUNS_LOG": os.path.join(base_dir, "runs.log"),
+    })
+    return env
+
+# =========================
+# BENCHMARKS
+# =========================
+
+def bench_orchestrator(args, base_dir: str, env: dict) -> dict:
+    proc = subprocess.Popen(
+        [sys.executable, "-u", os.path.join(REPO_DIR, "orchestrator.py")],
+        cwd=base_dir,
+        env=env,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+        text=True,
+    )
+
+    cycles = []
+
+    def reader():
+        for line in proc.stdout:
+            m = CYCLE_RE.search(line)
+            if m:
+                cycles.append(int(m.group(1)))
+            if args.verbose:
+                print(f"  | {line.rstrip()}")
+
+    t = threading.Thread(target=reader, daemon=True)
+    t.start()
+
+    started = time.monotonic()
+    time.sleep(args.duration)
+    elapsed = time.monotonic() - started
+
+    if proc.poll() is not None:
+        raise RuntimeError(f"orchestrator.py exited early with code {proc.returncode}")
+
+    cpu, peak_rss = proc_usage(proc.pid)
+
+    proc.send_signal(signal.SIGTERM)
+    try:
+        proc.wait(timeout=30)
+    except subprocess.TimeoutExpired:
+        proc.kill()
+        proc.wait()
+    t.join(timeout=5)
+
+    runs = ok = 0
+    runs_log = env["FAKE_REGOLANCER_RUNS_LOG"]
+    if os.path.exists(runs_log):
+        with open(runs_log) as f:
+            for line in f:
+                runs += 1
+                ok += line.split(",")[2] == "1"
+
+    return {
+        "elapsed_s": round(elapsed, 1),
+        "pairs_run": runs,
+        "pairs_per_hour": round(runs * 3600 / elapsed, 1),
+        "successes": ok,
+        "cycles": len(cycles),
+        "cycle_p50_s": statistics.median(cycles) if cycles else None,
+        "cycle_max_s": max(cycles) if cycles else None,
+        "cpu_s": round(cpu, 2),
+        "cpu_pct": round(cpu * 100 / elapsed, 1),
+        "peak_rss_mb": round(peak_rss, 1),
+    }
+
+
+def bench_report(base_dir: str, env: dict) -> dict:
+    started = time.monotonic()
+
+    # stderr num arquivo: um pipe cheio travaria o report antes do wait4
+    with tempfile.TemporaryFile() as err:
+        proc = subprocess.Popen(
+            [sys.executable, os.path.join(REPO_DIR, "report.py")],
+            cwd=base_dir,
+            env=env,
+            stdout=subprocess.DEVNULL,
+            stderr=err,
+        )
+        _, status, usage = os.wait4(proc.pid, 0)
+        proc.returncode = os.waitstatus_to_exitcode(status)
+        elapsed = time.monotonic() - started
+
+        if proc.returncode != 0:
+            err.seek(0)
+            raise RuntimeError(f"report.py failed: {err.read().decode(errors='replace')[-500:]}")
+
+    return {
+        "elapsed_s": round(elapsed, 2),
+        "cpu_s": round(usage.ru_utime + usage.ru_stime, 2),
+        "peak_rss_mb": round(usage.ru_maxrss / 1024, 1),
+    }
+
+# =========================
+# MAIN
+# =========================
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark orchestrator.py and report.py")
+    parser.add_argument("--channels", type=int, default=2000)
+    parser.add_argument("--history", type=int, default=5000, help="rebalances/forwards served")
+    parser.add_argument("--history-days", type=int, default=30)
+    parser.add_argument("--duration", type=float, default=60, help="orchestrator run time (s)")
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--max-cycle-seconds", type=int, default=30)
+    parser.add_argument("--min-run-seconds", type=int, default=1,
+                        help="floor for the expected run (stub runs take ~--latency)")
+    parser.add_argument("--sleep-seconds", type=int, default=1)
+    parser.add_argument("--latency", type=float, default=0.5, help="stub regolancer latency (s)")
+    parser.add_argument("--jitter", type=float, default=0.2)
+    parser.add_argument("--success-rate", type=float, default=0.3)
+    parser.add_argument("--archive", help="serve a bench/traffic.py archive instead of synthetic data")
+    parser.add_argument("--timing", choices=("fast", "original"), default="fast",
+                        help="archive replay: recorded upstream latency or none")
+    parser.add_argument("--skip-report", action="store_true")
+    parser.add_argument("--keep", action="store_true", help="keep the scratch directory")
+    parser.add_argument("--verbose", action="store_true")
+    args = parser.parse_args()
+
+    port = free_port()
+    api_url = f"http://127.0.0.1:{port}"
+
+    if args.archive:
+        _, records = read_archive(args.archive)
+        app = build_replay_app(records, args.timing)
+        source = f"{len(records)} archived responses ({args.timing})"
+    else:
+        channels = make_channels(args.channels)
+        rebalances, forwards, attempts = make_history(channels, args.history, args.history_days)
+        app = build_app(channels, rebalances, forwards, attempts)
+        source = f"{args.channels} channels"
+    stop_server = start_in_thread(app, "127.0.0.1", port)
+
+    base_dir = tempfile.mkdtemp(prefix="rego-bench-")
+    template = {
+        "econ_ratio": 0.9,
+        "amount": 50000,
+        "min_amount": 5000,
+        "stat": os.path.join(base_dir, "success-rebal.csv"),
+        "node_cache_filename": os.path.join(base_dir, "cache.dat"),
+        "from": [],
+        "to": [],
+        "timeout_rebalance": 900,
+        "timeout_attempt": 60,
+        "timeout_info": 30,
+        "timeout_route": 180,
+    }
+
+    try:
+        write_scratch(base_dir, template)
+        env = base_env(args, base_dir, api_url)
+
+        print(f"[BENCH] {source}, {args.workers} workers, {args.duration}s → {base_dir}")
+
+        results = {"orchestrator": bench_orchestrator(args, base_dir, env)}
+        if not args.skip_report:
+            results["report"] = bench_report(base_dir, env)
+        results["api_requests"] = app["stats"]["requests"]
+
+        print(json.dumps(results, indent=2))
+    finally:
+        stop_server()
+        if not args.keep:
+            shutil.rmtree(base_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
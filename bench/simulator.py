@@ -0,0 +1,542 @@
+#!/usr/bin/env python3
+"""
+Discrete-event simulator for orchestrator scheduling policies.
+
+Replays the worker loop (amount ladder, build_pairs, pair ordering,
+MAX_CYCLE_SECONDS, MAX_WORKERS) on a virtual clock against a simple
+liquidity/success model instead of LND, so policies can be compared
+on sats moved per hour over weeks of simulated time in seconds.
+
+Comma-separated values run every combination:
+  python bench/simulator.py --days 14 --workers 1,2,4 --order random,fixed \
+      --ladder 15000:200:1:2,50000:0:1:0
+"""
+
+import argparse
+import heapq
+import itertools
+import json
+import math
+import os
+import random
+import sys
+from dataclasses import dataclass
+from typing import Any, Dict, List
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+
+from fake_services import make_channels  # noqa: E402
+from lndg_api import normalize_channels  # noqa: E402
+from models import Channel  # noqa: E402
+from logic import (  # noqa: E402
+    advance_amount_state, amount_for_state, econ_runs_saved, economically_feasible, iter_pairs,
+    valid_target, expected_run, update_run_estimate, RUN_ESTIMATE_RELAX,
+)
+from fairness import TargetFairness  # noqa: E402
+from pair_selector import PairSelector  # noqa: E402
+from liquidity import LiquidityProjection  # noqa: E402
+from concurrency import AIMDController  # noqa: E402
+from latency import LatencyHistograms  # noqa: E402
+
+# =========================
+# POLICY
+# =========================
+
+@dataclass
+class Policy:
+    workers: int = 2
+    order: str = "random"
+    econ: str = "off"
+    projection: str = "off"
+    concurrency: str = "fixed"
+    timeouts: str = "static"
+    max_cycle_seconds: int = 300
+    min_run_seconds: int = 20
+    sleep_seconds: int = 15
+    amount_initial: int = 15000
+    amount_increase_percent: float = 200
+    amount_every_rounds: int = 1
+    amount_max_increases: int = 2
+    timeout_rebalance: int = 900
+
+    def label(self) -> str:
+        return (
+            f"workers={self.workers} order={self.order} econ={self.econ} "
+            f"projection={self.projection} concurrency={self.concurrency} "
+            f"timeouts={self.timeouts} "
+            f"cycle={self.max_cycle_seconds}s min_run={self.min_run_seconds}s "
+            f"ladder={self.amount_initial}:{self.amount_increase_percent:g}:"
+            f"{self.amount_every_rounds}:{self.amount_max_increases}"
+        )
+
+
+def order_fixed(channels, rnd, **kwargs):
+    return iter_pairs(channels, **kwargs)
+
+
+def order_random(channels, rnd, **kwargs):
+    return iter_pairs(channels, rnd, **kwargs)
+
+
+def order_fair(channels, rnd, **kwargs):
+    return iter_pairs(channels, rnd, **kwargs)
+
+
+def order_learned(channels, rnd, selector=None, limit=1000, **kwargs):
+    target_ok = kwargs.get("target_ok")
+    last = None
+    if target_ok is not None and kwargs.get("defer"):
+        last = lambda pair: not target_ok(pair.target)  # noqa: E731
+    # mesmo limite padrão do orchestrator (PAIR_SELECTOR_MAX_RANKED)
+    return selector.rank(iter_pairs(channels, rnd, **kwargs), last=last, limit=limit)
+
+
+ORDERINGS = {
+    "fixed": order_fixed,
+    "random": order_random,
+    "fair": order_fair,
+    "thompson": order_learned,
+    "ucb": order_learned,
+}
+
+ECON_MODES = ("off", "drop", "rank")
+
+# =========================
+# LIQUIDITY MODEL
+# =========================
+
+class LiquidityModel:
+    """
+    Mutable channel balances plus a per-pair route quality.
+
+    A run succeeds with probability
+        base * quality(src, tgt) * exp(-amount / liquidity_scale)
+    when the source can spare `amount` above its out target and the
+    target has room below its in target. Successful runs move the
+    liquidity; forwarding drift drains targets into sources over time.
+
+    `contention` models runs fighting over LND: with k runs in flight,
+    success probability is scaled by exp(-contention * (k - 1)) and
+    success latency by 1 + contention * (k - 1).
+    """
+
+    def __init__(self, raw_channels, rnd, base_success=0.6, liquidity_scale=400_000,
+                 success_latency=40.0, timeout_rebalance=900, drain_pct_per_hour=0.5,
+                 econ_ratio=0.9, contention=0.0):
+        self.raw = [dict(ch) for ch in raw_channels]
+        self.by_id = {str(ch["chan_id"]): ch for ch in self.raw}
+        self.rnd = rnd
+        self.base_success = base_success
+        self.liquidity_scale = liquidity_scale
+        self.success_latency = success_latency
+        self.timeout_rebalance = timeout_rebalance
+        self.drain_pct_per_hour = drain_pct_per_hour
+        self.econ_ratio = econ_ratio
+        self.contention = contention
+        self._quality: Dict[Any, float] = {}
+        self._last_drift = 0.0
+
+    def quality(self, src_id, tgt_id) -> float:
+        key = (src_id, tgt_id)
+        q = self._quality.get(key)
+        if q is None:
+            q = self.rnd.betavariate(2, 3)
+            self._quality[key] = q
+        return q
+
+    def drift(self, now: float):
+        hours = (now - self._last_drift) / 3600
+        self._last_drift = now
+        if hours <= 0:
+            return
+
+        for ch in self.raw:
+            cap = int(ch["capacity"])
+            delta = int(cap * self.drain_pct_per_hour / 100 * hours)
+            local = int(ch["local_balance"])
+            if ch.get("auto_rebalance"):
+                ch["local_balance"] = max(0, local - delta)
+            else:
+                ch["local_balance"] = min(cap, local + delta)
+
+    def snapshot(self, now: float) -> List[Channel]:
+        self.drift(now)
+        return normalize_channels(self.raw)
+
+    def attempt(self, pair, amount, inflight=1, timeout=None, budget=None):
+        """
+        Decide outcome and duration of a run at its start. With a
+        `timeout` below timeout_rebalance, runs that would take longer
+        fail at the timeout. `budget` (what is left of the cycle) cuts
+        any run at that point, like the orchestrator's watchdog.
+        """
+        limit = min(timeout or self.timeout_rebalance, budget or math.inf)
+        crowd = self.contention * max(inflight - 1, 0)
+        src = self.by_id[pair.source.chan_id]
+        tgt = self.by_id[pair.target.chan_id]
+
+        src_floor = int(src["capacity"]) * (100 - pair.pfrom) // 100
+        tgt_ceiling = int(tgt["capacity"]) * pair.pto // 100
+        feasible = (
+            int(src["local_balance"]) - amount >= src_floor and
+            int(tgt["local_balance"]) + amount <= tgt_ceiling and
+            economically_feasible(pair.target, self.econ_ratio)
+        )
+
+        p = 0.0
+        if feasible:
+            q = self.quality(pair.source.chan_id, pair.target.chan_id)
+            p = self.base_success * q * math.exp(-amount / self.liquidity_scale - crowd)
+
+        if self.rnd.random() < p:
+            duration = self.rnd.expovariate(1 / (self.success_latency * (1 + crowd)))
+            if duration > limit:
+                return False, limit
+            return True, duration
+
+        return False, min(self.rnd.uniform(0.2, 1.0) * (timeout or self.timeout_rebalance), limit)
+
+    def apply(self, pair, amount):
+        src = self.by_id[pair.source.chan_id]
+        tgt = self.by_id[pair.target.chan_id]
+        moved = min(amount, int(src["local_balance"]), int(tgt["capacity"]) - int(tgt["local_balance"]))
+        src["local_balance"] = int(src["local_balance"]) - moved
+        tgt["local_balance"] = int(tgt["local_balance"]) + moved
+        return moved
+
+# =========================
+# SIMULATION
+# =========================
+
+class Simulation:
+    def __init__(self, policy: Policy, model: LiquidityModel, rnd: random.Random):
+        self.policy = policy
+        self.model = model
+        self.rnd = rnd
+        self.now = 0.0
+        self.amount_state = {"cycle": 0, "increase": 0}
+        # acompanha espera por alvo em toda ordem; só "fair" ordena por ela
+        self.fairness = TargetFairness(clock=lambda: self.now)
+        self.projection = LiquidityProjection(clock=lambda: self.now)
+        self.inflight = 0
+        self.run_estimate = None  # EWMA de sucessos, como ctx.run_estimate
+        self.concurrency = None
+        if policy.concurrency == "aimd":
+            self.concurrency = AIMDController(1, policy.workers)
+        # registra sempre; só "tuned" usa (defaults do .env.example)
+        self.latency = LatencyHistograms(clock=lambda: self.now)
+        self.selector = None
+        if policy.order in ("thompson", "ucb"):
+            self.selector = PairSelector(
+                policy.order,
+                prior_seconds=model.success_latency,
+                rnd=rnd,
+                clock=lambda: self.now,
+            )
+        self.stats = {
+            "runs": 0,
+            "successes": 0,
+            "sats_moved": 0,
+            "runtime_s": 0.0,
+            "cycles": 0,
+            "cycle_timeouts": 0,
+            "empty_cycles": 0,
+            "econ_runs_saved": 0,
+            "projection_skips": 0,
+            "tuned_runs": 0,
+            "limit_seconds": 0.0,  # ∫ limite dt, p/ a média
+        }
+        self._limit_since = 0.0
+
+    def next_amount(self) -> int:
+        p = self.policy
+        advance_amount_state(self.amount_state, p.amount_every_rounds, p.amount_max_increases)
+        return amount_for_state(self.amount_state, p.amount_initial, p.amount_increase_percent)
+
+    def worker(self, wid: int):
+        """
+        Generator mirroring orchestrator.worker_loop; yields virtual delays
+        """
+        p = self.policy
+        order = ORDERINGS[p.order]
+        target_ok = None
+        if p.econ != "off":
+            target_ok = lambda t: economically_feasible(t, self.model.econ_ratio)  # noqa: E731
+
+        while True:
+            if self.parked(wid):
+                yield p.sleep_seconds
+                continue
+
+            cycle_start = self.now
+            deadline = cycle_start + p.max_cycle_seconds
+            amount = self.next_amount()
+            pair_stats = {}
+            channels = self.model.snapshot(self.now)
+            snapshot_at = self.now
+            self.projection.reconcile(channels, snapshot_at)
+            extra = {}
+            self.fairness.workers = self.concurrency.limit if self.concurrency is not None else p.workers
+            if p.order == "fair":
+                extra["fairness"] = self.fairness
+            else:
+                self.fairness.start_cycle([
+                    c for c in channels
+                    if valid_target(c) and (target_ok is None or target_ok(c))
+                ])
+            if self.selector is not None:
+                extra["selector"] = self.selector
+            pairs = order(
+                channels,
+                self.rnd,
+                target_ok=target_ok,
+                defer=p.econ == "rank",
+                stats=pair_stats,
+                **extra,
+            )
+            tried = False
+            ran_rejected = 0
+            runs = 0
+            completed = True
+
+            for pair in pairs:
+                if self.parked(wid):
+                    break
+                tried = True
+
+                if p.projection == "on" and not self.projection.eligible(pair, snapshot_at):
+                    self.stats["projection_skips"] += 1
+                    continue
+
+                # run não cabe no que resta do ciclo (orchestrator.worker_loop)
+                remaining = deadline - self.now
+                if remaining < expected_run(self.run_estimate, p.min_run_seconds, p.max_cycle_seconds):
+                    self.stats["cycle_timeouts"] += 1
+                    if runs == 0 and self.run_estimate is not None:
+                        self.run_estimate *= RUN_ESTIMATE_RELAX
+                    completed = False
+                    break
+
+                if target_ok is not None and not target_ok(pair.target):
+                    ran_rejected += 1
+
+                self.inflight += 1
+                ok, duration = self.model.attempt(
+                    pair, amount, self.inflight, self.timeout_for(pair), max(1.0, remaining),
+                )
+                runs += 1
+                yield duration
+                self.inflight -= 1
+                if self.concurrency is not None:
+                    self.note_limit()
+                    self.concurrency.record(ok, duration)
+                self.fairness.charge(pair.target.chan_id, duration)
+
+                self.stats["runs"] += 1
+                self.stats["runtime_s"] += duration
+                moved = 0
+                if ok:
+                    moved = self.model.apply(pair, amount)
+                    self.projection.record(pair, moved)
+                    self.stats["successes"] += 1
+                    self.stats["sats_moved"] += moved
+                    self.latency.record(pair.source.chan_id, pair.target.chan_id, duration)
+                    self.run_estimate = update_run_estimate(self.run_estimate, duration)
+                if self.selector is not None:
+                    self.selector.record(pair.source.chan_id, pair.target.chan_id, ok, duration, moved)
+
+            if not tried:
+                self.stats["empty_cycles"] += 1
+
+            self.stats["econ_runs_saved"] += econ_runs_saved(pair_stats, runs, ran_rejected, completed)
+
+            self.stats["cycles"] += 1
+            yield p.sleep_seconds
+
+    def timeout_for(self, pair):
+        """
+        Mirror of orchestrator.tuned_timeout (p95 + 30s, ≥ 60s, 5 samples,
+        5% exploration)
+        """
+        if self.policy.timeouts != "tuned" or self.rnd.random() < 0.05:
+            return None
+        found = self.latency.timeout(pair.source.chan_id, pair.target.chan_id, q=0.95, min_samples=5)
+        if found is None:
+            return None
+        tuned = max(60.0, found[0] + 30)
+        if tuned >= self.policy.timeout_rebalance:
+            return None
+        self.stats["tuned_runs"] += 1
+        return tuned
+
+    def parked(self, wid: int) -> bool:
+        return self.concurrency is not None and wid > self.concurrency.limit
+
+    def note_limit(self):
+        # integra o limite vigente até agora
+        self.stats["limit_seconds"] += self.concurrency.limit * (self.now - self._limit_since)
+        self._limit_since = self.now
+
+    def run(self, seconds: float) -> Dict[str, Any]:
+        queue = []
+        seq = itertools.count()
+
+        for wid in range(1, self.policy.workers + 1):
+            heapq.heappush(queue, (0.0, next(seq), self.worker(wid)))
+
+        while queue:
+            t, _, proc = heapq.heappop(queue)
+            if t > seconds:
+                break
+            self.now = t
+            delay = next(proc)
+            heapq.heappush(queue, (t + delay, next(seq), proc))
+
+        hours = seconds / 3600
+        s = self.stats
+        avg_limit = self.policy.workers
+        if self.concurrency is not None:
+            self.now = seconds
+            self.note_limit()
+            avg_limit = round(s["limit_seconds"] / seconds, 2)
+        waits = self.fairness.waits()
+        return {
+            "policy": self.policy.label(),
+            "sats_per_hour": round(s["sats_moved"] / hours),
+            "sats_moved": s["sats_moved"],
+            "runs": s["runs"],
+            "success_rate": round(s["successes"] / s["runs"], 3) if s["runs"] else 0.0,
+            "sats_per_runtime_hour": round(s["sats_moved"] / (s["runtime_s"] / 3600)) if s["runtime_s"] else 0,
+            "cycles": s["cycles"],
+            "cycle_timeouts": s["cycle_timeouts"],
+            "empty_cycles": s["empty_cycles"],
+            "econ_runs_saved": s["econ_runs_saved"],
+            "projection_skips": s["projection_skips"],
+            "tuned_runs": s["tuned_runs"],
+            "avg_concurrency_limit": avg_limit,
+            "target_max_wait_cycles": max(
+                (max(w["max_wait_cycles"], w["cycles_waiting"]) for w in waits), default=0
+            ),
+            "targets_never_served": sum(1 for w in waits if not w["attempts"]),
+        }
+
+# =========================
+# MAIN
+# =========================
+
+def load_raw_channels(args) -> List[Dict[str, Any]]:
+    if not args.channels_file:
+        return make_channels(args.channels, seed=args.seed)
+
+    with open(args.channels_file) as f:
+        data = json.load(f)
+
+    # raw LNDg page ({"results": [...]}) or a plain list of records
+    return data.get("results", []) if isinstance(data, dict) else data
+
+
+def _csv(cast):
+    return lambda v: [cast(x) for x in v.split(",") if x]
+
+
+def _ladder(v):
+    out = []
+    for item in v.split(","):
+        initial, percent, every, max_inc = item.split(":")
+        out.append((int(initial), float(percent), int(every), int(max_inc)))
+    return out
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Simulate orchestrator policies on a virtual clock")
+    parser.add_argument("--channels", type=int, default=300, help="synthetic channel count")
+    parser.add_argument("--channels-file", help="recorded LNDg /api/channels/ JSON instead of synthetic")
+    parser.add_argument("--days", type=float, default=7)
+    parser.add_argument("--seed", type=int, default=1)
+
+    parser.add_argument("--workers", type=_csv(int), default=[2])
+    parser.add_argument("--order", type=_csv(str), default=["random"])
+    parser.add_argument("--econ", type=_csv(str), default=["off"], help="off,drop,rank")
+    parser.add_argument("--projection", type=_csv(str), default=["off"], help="off,on")
+    parser.add_argument("--concurrency", type=_csv(str), default=["fixed"],
+                        help="fixed,aimd (aimd: --workers is the upper bound)")
+    parser.add_argument("--timeouts", type=_csv(str), default=["static"], help="static,tuned")
+    parser.add_argument("--econ-ratio", type=float, default=0.9)
+    parser.add_argument("--max-cycle-seconds", type=_csv(int), default=[300])
+    parser.add_argument("--ladder", type=_ladder, default=[(15000, 200.0, 1, 2)],
+                        help="initial:percent:every:max_increases[,...]")
+    parser.add_argument("--min-run-seconds", type=int, default=20)
+    parser.add_argument("--sleep-seconds", type=int, default=15)
+    parser.add_argument("--timeout-rebalance", type=int, default=900)
+
+    parser.add_argument("--base-success", type=float, default=0.6)
+    parser.add_argument("--liquidity-scale", type=int, default=400_000)
+    parser.add_argument("--success-latency", type=float, default=40.0)
+    parser.add_argument("--drain-pct-per-hour", type=float, default=0.5)
+    parser.add_argument("--contention", type=float, default=0.0,
+                        help="success / latency penalty per extra concurrent run")
+    args = parser.parse_args()
+
+    for name in args.order:
+        if name not in ORDERINGS:
+            parser.error(f"unknown order {name!r} (choose from {', '.join(ORDERINGS)})")
+    for name in args.econ:
+        if name not in ECON_MODES:
+            parser.error(f"unknown econ mode {name!r} (choose from {', '.join(ECON_MODES)})")
+    for name in args.projection:
+        if name not in ("off", "on"):
+            parser.error(f"unknown projection mode {name!r} (choose from off, on)")
+    for name in args.concurrency:
+        if name not in ("fixed", "aimd"):
+            parser.error(f"unknown concurrency mode {name!r} (choose from fixed, aimd)")
+    for name in args.timeouts:
+        if name not in ("static", "tuned"):
+            parser.error(f"unknown timeouts mode {name!r} (choose from static, tuned)")
+
+    raw = load_raw_channels(args)
+    results = []
+
+    for workers, order, econ, projection, concurrency, timeouts, max_cycle, ladder in itertools.product(
+        args.workers, args.order, args.econ, args.projection, args.concurrency, args.timeouts,
+        args.max_cycle_seconds, args.ladder,
+    ):
+        policy = Policy(
+            workers=workers,
+            order=order,
+            econ=econ,
+            projection=projection,
+            concurrency=concurrency,
+            timeouts=timeouts,
+            max_cycle_seconds=max_cycle,
+            min_run_seconds=args.min_run_seconds,
+            sleep_seconds=args.sleep_seconds,
+            amount_initial=ladder[0],
+            amount_increase_percent=ladder[1],
+            amount_every_rounds=ladder[2],
+            amount_max_increases=ladder[3],
+            timeout_rebalance=args.timeout_rebalance,
+        )
+
+        # same seed per policy → same channels, qualities and draws
+        rnd = random.Random(args.seed)
+        model = LiquidityModel(
+            raw, rnd,
+            base_success=args.base_success,
+            liquidity_scale=args.liquidity_scale,
+            success_latency=args.success_latency,
+            timeout_rebalance=args.timeout_rebalance,
+            drain_pct_per_hour=args.drain_pct_per_hour,
+            econ_ratio=args.econ_ratio,
+            contention=args.contention,
+        )
+        result = Simulation(policy, model, rnd).run(args.days * 86400)
+        results.append(result)
+        print(f"[SIM] {result['policy']} → {result['sats_per_hour']:,} sats/h")
+
+    results.sort(key=lambda r: r["sats_per_hour"], reverse=True)
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,427 @@
+#!/usr/bin/env python3
+"""
+Record / replay of LNDg and LightningOS API traffic.
+
+record     reverse proxy in front of the real LNDg and LOS. Point
+           LNDG_BASE_URL / LOS_BASE_URL at it and every response the
+           daemon (or report.py) receives is appended to a gzip archive.
+anonymize  copy of an archive with chan ids, pubkeys, aliases and
+           hashes replaced consistently (keyed by a random secret that
+           is not stored), so it can be shared.
+replay     serves an archive on one port, in place of both APIs, at
+           full speed or with the recorded upstream latency.
+info       requests per endpoint in an archive.
+
+Example:
+  python bench/traffic.py record --lndg-url http://localhost:8889 \\
+      --los-url https://localhost:8443 --out traffic.jsonl.gz
+  python bench/traffic.py anonymize traffic.jsonl.gz shared.jsonl.gz
+  python bench/traffic.py replay shared.jsonl.gz --port 8889 --timing original
+"""
+
+import argparse
+import asyncio
+import gzip
+import hashlib
+import hmac
+import json
+import os
+import re
+import secrets
+import signal
+import threading
+import time
+from collections import Counter
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+from aiohttp import ClientSession, ClientTimeout, TCPConnector, web
+
+FORMAT_VERSION = 1
+
+# cabeçalhos que não fazem sentido repassar pelo proxy
+HOP_HEADERS = {
+    "connection", "keep-alive", "transfer-encoding", "content-length",
+    "content-encoding", "host", "upgrade",
+}
+
+# =========================
+# ARCHIVE
+# =========================
+
+class ArchiveWriter:
+    """
+    gzip JSON lines: one header, then one record per response
+    """
+
+    def __init__(self, path: str, meta: Optional[Dict[str, Any]] = None):
+        self.path = path
+        self.started = time.time()
+        self.count = 0
+
+        self._lock = threading.Lock()
+        self._f = gzip.open(path, "wt", compresslevel=6)
+        self._write({
+            "format": "traffic",
+            "version": FORMAT_VERSION,
+            "started_at": self.started,
+            **(meta or {}),
+        })
+
+    def _write(self, obj: Dict[str, Any]) -> None:
+        self._f.write(json.dumps(obj, separators=(",", ":")) + "\n")
+
+    def append(self, record: Dict[str, Any]) -> None:
+        with self._lock:
+            self._write(record)
+            self.count += 1
+            if self.count % 50 == 0:
+                self._f.flush()
+
+    def close(self) -> None:
+        with self._lock:
+            self._f.close()
+
+
+def read_archive(path: str) -> Tuple[Dict[str, Any], List[Dict[str, Any]]]:
+    """
+    (header, records). An archive whose recorder was killed keeps
+    everything up to its last flush.
+    """
+    records = []
+    with gzip.open(path, "rt") as f:
+        header = json.loads(f.readline())
+        if header.get("format") != "traffic" or header.get("version") != FORMAT_VERSION:
+            raise ValueError(f"{path}: not a traffic archive (version {FORMAT_VERSION})")
+        try:
+            for line in f:
+                records.append(json.loads(line))
+        except (EOFError, ValueError):
+            pass  # cauda truncada
+    return header, records
+
+
+def relink(body: Any, origin: str) -> Any:
+    """
+    Point DRF pagination links (`next` / `previous`) at `origin`
+    ("" → path only, as stored in the archive)
+    """
+    if not isinstance(body, dict):
+        return body
+    for key in ("next", "previous"):
+        url = body.get(key)
+        if isinstance(url, str) and url:
+            parts = urlsplit(url)
+            path = parts.path + (f"?{parts.query}" if parts.query else "")
+            body[key] = f"{origin}{path}"
+    return body
+
+# =========================
+# ANONYMIZE
+# =========================
+
+CHAN_KEYS = {
+    "chan_id", "chan_id_in", "chan_id_out", "channel_id", "chan_in", "chan_out",
+    "outgoing_chan_ids", "last_hop_chan_id", "scid", "short_channel_id",
+}
+HASH_KEYS = ("hash", "txid", "chan_point", "funding", "preimage", "payment_request", "invoice")
+
+CHAN_RE = re.compile(r"\d{15,20}")
+PUBKEY_RE = re.compile(r"\b0[23][0-9a-fA-F]{64}\b")
+
+
+class Anonymizer:
+    """
+    Consistent pseudonyms: the same chan id / pubkey / alias always maps
+    to the same replacement within one run, with the same shape (chan
+    ids stay numeric with the same digit count, pubkeys stay 66 hex), so
+    joins across endpoints and parsing still work. Balances, fees,
+    amounts and timestamps are kept: they are the data shape.
+    """
+
+    def __init__(self, secret: Optional[bytes] = None):
+        self.secret = secret or secrets.token_bytes(32)
+        self._aliases: Dict[str, str] = {}
+
+    def _digest(self, kind: str, value: str) -> bytes:
+        return hmac.new(self.secret, f"{kind}:{value}".encode(), hashlib.sha256).digest()
+
+    def chan_id(self, value: str) -> str:
+        n = len(value)
+        lo = 10 ** (n - 1)
+        x = int.from_bytes(self._digest("chan", value), "big")
+        return str(lo + x % (10 ** n - lo))
+
+    def pubkey(self, value: str) -> str:
+        return value[:2] + self._digest("pub", value.lower()).hex()
+
+    def alias(self, value: str) -> str:
+        if not value:
+            return value
+        out = self._aliases.get(value)
+        if out is None:
+            out = f"peer-{self._digest('alias', value).hex()[:8]}"
+            self._aliases[value] = out
+        return out
+
+    def opaque(self, value: str) -> str:
+        digest = b""
+        while len(digest) * 2 < len(value):
+            digest += self._digest(f"h{len(digest)}", value)
+        return digest.hex()[:len(value)]
+
+    def text(self, value: str, chan: bool = False) -> str:
+        value = PUBKEY_RE.sub(lambda m: self.pubkey(m.group()), value)
+        if chan:
+            value = CHAN_RE.sub(lambda m: self.chan_id(m.group()), value)
+        return value
+
+    def walk(self, obj: Any, key: str = "") -> Any:
+        k = key.lower()
+        if isinstance(obj, dict):
+            return {name: self.walk(v, name) for name, v in obj.items()}
+        if isinstance(obj, list):
+            return [self.walk(v, key) for v in obj]
+        if isinstance(obj, bool) or obj is None:
+            return obj
+        if isinstance(obj, int):
+            return int(self.chan_id(str(obj))) if k in CHAN_KEYS and obj > 0 else obj
+        if not isinstance(obj, str):
+            return obj
+        if k in CHAN_KEYS:
+            return self.text(obj, chan=True)
+        if "alias" in k:
+            return self.alias(obj)
+        if any(h in k for h in HASH_KEYS):
+            return self.opaque(obj)
+        return self.text(obj)
+
+    def record(self, rec: Dict[str, Any]) -> Dict[str, Any]:
+        out = dict(rec)
+        out["path"] = self.text(rec["path"], chan=True)
+        for field in ("body", "request"):
+            if field in rec:
+                out[field] = self.walk(rec[field])
+        return out
+
+
+def anonymize_archive(src: str, dst: str) -> int:
+    header, records = read_archive(src)
+    anon = Anonymizer()
+
+    writer = ArchiveWriter(dst, {"upstreams": header.get("upstreams"), "anonymized": True})
+    for rec in records:
+        writer.append(anon.record(rec))
+    writer.close()
+    return len(records)
+
+# =========================
+# RECORD (PROXY)
+# =========================
+
+def build_recorder(service: str, upstream: str, writer: ArchiveWriter,
+                   session_box: Dict[str, ClientSession]) -> web.Application:
+    """
+    Proxy for one service: forwards every request to `upstream`,
+    returns the response unchanged (pagination links pointed back at
+    the proxy) and archives it
+    """
+    upstream = upstream.rstrip("/")
+
+    async def proxy(request: web.Request) -> web.Response:
+        path = request.rel_url.path_qs
+        payload = await request.read()
+        headers = {k: v for k, v in request.headers.items() if k.lower() not in HOP_HEADERS}
+
+        started = time.monotonic()
+        async with session_box["session"].request(
+            request.method, f"{upstream}{path}", data=payload or None, headers=headers,
+        ) as r:
+            raw = await r.read()
+            status = r.status
+            ctype = r.headers.get("Content-Type", "application/json")
+        elapsed = time.monotonic() - started
+
+        try:
+            body = json.loads(raw)
+            is_json = True
+        except ValueError:
+            body = raw.decode(errors="replace")
+            is_json = False
+
+        rec = {
+            "t": round(time.time() - writer.started, 3),
+            "service": service,
+            "method": request.method,
+            "path": path,
+            "status": status,
+            "elapsed": round(elapsed, 4),
+            "body": relink(body, "") if is_json else body,
+        }
+        if request.method != "GET" and payload:
+            try:
+                rec["request"] = json.loads(payload)
+            except ValueError:
+                pass
+        writer.append(rec)
+
+        if is_json:
+            body = relink(body, str(request.url.origin()))
+            return web.json_response(body, status=status)
+        return web.Response(body=raw, status=status, content_type=ctype.split(";")[0])
+
+    app = web.Application()
+    app.router.add_route("*", "/{tail:.*}", proxy)
+    return app
+
+
+async def run_recorder(args) -> None:
+    upstreams = {}
+    if args.lndg_url:
+        upstreams["lndg"] = (args.lndg_url, args.lndg_port)
+    if args.los_url:
+        upstreams["los"] = (args.los_url, args.los_port)
+    if not upstreams:
+        raise SystemExit("nothing to record: pass --lndg-url and/or --los-url")
+
+    writer = ArchiveWriter(args.out, {"upstreams": sorted(upstreams)})
+    session_box = {"session": ClientSession(
+        timeout=ClientTimeout(total=args.timeout),
+        connector=TCPConnector(ssl=None if args.verify_tls else False),
+    )}
+
+    runners = []
+    for service, (url, port) in upstreams.items():
+        runner = web.AppRunner(build_recorder(service, url, writer, session_box), access_log=None)
+        await runner.setup()
+        await web.TCPSite(runner, args.host, port).start()
+        runners.append(runner)
+        print(f"[RECORD] {service}: http://{args.host}:{port} → {url}")
+
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+
+    print(f"[RECORD] writing {args.out} (Ctrl+C to stop)")
+    try:
+        await stop.wait()
+    finally:
+        for runner in runners:
+            await runner.cleanup()
+        await session_box["session"].close()
+        writer.close()
+        print(f"[RECORD] {writer.count} responses saved")
+
+# =========================
+# REPLAY
+# =========================
+
+def build_replay_app(records: List[Dict[str, Any]], timing: str = "fast") -> web.Application:
+    """
+    aiohttp app serving archived responses for both services on one
+    port. Each (method, path) replays its responses in recorded order
+    and wraps around, so repeated polls see balances change as they did.
+    Unknown query strings fall back to the path's first response.
+    """
+    by_key: Dict[Tuple[str, str], List[Dict[str, Any]]] = {}
+    by_path: Dict[Tuple[str, str], Dict[str, Any]] = {}
+    for rec in records:
+        by_key.setdefault((rec["method"], rec["path"]), []).append(rec)
+        by_path.setdefault((rec["method"], rec["path"].split("?", 1)[0]), rec)
+
+    cursors: Counter = Counter()
+    stats = {"requests": 0, "misses": 0}
+
+    async def serve(request: web.Request) -> web.Response:
+        stats["requests"] += 1
+        key = (request.method, request.rel_url.path_qs)
+        hits = by_key.get(key)
+        if hits:
+            rec = hits[cursors[key] % len(hits)]
+            cursors[key] += 1
+        else:
+            rec = by_path.get((request.method, request.rel_url.path))
+            if rec is None:
+                stats["misses"] += 1
+                raise web.HTTPNotFound(text=f"not in archive: {key[0]} {key[1]}")
+
+        if timing == "original":
+            await asyncio.sleep(rec.get("elapsed", 0))
+
+        body = rec["body"]
+        if isinstance(body, (dict, list)):
+            # cópia rasa: relink não pode alterar o registro guardado
+            if isinstance(body, dict):
+                body = relink(dict(body), str(request.url.origin()))
+            return web.json_response(body, status=rec["status"])
+        return web.Response(text=body, status=rec["status"])
+
+    app = web.Application()
+    app["stats"] = stats
+    app.router.add_route("*", "/{tail:.*}", serve)
+    return app
+
+# =========================
+# MAIN
+# =========================
+
+def main():
+    parser = argparse.ArgumentParser(description="Record/replay LNDg and LOS API traffic")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+
+    rec = sub.add_parser("record", help="proxy the real APIs and archive their responses")
+    rec.add_argument("--lndg-url", default=os.getenv("LNDG_BASE_URL"))
+    rec.add_argument("--los-url", default=os.getenv("LOS_BASE_URL"))
+    rec.add_argument("--host", default="127.0.0.1")
+    rec.add_argument("--lndg-port", type=int, default=18889)
+    rec.add_argument("--los-port", type=int, default=18443)
+    rec.add_argument("--verify-tls", action="store_true", help="verify upstream certificates")
+    rec.add_argument("--timeout", type=float, default=60)
+    rec.add_argument("--out", default="traffic.jsonl.gz")
+
+    anon = sub.add_parser("anonymize", help="write a shareable copy of an archive")
+    anon.add_argument("src")
+    anon.add_argument("dst")
+
+    rep = sub.add_parser("replay", help="serve an archive in place of LNDg and LOS")
+    rep.add_argument("archive")
+    rep.add_argument("--host", default="127.0.0.1")
+    rep.add_argument("--port", type=int, default=8889)
+    rep.add_argument("--timing", choices=("fast", "original"), default="fast")
+
+    info = sub.add_parser("info", help="summarize an archive")
+    info.add_argument("archive")
+
+    args = parser.parse_args()
+
+    if args.cmd == "record":
+        asyncio.run(run_recorder(args))
+
+    elif args.cmd == "anonymize":
+        n = anonymize_archive(args.src, args.dst)
+        print(f"[ANON] {n} responses → {args.dst}")
+
+    elif args.cmd == "replay":
+        _, records = read_archive(args.archive)
+        print(f"[REPLAY] {len(records)} responses on http://{args.host}:{args.port} ({args.timing})")
+        web.run_app(
+            build_replay_app(records, args.timing),
+            host=args.host,
+            port=args.port,
+            access_log=None,
+            print=None,
+        )
+
+    elif args.cmd == "info":
+        header, records = read_archive(args.archive)
+        counts = Counter((r["service"], r["method"], r["path"].split("?", 1)[0]) for r in records)
+        span = records[-1]["t"] if records else 0
+        print(f"[INFO] {len(records)} responses over {span:.0f}s, "
+              f"anonymized={bool(header.get('anonymized'))}")
+        for (service, method, path), n in counts.most_common():
+            print(f"  {n:6d}  {service:4s} {method:4s} {path}")
+
+
+if __name__ == "__main__":
+    main()
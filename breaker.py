@@ -0,0 +1,125 @@
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+# =========================
+# CIRCUIT BREAKER
+# =========================
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpen(RuntimeError):
+    """
+    Call refused without touching the endpoint: its breaker is open
+    """
+
+    def __init__(self, name: str, retry_in: float):
+        super().__init__(f"{name} circuit open (retry in {retry_in:.0f}s)")
+        self.name = name
+        self.retry_in = retry_in
+
+
+class CircuitBreaker:
+    """
+    Breaker for one endpoint.
+
+    Closed: calls pass; `failures` consecutive failures open it. Open:
+    calls are refused for `reset_timeout` seconds. Then half-open: one
+    caller is let through as a probe (others are still refused). A good
+    probe closes the breaker; a failed one reopens it with the wait
+    doubled, up to `max_reset_timeout`. A probe that never reports back
+    (caller died) is replaced after `reset_timeout`.
+    """
+
+    def __init__(self, name: str, failures: int = 3, reset_timeout: float = 30,
+                 max_reset_timeout: float = 600, clock: Callable[[], float] = time.monotonic):
+        self.name = name
+        self.failures = failures
+        self.reset_timeout = reset_timeout
+        self.max_reset_timeout = max_reset_timeout
+        self.clock = clock
+
+        self._lock = threading.Lock()
+        self.state = CLOSED
+        self._consecutive = 0
+        self._wait = reset_timeout    # espera atual (dobra a cada probe que falha)
+        self._opened_at = 0.0
+        self._probe_at = None         # probe em andamento (half-open)
+        self.last_error = None
+        self.opens = 0
+        self.refused = 0
+
+    def retry_in(self) -> float:
+        with self._lock:
+            if self.state != OPEN:
+                return 0.0
+            return max(0.0, self._opened_at + self._wait - self.clock())
+
+    def allow(self) -> bool:
+        now = self.clock()
+
+        with self._lock:
+            if self.state == CLOSED:
+                return True
+            if self.state == OPEN and now - self._opened_at >= self._wait:
+                self.state = HALF_OPEN
+                self._probe_at = None
+            if self.state == HALF_OPEN:
+                if self._probe_at is None or now - self._probe_at >= self.reset_timeout:
+                    self._probe_at = now
+                    return True
+            self.refused += 1
+            return False
+
+    def success(self) -> Optional[str]:
+        """
+        Returns a transition message when the breaker closes
+        """
+        with self._lock:
+            was = self.state
+            self.state = CLOSED
+            self._consecutive = 0
+            self._wait = self.reset_timeout
+            self._probe_at = None
+            if was != CLOSED:
+                return f"{self.name} recovered → closed"
+            return None
+
+    def failure(self, error: Any = None) -> Optional[str]:
+        """
+        Returns a transition message when the breaker (re)opens
+        """
+        now = self.clock()
+
+        with self._lock:
+            self.last_error = (str(error) or type(error).__name__)[:200] if error is not None else None
+            self._consecutive += 1
+
+            if self.state == HALF_OPEN:
+                self._wait = min(self._wait * 2, self.max_reset_timeout)
+                what = "probe failed"
+            elif self.state != CLOSED or self._consecutive < self.failures:
+                return None
+            else:
+                what = f"open after {self._consecutive} failure(s)"
+
+            self.state = OPEN
+            self._opened_at = now
+            self._probe_at = None
+            self.opens += 1
+            return f"{self.name} {what} → retry in {self._wait:.0f}s ({self.last_error})"
+
+    def stats(self) -> Dict[str, Any]:
+        retry_in = self.retry_in()
+        with self._lock:
+            return {
+                "state": self.state,
+                "consecutive_failures": self._consecutive,
+                "retry_in_s": round(retry_in, 1) if self.state == OPEN else None,
+                "opens": self.opens,
+                "refused": self.refused,
+                "last_error": self.last_error,
+            }
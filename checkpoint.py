@@ -0,0 +1,88 @@
+import json
+import os
+import tempfile
+import time
+from typing import Any, Dict, Optional
+
+# =========================
+# ATOMIC JSON FILES
+# =========================
+
+def atomic_write_json(path: str, data: Any) -> None:
+    """
+    Write JSON to `path` via temp file + rename, so readers never
+    see a partial file
+    """
+    directory = os.path.dirname(path) or "."
+    fd, tmp = tempfile.mkstemp(prefix=".tmp-", dir=directory)
+
+    try:
+        with os.fdopen(fd, "w") as f:
+            json.dump(data, f, separators=(",", ":"))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
+
+
+def read_json(path: str) -> Any:
+    """
+    Parsed JSON from `path`, or None if missing or unreadable
+    """
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+# =========================
+# CHECKPOINT
+# =========================
+
+CHECKPOINT_VERSION = 1
+
+
+def save_checkpoint(path: str, state: Dict[str, Any]) -> None:
+    state = dict(state)
+    state["version"] = CHECKPOINT_VERSION
+    state["saved_at"] = time.time()
+    atomic_write_json(path, state)
+
+
+def load_checkpoint(path: str, max_age: float) -> Optional[Dict[str, Any]]:
+    """
+    Load a checkpoint written by save_checkpoint if it is at most
+    `max_age` seconds old; None otherwise
+    """
+    state = read_json(path)
+
+    if not isinstance(state, dict) or state.get("version") != CHECKPOINT_VERSION:
+        return None
+
+    age = time.time() - float(state.get("saved_at") or 0)
+    if age < 0 or age > max_age:
+        return None
+
+    return state
+
+
+def resume_snapshot(state: Dict[str, Any], fields, max_age: float):
+    """
+    (taken_at, rows) of the channel snapshot saved in a checkpoint if
+    it has the same `fields` and is at most `max_age` seconds old; None
+    otherwise (a stale snapshot would plan runs on old balances)
+    """
+    snap = state.get("snapshot")
+    if not isinstance(snap, dict) or snap.get("fields") != list(fields):
+        return None
+
+    taken_at = float(snap.get("taken_at") or 0)
+    if time.time() - taken_at > max_age:
+        return None
+
+    return taken_at, snap.get("rows") or []
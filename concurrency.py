@@ -0,0 +1,209 @@
+import math
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+# =========================
+# ADAPTIVE CONCURRENCY (AIMD)
+# =========================
+
+class AIMDController:
+    """
+    Limit on concurrent regolancer runs, between `min_limit` and
+    `max_limit`.
+
+    Outcomes are judged every `window` runs. Each concurrency level
+    keeps decayed totals (runs, successes, success latency). The current
+    level is compared with the lowest level below it that has about a
+    window of data: it looks worse when its success rate is below
+    `min_success_ratio` × reference or its mean success latency above
+    `max_latency_ratio` × reference.
+
+    Looks fine → limit + 1. Looks worse by more than `z` standard errors
+    → limit × `backoff`. Looks worse but not significantly → hold and
+    keep collecting at this level. With success rates of a few percent a
+    single window says little, so evidence has to pile up before the
+    controller backs off.
+
+    Comparing with the lowest level (rather than the previous window)
+    catches contention that creeps in one step at a time. Totals decay
+    by `alpha` per window, so a reference that no longer reflects the
+    node fades out.
+    """
+
+    def __init__(self, min_limit: int = 1, max_limit: int = 4, window: int = 20,
+                 backoff: float = 0.5, min_success_ratio: float = 0.7,
+                 max_latency_ratio: float = 1.5, z: float = 2.33, alpha: float = 0.02,
+                 min_latency_samples: int = 3):
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.window = window
+        self.backoff = backoff
+        self.min_success_ratio = min_success_ratio
+        self.max_latency_ratio = max_latency_ratio
+        self.z = z
+        self.alpha = alpha
+        self.min_latency_samples = min_latency_samples
+
+        self._lock = threading.Lock()
+        self._limit = float(min_limit)
+        self._current = [0, 0, 0.0]   # janela aberta: runs, sucessos, soma de latência
+        self._levels: Dict[int, List[float]] = {}  # limite → totais decaídos
+        self.increases = 0
+        self.decreases = 0
+        self.last_window = None
+
+    @property
+    def limit(self) -> int:
+        with self._lock:
+            return self._bounded()
+
+    def _bounded(self) -> int:
+        return max(self.min_limit, min(self.max_limit, int(self._limit)))
+
+    def set_bounds(self, min_limit: int, max_limit: int) -> None:
+        with self._lock:
+            self.min_limit = min_limit
+            self.max_limit = max(min_limit, max_limit)
+            self._limit = float(self._bounded())
+
+    # ------------------------------------------------------------
+    # FEEDBACK
+    # ------------------------------------------------------------
+
+    def record(self, ok: bool, elapsed: float) -> Optional[Tuple[int, int, str]]:
+        """
+        One finished run. Returns (old, new, reason) when the window
+        closed and the limit moved, else None.
+        """
+        with self._lock:
+            cur = self._current
+            cur[0] += 1
+            if ok:
+                cur[1] += 1
+                cur[2] += elapsed
+            if cur[0] < self.window:
+                return None
+
+            n, succ, latency_sum = cur
+            self._current = [0, 0, 0.0]
+            old = self._bounded()
+
+            keep = 1 - self.alpha
+            for totals in self._levels.values():
+                for i in range(3):
+                    totals[i] *= keep
+            totals = self._levels.setdefault(old, [0.0, 0.0, 0.0])
+            totals[0] += n
+            totals[1] += succ
+            totals[2] += latency_sum
+
+            worse, reason, ref_runs = self._compare(old, totals)
+
+            if not worse:
+                self._limit = min(self.max_limit, old + 1)
+                if self._bounded() > old:
+                    self.increases += 1
+            elif reason is not None:
+                self._limit = max(self.min_limit, self._limit * self.backoff)
+                if self._bounded() < old:
+                    self.decreases += 1
+            elif ref_runs < 3 * self.window:
+                # referência rala: desce um nível p/ medir de novo
+                self._limit = max(self.min_limit, old - 1)
+                if self._bounded() < old:
+                    self.decreases += 1
+
+            self.last_window = {
+                "limit": old,
+                "runs": n,
+                "success_rate": round(succ / n, 3),
+                "latency_s": round(latency_sum / succ, 1) if succ else None,
+                "verdict": "degraded" if reason else "hold" if worse else "healthy",
+                "reason": reason,
+            }
+
+            new = self._bounded()
+            if new == old:
+                return None
+            return old, new, reason or "healthy"
+
+    def _reference(self, level: int) -> Optional[Tuple[int, List[float]]]:
+        for lvl in sorted(self._levels):
+            if lvl >= level:
+                break
+            if self._levels[lvl][0] >= 0.8 * self.window:
+                return lvl, self._levels[lvl]
+        return None
+
+    def _compare(self, level: int, totals: List[float]) -> Tuple[bool, Optional[str], float]:
+        """
+        (looks worse, reason when significantly worse, reference runs)
+        for `level`
+        """
+        found = self._reference(level)
+        if found is None:
+            return False, None, 0.0
+        ref_level, (ref_runs, ref_succ, ref_latency_sum) = found
+        n, succ, latency_sum = totals
+        worse = False
+
+        rate = succ / n
+        ref = ref_succ / ref_runs
+        if 0 < ref < 1 and rate < ref * self.min_success_ratio:
+            worse = True
+            se = math.sqrt(ref * (1 - ref) * (1 / n + 1 / ref_runs))
+            if ref - rate > self.z * se:
+                return True, f"success {rate:.0%} < {ref:.0%} at limit {ref_level}", ref_runs
+
+        if succ >= self.min_latency_samples and ref_succ >= self.min_latency_samples:
+            latency = latency_sum / succ
+            ref_lat = ref_latency_sum / ref_succ
+            if latency > ref_lat * self.max_latency_ratio:
+                worse = True
+                # latência ~ exponencial: desvio ≈ média
+                se = ref_lat * math.sqrt(1 / succ + 1 / ref_succ)
+                if latency - ref_lat > self.z * se:
+                    return True, f"latency {latency:.0f}s > {ref_lat:.0f}s at limit {ref_level}", ref_runs
+
+        return worse, None, ref_runs
+
+    # ------------------------------------------------------------
+    # STATS / CHECKPOINT
+    # ------------------------------------------------------------
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            levels = {
+                str(lvl): {
+                    "runs": round(t[0], 1),
+                    "success_rate": round(t[1] / t[0], 3) if t[0] else None,
+                    "latency_s": round(t[2] / t[1], 1) if t[1] else None,
+                }
+                for lvl, t in sorted(self._levels.items())
+            }
+            return {
+                "limit": self._bounded(),
+                "min": self.min_limit,
+                "max": self.max_limit,
+                "increases": self.increases,
+                "decreases": self.decreases,
+                "last_window": self.last_window,
+                "levels": levels,
+            }
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "limit": self._limit,
+                "levels": {str(lvl): list(t) for lvl, t in self._levels.items()},
+            }
+
+    def restore(self, data: Optional[Dict[str, Any]]) -> None:
+        if not data:
+            return
+        with self._lock:
+            self._limit = float(data.get("limit") or self.min_limit)
+            self._limit = float(self._bounded())
+            for lvl, t in (data.get("levels") or {}).items():
+                if isinstance(t, list) and len(t) == 3:
+                    self._levels[int(lvl)] = [float(v) for v in t]
@@ -0,0 +1,197 @@
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from typing import Any, Callable, Iterable, List, Optional
+
+# =========================
+# LEASE STORE
+# =========================
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS leases (
+    key     TEXT PRIMARY KEY,
+    owner   TEXT NOT NULL,
+    expires REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS kv (
+    key   TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+
+class LeaseStore:
+    """
+    Leases and shared values for orchestrator instances on one host,
+    kept in a SQLite file.
+
+    A lease is (key → owner, expiry). Acquiring succeeds when the key
+    is free, expired or already ours; a crashed instance's leases simply
+    expire. Multi-key acquisition is all-or-nothing. `kv` holds small
+    JSON values (amount ladder, cursors) updated under the same write lock.
+    """
+
+    def __init__(self, path: str, owner: str):
+        self.path = path
+        self.owner = owner
+
+        self._lock = threading.Lock()
+        self._closed = False
+        self._db = sqlite3.connect(path, timeout=30, isolation_level=None, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(SCHEMA)
+
+    def _write(self, fn: Callable[[sqlite3.Connection], Any]) -> Any:
+        """
+        Run `fn` inside BEGIN IMMEDIATE (one writer across processes)
+        """
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                result = fn(self._db)
+            except BaseException:
+                self._db.execute("ROLLBACK")
+                raise
+            self._db.execute("COMMIT")
+            return result
+
+    # ------------------------------------------------------------
+    # LEASES
+    # ------------------------------------------------------------
+
+    def acquire(self, keys: Iterable[str], ttl: float, owner: Optional[str] = None) -> bool:
+        """
+        Take (or renew) every lease in `keys` for `ttl` seconds, or none
+        """
+        keys = list(keys)
+        owner = owner or self.owner
+
+        def tx(db):
+            if self._closed:
+                return False
+
+            now = time.time()
+            for key in keys:
+                row = db.execute(
+                    "SELECT owner, expires FROM leases WHERE key = ?", (key,)
+                ).fetchone()
+                if row is not None and row[0] != owner and row[1] > now:
+                    return False
+
+            db.executemany(
+                "INSERT OR REPLACE INTO leases (key, owner, expires) VALUES (?, ?, ?)",
+                [(key, owner, now + ttl) for key in keys],
+            )
+            return True
+
+        return self._write(tx)
+
+    def release(self, keys: Iterable[str], owner: Optional[str] = None) -> None:
+        keys = list(keys)
+        owner = owner or self.owner
+
+        self._write(lambda db: db.executemany(
+            "DELETE FROM leases WHERE key = ? AND owner = ?",
+            [(key, owner) for key in keys],
+        ))
+
+    def _owned_args(self):
+        # prefixo comparado literalmente: LIKE trataria _ e % do id como curinga
+        sub = f"{self.owner}/"
+        return self.owner, len(sub), sub
+
+    def close(self) -> None:
+        """
+        Shutdown: drop every lease held by this instance (owner or
+        owner/…) and refuse new ones, so peers take over right away
+        """
+        def tx(db):
+            self._closed = True
+            db.execute(
+                "DELETE FROM leases WHERE owner = ? OR substr(owner, 1, ?) = ?",
+                self._owned_args(),
+            )
+
+        self._write(tx)
+
+    def renew_owned(self, ttl: float) -> int:
+        """
+        Push back the expiry of every lease held by this instance (owner
+        or owner/…) — the heartbeat that keeps long runs' leases alive
+        """
+        if self._closed:
+            return 0
+
+        return self._write(lambda db: db.execute(
+            "UPDATE leases SET expires = ? WHERE owner = ? OR substr(owner, 1, ?) = ?",
+            (time.time() + ttl, *self._owned_args()),
+        ).rowcount)
+
+    def live(self, prefix: str) -> List[str]:
+        """
+        Unexpired lease keys under `prefix`, with the prefix stripped
+        """
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT key FROM leases WHERE substr(key, 1, ?) = ? AND expires > ? ORDER BY key",
+                (len(prefix), prefix, time.time()),
+            ).fetchall()
+        return [r[0][len(prefix):] for r in rows]
+
+    def holder(self, key: str) -> Optional[str]:
+        with self._lock:
+            row = self._db.execute(
+                "SELECT owner, expires FROM leases WHERE key = ?", (key,)
+            ).fetchone()
+        if row is None or row[1] <= time.time():
+            return None
+        return row[0]
+
+    # ------------------------------------------------------------
+    # SHARED VALUES
+    # ------------------------------------------------------------
+
+    def get(self, key: str, default: Any = None) -> Any:
+        with self._lock:
+            row = self._db.execute("SELECT value FROM kv WHERE key = ?", (key,)).fetchone()
+        return json.loads(row[0]) if row is not None else default
+
+    def set(self, key: str, value: Any) -> None:
+        self._write(lambda db: db.execute(
+            "INSERT OR REPLACE INTO kv (key, value) VALUES (?, ?)",
+            (key, json.dumps(value)),
+        ))
+
+    def update(self, key: str, fn: Callable[[Any], Any], default: Any = None) -> Any:
+        """
+        Atomic read-modify-write of one value; returns the new value
+        """
+        def tx(db):
+            row = db.execute("SELECT value FROM kv WHERE key = ?", (key,)).fetchone()
+            value = fn(json.loads(row[0]) if row is not None else default)
+            db.execute(
+                "INSERT OR REPLACE INTO kv (key, value) VALUES (?, ?)",
+                (key, json.dumps(value)),
+            )
+            return value
+
+        return self._write(tx)
+
+# =========================
+# WORK SPLIT
+# =========================
+
+def owner_of(item: str, members: List[str]) -> str:
+    """
+    Rendezvous hashing: the member with the highest hash(member, item).
+    Stable across processes, and when a member leaves only its own
+    items move.
+    """
+    def score(member):
+        digest = hashlib.blake2b(f"{member}|{item}".encode(), digest_size=8).digest()
+        return int.from_bytes(digest, "big")
+
+    return max(members, key=score)
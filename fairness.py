@@ -0,0 +1,253 @@
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional
+
+from models import Pair
+
+# =========================
+# TARGET FAIRNESS (DRR)
+# =========================
+
+@dataclass
+class TargetCredit:
+    """
+    Deficit and wait bookkeeping for one depleted target channel
+    """
+    __slots__ = (
+        "alias",
+        "deficit",
+        "attempts",
+        "service_s",
+        "waiting_since",
+        "cycles_waiting",
+        "max_wait_s",
+        "max_wait_cycles",
+    )
+
+    alias: str
+    deficit: float          # crédito em runs ainda não gasto
+    attempts: int
+    service_s: float        # tempo total de runs recebido
+    waiting_since: float    # último atendimento (ou quando ficou elegível)
+    cycles_waiting: int
+    max_wait_s: float
+    max_wait_cycles: int
+
+
+FIELDS = list(TargetCredit.__slots__)
+
+
+class TargetFairness:
+    """
+    Deficit round-robin over target channels.
+
+    Every round (one cycle of each of `workers` workers) each depleted
+    target earns a quantum of credit: the runs the round is expected to
+    fit (`runs_per_cycle` per worker) split evenly across targets,
+    capped at `max_credit_cycles` quanta. Every run into it spends
+    one. Targets with credit are served one run per turn, most
+    credit first (longest wait on ties); whatever pairs remain follow
+    in the same order. A passed-over target keeps gaining credit until
+    it reaches the front, so with T targets it waits about
+    T / (runs_per_cycle × workers) rounds at most.
+
+    Cost is counted in attempts, not seconds: charging run time let one
+    900s timeout push a target behind everyone for hundreds of cycles
+    (see bench/simulator.py --order fair). Service time is still
+    tracked for the stats.
+    """
+
+    def __init__(self, runs_per_cycle: float = 1.0, max_credit_cycles: int = 4,
+                 workers: int = 1, clock: Callable[[], float] = time.time):
+        self.runs_per_cycle = runs_per_cycle
+        self.max_credit_cycles = max_credit_cycles
+        self.workers = workers
+        self.clock = clock
+        self._cycles = 0  # ciclos de worker vistos; a cada `workers` → rodada nova
+
+        self._lock = threading.Lock()
+        self._targets: Dict[str, TargetCredit] = {}
+
+    # ------------------------------------------------------------
+    # ACCOUNTING
+    # ------------------------------------------------------------
+
+    def start_cycle(self, targets) -> bool:
+        """
+        One worker cycle begins. Only the first of every `workers` cycles
+        opens a round and replenishes, so credit does not grow with the
+        worker count. Returns whether it did.
+        """
+        with self._lock:
+            first = self._cycles % max(1, self.workers) == 0
+            self._cycles += 1
+        if first:
+            self.replenish(targets)
+        return first
+
+    def replenish(self, targets) -> float:
+        """
+        Start of a round: credit every target in `targets`, forget those
+        no longer depleted. Returns the quantum.
+        """
+        if not targets:
+            return 0.0
+
+        now = self.clock()
+        quantum = max(self.runs_per_cycle * max(1, self.workers), 1.0) / len(targets)
+        cap = quantum * self.max_credit_cycles
+
+        with self._lock:
+            current = {t.chan_id for t in targets}
+            for chan_id in list(self._targets):
+                if chan_id not in current:
+                    del self._targets[chan_id]
+
+            for t in targets:
+                entry = self._targets.get(t.chan_id)
+                if entry is None:
+                    entry = TargetCredit(t.alias, 0.0, 0, 0.0, now, 0, 0.0, 0)
+                    self._targets[t.chan_id] = entry
+                entry.deficit = min(entry.deficit + quantum, cap)
+                entry.cycles_waiting += 1
+
+        return quantum
+
+    def charge(self, chan_id: str, seconds: float) -> None:
+        """
+        One run into `chan_id`, taking `seconds`
+        """
+        now = self.clock()
+
+        with self._lock:
+            entry = self._targets.get(chan_id)
+            if entry is None:
+                return
+
+            entry.deficit -= 1
+            entry.attempts += 1
+            entry.service_s += seconds
+            entry.max_wait_s = max(entry.max_wait_s, now - entry.waiting_since)
+            entry.max_wait_cycles = max(entry.max_wait_cycles, entry.cycles_waiting)
+            entry.waiting_since = now
+            entry.cycles_waiting = 0
+
+    def deficit(self, chan_id: str) -> float:
+        with self._lock:
+            entry = self._targets.get(chan_id)
+            return entry.deficit if entry is not None else 0.0
+
+    # ------------------------------------------------------------
+    # ORDERING
+    # ------------------------------------------------------------
+
+    def walk(self, sources, targets, rnd=None):
+        """
+        Yield every source × target pair once in DRR order. Credit is
+        read live, so runs charged while the walk is paused reorder the
+        rest. Memory is O(S + T): each target keeps a cursor into one
+        shared (shuffled) source list.
+        """
+        n_src = len(sources)
+        if not n_src or not targets:
+            return
+
+        if rnd is not None:
+            rnd.shuffle(sources)
+            rnd.shuffle(targets)
+
+        self.start_cycle(targets)
+
+        # alvo → [canal, próximo índice, fim]; cada alvo começa num offset diferente
+        cursors = []
+        for i, t in enumerate(targets):
+            start = rnd.randrange(n_src) if rnd is not None else i % n_src
+            cursors.append([t, start, start + n_src])
+
+        def next_pair(cur):
+            t = cur[0]
+            while cur[1] < cur[2]:
+                s = sources[cur[1] % n_src]
+                cur[1] += 1
+                if s.chan_id != t.chan_id:
+                    return Pair(s, t)
+            return None
+
+        def by_credit(live):
+            # empate (crédito no teto) → quem espera há mais tempo
+            with self._lock:
+                keys = {}
+                for c in live:
+                    e = self._targets.get(c[0].chan_id)
+                    keys[c[0].chan_id] = (-e.deficit, e.waiting_since) if e is not None else (0.0, 0.0)
+            return sorted(live, key=lambda c: keys[c[0].chan_id])
+
+        # rodadas DRR: uma run por alvo com crédito, maior crédito primeiro
+        live = cursors
+        while live:
+            funded = [c for c in live if self.deficit(c[0].chan_id) > 0]
+            if not funded:
+                break
+            for cur in by_credit(funded):
+                if self.deficit(cur[0].chan_id) <= 0:
+                    continue
+                pair = next_pair(cur)
+                if pair is not None:
+                    yield pair
+            live = [c for c in live if c[1] < c[2]]
+
+        # sobra do ciclo: round-robin no que restou, mesma ordem
+        while live:
+            for cur in by_credit(live):
+                pair = next_pair(cur)
+                if pair is not None:
+                    yield pair
+            live = [c for c in live if c[1] < c[2]]
+
+    # ------------------------------------------------------------
+    # STATS / CHECKPOINT
+    # ------------------------------------------------------------
+
+    def waits(self, top: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Per-target wait stats, longest current wait first
+        """
+        now = self.clock()
+
+        with self._lock:
+            rows = [
+                {
+                    "chan_id": chan_id,
+                    "alias": e.alias,
+                    "credit": round(e.deficit, 2),
+                    "attempts": e.attempts,
+                    "service_s": round(e.service_s, 1),
+                    "wait_s": round(now - e.waiting_since, 1),
+                    "cycles_waiting": e.cycles_waiting,
+                    "max_wait_s": round(e.max_wait_s, 1),
+                    "max_wait_cycles": e.max_wait_cycles,
+                }
+                for chan_id, e in self._targets.items()
+            ]
+
+        rows.sort(key=lambda r: (-r["cycles_waiting"], -r["wait_s"]))
+        return rows[:top] if top is not None else rows
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "fields": FIELDS,
+                "rows": {
+                    chan_id: [getattr(e, f) for f in FIELDS]
+                    for chan_id, e in self._targets.items()
+                },
+            }
+
+    def restore(self, data: Optional[Dict[str, Any]]) -> None:
+        if not data or data.get("fields") != FIELDS:
+            return
+
+        with self._lock:
+            for chan_id, row in (data.get("rows") or {}).items():
+                self._targets[chan_id] = TargetCredit(*row)
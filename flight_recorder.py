@@ -0,0 +1,125 @@
+import gzip
+import os
+import threading
+import time
+from collections import deque
+from typing import Callable, Dict, Optional
+
+# =========================
+# RING BUFFER
+# =========================
+
+class FlightRecorder:
+    """
+    Keeps the last `max_bytes` of a process' output in memory (nothing
+    when `max_bytes` is 0).
+
+    The pipe is read in raw chunks (no per-line decoding unless a
+    live `on_line` callback is given), so capturing is close to free.
+    """
+
+    def __init__(self, max_bytes: int = 64 * 1024):
+        self.max_bytes = max_bytes
+        self.total = 0
+        self.dropped = 0
+        self._chunks = deque()
+        self._size = 0
+
+    def _append(self, chunk: bytes) -> None:
+        self.total += len(chunk)
+
+        # max_bytes <= 0 → só conta, não guarda nada
+        if self.max_bytes <= 0:
+            self.dropped += len(chunk)
+            return
+
+        self._chunks.append(chunk)
+        self._size += len(chunk)
+
+        # descarta chunks inteiros do início enquanto sobrar o suficiente
+        while self._chunks and self._size - len(self._chunks[0]) >= self.max_bytes:
+            old = self._chunks.popleft()
+            self._size -= len(old)
+            self.dropped += len(old)
+
+    def consume(self, stream, on_line: Optional[Callable[[str], None]] = None) -> None:
+        """
+        Read `stream` (binary pipe) until EOF
+        """
+        fd = stream.fileno()
+        pending = b""
+
+        while True:
+            chunk = os.read(fd, 65536)
+            if not chunk:
+                break
+
+            self._append(chunk)
+
+            if on_line is not None:
+                *lines, pending = (pending + chunk).split(b"\n")
+                for line in lines:
+                    on_line(line.decode(errors="replace").rstrip())
+
+        if on_line is not None and pending:
+            on_line(pending.decode(errors="replace").rstrip())
+
+    def tail(self) -> bytes:
+        data = b"".join(self._chunks)
+        return data[-self.max_bytes:] if self.max_bytes > 0 else b""
+
+# =========================
+# CAPTURE STORE
+# =========================
+
+class CaptureStore:
+    """
+    gzip captures under `directory`, keeping at most `keep` files
+    (oldest removed first)
+    """
+
+    def __init__(self, directory: str, keep: int = 50):
+        self.directory = directory
+        self.keep = keep
+        self.saved = 0
+        self._lock = threading.Lock()
+        self._files = None
+
+    def _load_index(self) -> None:
+        os.makedirs(self.directory, exist_ok=True)
+        names = sorted(
+            n for n in os.listdir(self.directory)
+            if n.endswith(".log.gz")
+        )
+        self._files = deque(os.path.join(self.directory, n) for n in names)
+
+    def save(self, name: str, header: Dict[str, object], recorder: FlightRecorder) -> str:
+        head = "".join(f"# {k}: {v}\n" for k, v in header.items())
+        if recorder.dropped:
+            head += f"# truncated: first {recorder.dropped} bytes not kept\n"
+
+        payload = head.encode() + b"\n" + recorder.tail()
+
+        stamp = time.strftime("%Y%m%d-%H%M%S")
+        path = os.path.join(self.directory, f"{stamp}-{name}.log.gz")
+
+        with self._lock:
+            if self._files is None:
+                self._load_index()
+
+            tmp = path + ".tmp"
+            with gzip.open(tmp, "wb", compresslevel=6) as f:
+                f.write(payload)
+            os.replace(tmp, path)
+
+            self._files.append(path)
+            self.saved += 1
+
+            while len(self._files) > max(self.keep, 0):
+                old = self._files.popleft()
+                try:
+                    os.remove(old)
+                except OSError:
+                    pass
+
+        return path
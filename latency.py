@@ -0,0 +1,181 @@
+import math
+import threading
+import time
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from checkpoint import atomic_write_json, read_json
+
+# =========================
+# RUN LATENCY HISTOGRAMS
+# =========================
+
+# limites superiores dos buckets: 1s × 1.25^i até ~1h
+BUCKET_GROWTH = 1.25
+BUCKETS = tuple(BUCKET_GROWTH ** i for i in range(int(math.log(3600, BUCKET_GROWTH)) + 2))
+FORMAT_VERSION = 1
+
+# níveis consultados, do mais específico ao mais geral
+LEVELS = ("pair", "target", "source")
+
+
+def bucket_of(seconds: float) -> int:
+    if seconds <= 1:
+        return 0
+    return min(len(BUCKETS) - 1, math.ceil(math.log(seconds, BUCKET_GROWTH)))
+
+
+class LatencyHistograms:
+    """
+    Decayed histograms of successful run durations, per pair and per
+    channel as target and as source.
+
+    Log-spaced buckets (25% wide, 1s to 1h) kept sparse: a key only
+    stores the buckets it has hit. Weights halve every `half_life`
+    seconds, so the percentiles follow the node as routes change.
+
+    `timeout` answers from the most specific level with at least
+    `min_samples` (decayed) successes: the pair, else its target
+    channel, else its source channel. Quantiles return the bucket's
+    upper bound, so they err on the long side.
+    """
+
+    def __init__(self, half_life: float = 3 * 86400, clock: Callable[[], float] = time.time):
+        self.half_life = half_life
+        self.clock = clock
+
+        self._lock = threading.Lock()
+        self._hists: Dict[tuple, list] = {}  # chave → [stamp, {bucket: peso}]
+        self.dirty = False
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._hists)
+
+    def _decay(self, age: float) -> float:
+        if age <= 0 or not self.half_life:
+            return 1.0
+        return math.exp(-age * math.log(2) / self.half_life)
+
+    # ------------------------------------------------------------
+    # UPDATES
+    # ------------------------------------------------------------
+
+    def record(self, src_id: str, tgt_id: str, seconds: float) -> None:
+        """
+        One successful run of `seconds`
+        """
+        now = self.clock()
+        b = bucket_of(seconds)
+
+        with self._lock:
+            for key in (("pair", src_id, tgt_id), ("target", tgt_id), ("source", src_id)):
+                h = self._hists.get(key)
+                if h is None:
+                    h = self._hists[key] = [now, {}]
+                else:
+                    k = self._decay(now - h[0])
+                    if k < 1.0:
+                        for i in h[1]:
+                            h[1][i] *= k
+                    h[0] = now
+                h[1][b] = h[1].get(b, 0.0) + 1
+            self.dirty = True
+
+    # ------------------------------------------------------------
+    # QUERIES
+    # ------------------------------------------------------------
+
+    def _quantile(self, key: tuple, q: float, now: float) -> Optional[Tuple[float, float]]:
+        """
+        (quantile seconds, decayed sample count) for `key`
+        """
+        h = self._hists.get(key)
+        if h is None:
+            return None
+        weights = h[1]
+        total = sum(weights.values())
+        if total <= 0:
+            return None
+
+        need = q * total
+        acc = 0.0
+        value = BUCKETS[-1]
+        for i in sorted(weights):
+            acc += weights[i]
+            if acc >= need:
+                value = BUCKETS[i]
+                break
+        return value, total * self._decay(now - h[0])
+
+    def timeout(self, src_id: str, tgt_id: str, q: float = 0.95,
+                min_samples: float = 5) -> Optional[Tuple[float, str, float]]:
+        """
+        (q-quantile seconds, level, samples) from the most specific level
+        with enough history, or None
+        """
+        now = self.clock()
+        keys = {"pair": ("pair", src_id, tgt_id), "target": ("target", tgt_id), "source": ("source", src_id)}
+
+        with self._lock:
+            for level in LEVELS:
+                found = self._quantile(keys[level], q, now)
+                if found is not None and found[1] >= min_samples:
+                    return found[0], level, found[1]
+        return None
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            counts = {level: 0 for level in LEVELS}
+            for key in self._hists:
+                counts[key[0]] += 1
+        return {"keys": counts, "half_life_h": round(self.half_life / 3600, 1)}
+
+    # ------------------------------------------------------------
+    # PERSISTENCE
+    # ------------------------------------------------------------
+
+    def save(self, path: str, min_weight: float = 0.05) -> None:
+        """
+        JSON file; keys whose decayed weight fell below `min_weight` are
+        dropped
+        """
+        now = self.clock()
+
+        with self._lock:
+            for key in list(self._hists):
+                stamp, weights = self._hists[key]
+                if sum(weights.values()) * self._decay(now - stamp) < min_weight:
+                    del self._hists[key]
+            rows = [
+                [list(key), stamp, {str(i): round(w, 4) for i, w in weights.items()}]
+                for key, (stamp, weights) in self._hists.items()
+            ]
+            self.dirty = False
+
+        try:
+            atomic_write_json(path, {
+                "version": FORMAT_VERSION,
+                "growth": BUCKET_GROWTH,
+                "buckets": len(BUCKETS),
+                "rows": rows,
+            })
+        except Exception:
+            # não salvou → próximo flush tenta de novo
+            with self._lock:
+                self.dirty = True
+            raise
+
+    def load(self, path: str) -> bool:
+        data = read_json(path)
+        if (not isinstance(data, dict) or data.get("version") != FORMAT_VERSION or
+                data.get("growth") != BUCKET_GROWTH or data.get("buckets") != len(BUCKETS)):
+            return False
+
+        hists = {}
+        for key, stamp, weights in data.get("rows") or []:
+            hists[tuple(key)] = [float(stamp), {int(i): float(w) for i, w in weights.items()}]
+
+        with self._lock:
+            self._hists = hists
+            self.dirty = False
+        return True
@@ -0,0 +1,115 @@
+import dataclasses
+import threading
+import time
+from typing import Callable, Dict, List
+
+from logic import valid_source, valid_target
+
+# =========================
+# LIQUIDITY PROJECTION
+# =========================
+
+class Move:
+    """
+    One successful rebalance's effect on one channel
+    """
+    __slots__ = ("delta", "base", "stamp", "landed")
+
+    def __init__(self, delta: int, base: int, stamp: float):
+        self.delta = delta    # sats (+ entrou, - saiu)
+        self.base = base      # local do canal no snapshot usado pelo run
+        self.stamp = stamp
+        self.landed = False   # já visto num snapshot do LNDg
+
+
+class LiquidityProjection:
+    """
+    Balances moved by successful runs that a worker's snapshot may not
+    show yet. Shared by a node's workers.
+
+    A success debits the source and credits the target right away.
+    `view` projects a channel from a snapshot taken at time T: moves
+    recorded after T always apply. Older moves apply only while no later
+    LNDg snapshot has shown them (`reconcile`; LNDg lags LND). Moves
+    expire after `max_age` seconds either way.
+    """
+
+    def __init__(self, max_age: float = 900, clock: Callable[[], float] = time.time):
+        self.max_age = max_age
+        self.clock = clock
+
+        self._lock = threading.Lock()
+        self._moves: Dict[str, List[Move]] = {}
+
+    def record(self, pair, amount: int) -> None:
+        now = self.clock()
+
+        with self._lock:
+            for chan, delta in ((pair.source, -amount), (pair.target, amount)):
+                self._moves.setdefault(chan.chan_id, []).append(Move(delta, chan.local, now))
+
+    def reconcile(self, channels, taken_at: float) -> int:
+        """
+        Match a fresh snapshot against pending moves: a move counts as
+        landed once the channel shows at least half of it. Drops expired
+        moves. Returns how many moves landed.
+        """
+        landed = 0
+        by_id = {c.chan_id: c for c in channels}
+
+        with self._lock:
+            for chan_id in list(self._moves):
+                moves = [m for m in self._moves[chan_id] if taken_at - m.stamp < self.max_age]
+                c = by_id.get(chan_id)
+                for m in moves:
+                    if m.landed or c is None or m.stamp > taken_at:
+                        continue
+                    shift = c.local - m.base
+                    if shift * m.delta > 0 and abs(shift) * 2 >= abs(m.delta):
+                        m.landed = True
+                        landed += 1
+                if moves:
+                    self._moves[chan_id] = moves
+                else:
+                    del self._moves[chan_id]
+
+        return landed
+
+    def delta(self, chan_id: str, taken_at: float) -> int:
+        now = self.clock()
+
+        with self._lock:
+            return sum(
+                m.delta for m in self._moves.get(chan_id, ())
+                if now - m.stamp < self.max_age and (m.stamp >= taken_at or not m.landed)
+            )
+
+    def view(self, channel, taken_at: float):
+        """
+        `channel` with pending moves applied (same object if none)
+        """
+        delta = self.delta(channel.chan_id, taken_at)
+        if not delta:
+            return channel
+
+        cap = channel.capacity
+        local = min(max(channel.local + delta, 0), cap)
+        return dataclasses.replace(
+            channel,
+            local=local,
+            remote=cap - local,
+            local_pct=int(local * 100 / cap) if cap > 0 else 0,
+        )
+
+    def eligible(self, pair, taken_at: float) -> bool:
+        """
+        Source and target still valid after pending moves
+        """
+        return (
+            valid_source(self.view(pair.source, taken_at)) and
+            valid_target(self.view(pair.target, taken_at))
+        )
+
+    def pending(self) -> int:
+        with self._lock:
+            return sum(len(v) for v in self._moves.values())
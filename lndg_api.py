@@ -1,6 +1,8 @@
 import aiohttp
 import os
-from typing import Any, Dict, List, Tuple
+from typing import Any, Dict, List, Optional, Tuple
+
+from models import Channel
 
 # =========================
 # CONFIG
@@ -13,18 +15,21 @@ EXCLUSION_LIST = set()
 # INTERNAL HELPERS
 # =========================
 
-def _get_lndg_config() -> Tuple[str, aiohttp.BasicAuth]:
-    base_url = os.getenv("LNDG_BASE_URL", DEFAULT_LNDG_BASE_URL).rstrip("/")
-
-    username = os.getenv("LNDG_USER")
-    password = os.getenv("LNDG_PASS")
-
+def make_lndg_config(base_url: str, username: Optional[str], password: Optional[str]) -> Tuple[str, aiohttp.BasicAuth]:
     if not username:
         raise RuntimeError("Missing required env var: LNDG_USER")
     if not password:
         raise RuntimeError("Missing required env var: LNDG_PASS")
 
-    return base_url, aiohttp.BasicAuth(username, password)
+    return base_url.rstrip("/"), aiohttp.BasicAuth(username, password)
+
+
+def get_lndg_config() -> Tuple[str, aiohttp.BasicAuth]:
+    return make_lndg_config(
+        os.getenv("LNDG_BASE_URL", DEFAULT_LNDG_BASE_URL),
+        os.getenv("LNDG_USER"),
+        os.getenv("LNDG_PASS"),
+    )
 
 # =========================
 # API CALLS
@@ -34,11 +39,13 @@ async def fetch_all_channels(
     session: aiohttp.ClientSession,
     base_url: str,
     auth: aiohttp.BasicAuth,
+    query: str = "is_open=true&is_active=true",
 ) -> List[Dict[str, Any]]:
     """
-    Fetch all open and active channels from LNDg (paginated)
+    Fetch all channels matching `query` from LNDg (paginated).
+    Defaults to open and active channels.
     """
-    url = f"{base_url}/api/channels/?is_open=true&is_active=true"
+    url = f"{base_url}/api/channels/?{query}"
     out: List[Dict[str, Any]] = []
 
     while url:
@@ -57,16 +64,11 @@ async def fetch_all_channels(
 # PUBLIC API
 # =========================
 
-async def load_channels() -> List[Dict[str, Any]]:
+def normalize_channels(raw: List[Dict[str, Any]]) -> List[Channel]:
     """
-    Load channels from LNDg and normalize fields for the orchestrator
+    Normalize raw LNDg channel records for the orchestrator
     """
-    base_url, auth = _get_lndg_config()
-
-    async with aiohttp.ClientSession() as session:
-        raw = await fetch_all_channels(session, base_url, auth)
-
-    channels: List[Dict[str, Any]] = []
+    channels: List[Channel] = []
 
     for ch in raw:
         cid = str(ch.get("chan_id") or "")
@@ -84,19 +86,41 @@ async def load_channels() -> List[Dict[str, Any]]:
         local_pct = int(local_effective * 100 / cap) if cap > 0 else 0
         remote_effective = cap - local_effective
 
-        channels.append({
-            "chan_id": cid,
-            "pubkey": ch.get("remote_pubkey"),
-            "alias": ch.get("alias") or "unknown",
+        channels.append(Channel(
+            chan_id=cid,
+            pubkey=ch.get("remote_pubkey"),
+            alias=ch.get("alias") or "unknown",
 
-            "capacity": cap,
-            "local": local_effective,
-            "remote": remote_effective,
+            capacity=cap,
+            local=local_effective,
+            remote=remote_effective,
 
-            "local_pct": local_pct,
-            "ar_out_target": int(ch.get("ar_out_target") or 0),
-            "ar_in_target": int(ch.get("ar_in_target") or 0),
-            "ar": bool(ch.get("auto_rebalance")),
-        })
+            local_pct=local_pct,
+            ar_out_target=int(ch.get("ar_out_target") or 0),
+            ar_in_target=int(ch.get("ar_in_target") or 0),
+            ar=bool(ch.get("auto_rebalance")),
+
+            local_fee_rate=int(ch.get("local_fee_rate") or 0),
+            remote_fee_rate=int(ch.get("remote_fee_rate") or 0),
+            ar_max_cost=int(ch.get("ar_max_cost") or 0),
+        ))
 
     return channels
+
+
+async def load_channels(
+    config: Optional[Tuple[str, aiohttp.BasicAuth]] = None,
+    timeout: Optional[float] = None,
+) -> List[Channel]:
+    """
+    Load channels from LNDg and normalize fields for the orchestrator.
+    `config` is (base_url, auth); defaults to the env config.
+    `timeout` caps the whole paginated read (seconds).
+    """
+    base_url, auth = config or get_lndg_config()
+    kwargs = {"timeout": aiohttp.ClientTimeout(total=timeout)} if timeout else {}
+
+    async with aiohttp.ClientSession(**kwargs) as session:
+        raw = await fetch_all_channels(session, base_url, auth)
+
+    return normalize_channels(raw)
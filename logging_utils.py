@@ -1,15 +1,278 @@
+import io
+import os
+import queue
+import sys
+import threading
+import time
+from datetime import datetime
+
+
 def log_pair(worker_id, src, tgt, amount, prefix=None):
     amount_fmt = f"{amount:,}".replace(",", ".")
 
     pfx = prefix or f"[W{worker_id}] [AMOUNT {amount_fmt}]"
 
-    tgt_max_local = 100 - tgt["ar_in_target"]
+    tgt_max_local = 100 - tgt.ar_in_target
 
     print(
         f"{pfx} "
-        f"SRC {src['alias']} "
-        f"(LOCAL {src['local_pct']}% → min {src['ar_out_target']}%)"
+        f"SRC {src.alias} "
+        f"(LOCAL {src.local_pct}% → min {src.ar_out_target}%)"
         f"  →  "
-        f"TGT {tgt['alias']} "
-        f"(LOCAL {tgt['local_pct']}% → max {tgt_max_local}%)"
+        f"TGT {tgt.alias} "
+        f"(LOCAL {tgt.local_pct}% → max {tgt_max_local}%)"
     )
+
+# =========================
+# LOG SINK
+# =========================
+
+STDOUT = "stdout"
+
+
+class RotatingFile:
+    """
+    Append-only file rotated by size or daily (path → path.1 … path.N)
+    """
+
+    def __init__(self, path, max_bytes=10 * 1024 * 1024, when="size", backups=5, timestamps=False):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.when = when
+        self.backups = backups
+        self.timestamps = timestamps
+        self._fh = None
+        self._day = None
+
+    def _open(self):
+        self._fh = open(self.path, "a")
+        self._day = datetime.now().date()
+
+    def _should_rotate(self):
+        if self.when == "daily":
+            return datetime.now().date() != self._day
+        return self.max_bytes > 0 and self._fh.tell() >= self.max_bytes
+
+    def _rotate(self):
+        self._fh.close()
+        for i in range(self.backups - 1, 0, -1):
+            src = f"{self.path}.{i}"
+            if os.path.exists(src):
+                os.replace(src, f"{self.path}.{i + 1}")
+        if self.backups > 0:
+            os.replace(self.path, f"{self.path}.1")
+        else:
+            os.remove(self.path)
+        self._open()
+
+    def write_lines(self, records):
+        if self._fh is None:
+            self._open()
+        elif self._should_rotate():
+            self._rotate()
+
+        if self.timestamps:
+            data = "".join(
+                f"[{datetime.fromtimestamp(ts).isoformat(timespec='seconds')}] {text}\n"
+                for ts, text in records
+            )
+        else:
+            data = "".join(f"{text}\n" for _, text in records)
+
+        self._fh.write(data)
+        self._fh.flush()
+
+    def close(self):
+        if self._fh is not None:
+            self._fh.close()
+            self._fh = None
+
+
+class LogSink:
+    """
+    Non-blocking log pipeline.
+
+    Producers only enqueue (ts, target, text) records; a full queue
+    drops the record and counts it instead of blocking. One writer
+    thread drains in batches to stdout and/or rotating files, and
+    rate-limits identical messages (at most `rate_max` per target per
+    `rate_window` seconds; the rest are summarized).
+    """
+
+    def __init__(self, stream=None, queue_size=10000, batch_size=512,
+                 flush_interval=0.5, rate_window=60, rate_max=5):
+        self.stream = stream or sys.__stdout__
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.rate_window = rate_window
+        self.rate_max = rate_max
+
+        self.stats = {"enqueued": 0, "written": 0, "dropped": 0, "suppressed": 0}
+        self._stats_lock = threading.Lock()  # produtores e writer contam juntos
+
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._files = {}       # target → [RotatingFile]
+        self._mirror = []      # arquivos que recebem também o stdout
+        self.mirror_enabled = True
+        self._rate = {}        # (target, text) → count na janela atual
+        self._rate_started = time.monotonic()
+        self._reported_drops = 0
+        self._thread = None
+        self._stop = threading.Event()
+
+    # ------------------------------------------------------------
+    # SETUP
+    # ------------------------------------------------------------
+
+    def add_file(self, target, rotating_file, mirror_stdout=False):
+        self._files.setdefault(target, []).append(rotating_file)
+        if mirror_stdout:
+            self._mirror.append(rotating_file)
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="log-sink", daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout=5):
+        """
+        Flush everything queued and stop the writer
+        """
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join(timeout)
+        self._thread = None
+        for files in self._files.values():
+            for f in files:
+                f.close()
+
+    # ------------------------------------------------------------
+    # PRODUCERS
+    # ------------------------------------------------------------
+
+    def emit(self, text, target=STDOUT):
+        record = (time.time(), target, text)
+
+        # sem writer (uso fora do daemon) → escreve direto
+        if self._thread is None:
+            self._write([record])
+            return
+
+        try:
+            self._queue.put_nowait(record)
+            self._count("enqueued")
+        except queue.Full:
+            self._count("dropped")
+
+    def _count(self, name, n=1):
+        with self._stats_lock:
+            self.stats[name] += n
+
+    # ------------------------------------------------------------
+    # WRITER
+    # ------------------------------------------------------------
+
+    def _allow(self, target, text):
+        now = time.monotonic()
+        if now - self._rate_started >= self.rate_window:
+            self._flush_suppressed()
+            self._rate_started = now
+
+        key = (target, text)
+        count = self._rate.get(key, 0) + 1
+        self._rate[key] = count
+        if count > self.rate_max:
+            self._count("suppressed")
+            return False
+        return True
+
+    def _flush_suppressed(self):
+        summary = []
+        for (target, text), count in self._rate.items():
+            if count > self.rate_max:
+                summary.append((
+                    time.time(),
+                    target,
+                    f"[LOG] suppressed {count - self.rate_max} repeat(s) of: {text[:120]}",
+                ))
+        self._rate = {}
+        if summary:
+            self._write(summary, rate_limit=False)
+
+    def _write(self, records, rate_limit=True):
+        by_target = {}
+        for ts, target, text in records:
+            if rate_limit and not self._allow(target, text):
+                continue
+            by_target.setdefault(target, []).append((ts, text))
+
+        for target, items in by_target.items():
+            try:
+                if target == STDOUT:
+                    self.stream.write("".join(f"{text}\n" for _, text in items))
+                    self.stream.flush()
+                    files = self._mirror if self.mirror_enabled else ()
+                else:
+                    files = self._files.get(target, ())
+
+                for f in files:
+                    f.write_lines(items)
+
+                self._count("written", len(items))
+            except Exception:
+                # log nunca derruba o processo
+                pass
+
+    def _drain(self):
+        batch = []
+        try:
+            batch.append(self._queue.get(timeout=self.flush_interval))
+            while len(batch) < self.batch_size:
+                batch.append(self._queue.get_nowait())
+        except queue.Empty:
+            pass
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._drain()
+            if batch:
+                self._write(batch)
+
+            dropped = self.stats["dropped"]
+            if dropped > self._reported_drops:
+                self._write([(time.time(), STDOUT,
+                              f"[LOG] dropped {dropped - self._reported_drops} record(s) (queue full)")],
+                            rate_limit=False)
+                self._reported_drops = dropped
+
+            if self._stop.is_set() and self._queue.empty():
+                self._flush_suppressed()
+                return
+
+
+class SinkStream(io.TextIOBase):
+    """
+    File-like stdout replacement: assembles lines per thread and
+    hands complete lines to the sink, so print() never blocks on I/O
+    """
+
+    def __init__(self, sink, target=STDOUT):
+        self.sink = sink
+        self.target = target
+        self._local = threading.local()
+
+    def writable(self):
+        return True
+
+    def write(self, s):
+        buf = getattr(self._local, "buf", "") + s
+        *lines, rest = buf.split("\n")
+        for line in lines:
+            self.sink.emit(line, self.target)
+        self._local.buf = rest
+        return len(s)
+
+    def flush(self):
+        pass
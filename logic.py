@@ -1,41 +1,204 @@
+import math
+
+from models import Pair
+
+
 def valid_source(c):
     return (
-        not c["ar"] and
-        c["local_pct"] > c["ar_out_target"]
+        not c.ar and
+        c.local_pct > c.ar_out_target
     )
 
 
 def valid_target(c):
     return (
-        c["ar"] and
-        c["local_pct"] < (100 - c["ar_in_target"])
+        c.ar and
+        c.local_pct < (100 - c.ar_in_target)
     )
 
 
-def compute_pfrom(c):
-    return 100 - c["ar_out_target"]
+def affordable_ppm(target, econ_ratio=None, fee_limit_ppm=None):
+    """
+    Highest route fee (ppm) a rebalance into `target` may pay: regolancer's
+    fee_limit_ppm, else econ_ratio × target's local fee rate, else the
+    channel's LNDg ar_max_cost
+    """
+    if fee_limit_ppm:
+        return fee_limit_ppm
+    if econ_ratio is None:
+        econ_ratio = target.ar_max_cost / 100
+    return target.local_fee_rate * econ_ratio
 
 
-def compute_pto(c):
-    # pto é outbound %, e outbound % = local %
-    return 100 - c["ar_in_target"]
+def economically_feasible(target, econ_ratio=None, fee_limit_ppm=None, min_route_ppm=0):
+    """
+    False when no route can meet the fee budget: the last hop alone
+    costs the peer's fee rate on this channel
+    """
+    plausible = target.remote_fee_rate + min_route_ppm
+    return affordable_ppm(target, econ_ratio, fee_limit_ppm) >= plausible
 
-def build_pairs(channels):
+
+def econ_runs_saved(stats, runs, ran_rejected, completed):
+    """
+    Runs the target pre-filter avoided in one cycle. A completed cycle
+    would have run every rejected pair; one cut short by its budget
+    would have spent the same share of its runs on them.
+    """
+    rejected = stats.get("rejected_pairs", 0)
+    skipped = rejected - ran_rejected
+    if completed or not rejected:
+        return skipped
+
+    total = stats["sources"] * stats["targets"] + rejected
+    return min(skipped, round(runs * rejected / total))
+
+
+# a estimativa de um run nunca passa dessa fração do ciclo
+RUN_ESTIMATE_MAX_SHARE = 0.5
+# ciclo que acabou sem iniciar run encolhe a estimativa
+RUN_ESTIMATE_RELAX = 0.8
+
+
+def expected_run(estimate, min_seconds, cycle_seconds):
+    """
+    Run duration the cycle must still have left before a pair starts:
+    `estimate` (EWMA of successful runs), at least `min_seconds`, at most
+    RUN_ESTIMATE_MAX_SHARE of the cycle, so every cycle starts runs
+    """
+    return min(max(min_seconds, estimate or 0), cycle_seconds * RUN_ESTIMATE_MAX_SHARE)
+
+
+def update_run_estimate(estimate, elapsed):
+    """
+    EWMA of successful run durations
+    """
+    return elapsed if estimate is None else 0.8 * estimate + 0.2 * elapsed
+
+
+def _coprime_step(n, rnd):
+    # passo aleatório com gcd(step, n) == 1 → (step*i + offset) % n é permutação
+    if n <= 2:
+        return 1
+    while True:
+        step = rnd.randrange(1, n)
+        if math.gcd(step, n) == 1:
+            return step
+
+
+def iter_pairs(channels, rnd=None, target_ok=None, defer=False, stats=None, fairness=None,
+               target_rank=None):
+    """
+    Yield source × target pairs on demand.
+
+    Only the source and target lists are materialized. With `rnd`,
+    both lists are shuffled and the S×T index space is walked through
+    a random affine permutation, so every pair is visited once in
+    random order without building the pair list.
+
+    `target_ok` is a pre-filter on targets (e.g. economically_feasible):
+    pairs into rejected targets are dropped, or yielded after all the
+    others when `defer` is set. `stats`, if given, receives the counts.
+
+    With `fairness` (a fairness.TargetFairness) the accepted targets are
+    walked in deficit round-robin order instead. Otherwise, with
+    `target_rank` (channel → score, e.g. forward velocity), they are
+    walked highest score first, every source for one target before the
+    next; ties keep the (shuffled) order.
+    """
     sources = [c for c in channels if valid_source(c)]
     targets = [c for c in channels if valid_target(c)]
+    rejected = []
+
+    if target_ok is not None:
+        rejected = [t for t in targets if not target_ok(t)]
+        targets = [t for t in targets if target_ok(t)]
+
+    if stats is not None:
+        stats["sources"] = len(sources)
+        stats["targets"] = len(targets)
+        stats["rejected_targets"] = len(rejected)
+        stats["rejected_pairs"] = len(sources) * len(rejected)
+
+    if fairness is not None:
+        yield from fairness.walk(sources, targets, rnd)
+    elif target_rank is not None:
+        yield from _walk_ranked(sources, targets, rnd, target_rank)
+    else:
+        yield from _walk_pairs(sources, targets, rnd)
+
+    if defer:
+        yield from _walk_pairs(sources, rejected, rnd)
+
+
+def _walk_pairs(sources, targets, rnd):
+    n_src = len(sources)
+    n_tgt = len(targets)
+    total = n_src * n_tgt
+
+    if total == 0:
+        return
+
+    step, offset = 1, 0
+
+    if rnd is not None:
+        rnd.shuffle(sources)
+        rnd.shuffle(targets)
+        step = _coprime_step(total, rnd)
+        offset = rnd.randrange(total)
+
+    for i in range(total):
+        idx = (step * i + offset) % total
+        s = sources[idx // n_tgt]
+        t = targets[idx % n_tgt]
+
+        if s.chan_id == t.chan_id:
+            continue
+
+        yield Pair(s, t)
+
+
+def _walk_ranked(sources, targets, rnd, target_rank):
+    if not sources:
+        return
+
+    if rnd is not None:
+        rnd.shuffle(sources)
+        rnd.shuffle(targets)
+
+    n_src = len(sources)
+    scores = {t.chan_id: target_rank(t) for t in targets}
+    ranked = sorted(targets, key=lambda t: scores[t.chan_id], reverse=True)
+
+    for i, t in enumerate(ranked):
+        # cada alvo começa numa origem diferente
+        start = rnd.randrange(n_src) if rnd is not None else i % n_src
+        for k in range(n_src):
+            s = sources[(start + k) % n_src]
+            if s.chan_id != t.chan_id:
+                yield Pair(s, t)
+
+
+def build_pairs(channels):
+    return list(iter_pairs(channels))
+
+
+def advance_amount_state(state, every, max_inc):
+    """
+    Advance the amount ladder by one cycle (mutates and returns `state`)
+    """
+    state["cycle"] += 1
 
-    pairs = []
+    if state["cycle"] % every == 0:
+        state["increase"] += 1
+        if state["increase"] > max_inc:
+            state["increase"] = 0
 
-    for s in sources:
-        for t in targets:
-            if s["chan_id"] == t["chan_id"]:
-                continue
+    return state
 
-            pairs.append({
-                "source": s,
-                "target": t,
-                "pfrom": compute_pfrom(s),
-                "pto": compute_pto(t),
-            })
 
-    return pairs
+def amount_for_state(state, initial, percent):
+    amount = initial
+    for _ in range(state["increase"]):
+        amount = int(amount * (1 + percent / 100))
+    return amount
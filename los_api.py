@@ -0,0 +1,286 @@
+import asyncio
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import Any, Dict, Optional, Tuple
+
+import aiohttp
+
+from checkpoint import atomic_write_json
+
+# =========================
+# CONFIG
+# =========================
+
+DEFAULT_LOS_BASE_URL = "https://localhost:8443"
+DEFAULT_BASE_DIR = "/home/admin/regolancer-orchestrator"
+
+
+def default_cache_dir() -> str:
+    """
+    los_cache/ under ORCHESTRATOR_BASE_DIR, next to the other state files
+    """
+    base = os.getenv("ORCHESTRATOR_BASE_DIR", DEFAULT_BASE_DIR).rstrip("/")
+    return os.path.join(base, "los_cache")
+
+# =========================
+# CLIENT
+# =========================
+
+class LosClient:
+    """
+    Shared LightningOS API client.
+
+    One pooled keep-alive session lives on a private event loop thread,
+    so blocking callers (notifier, report.py) and other event loops
+    (LOS sync) all reuse the same connections. GET responses are cached
+    for `cache_ttl` seconds in memory and, when `cache_dir` is set, on
+    disk so separate processes can share them. Concurrent requests for
+    the same path share one fetch.
+
+    Returned objects are shared between callers: do not mutate them.
+    """
+
+    def __init__(
+        self,
+        base_url: str = DEFAULT_LOS_BASE_URL,
+        verify_tls: bool = False,
+        timeout: float = 15,
+        cache_ttl: float = 10,
+        cache_dir: Optional[str] = None,
+    ):
+        self.base_url = base_url.rstrip("/")
+        self.verify_tls = verify_tls
+        self.timeout = timeout
+        self.cache_ttl = cache_ttl
+        self.cache_dir = cache_dir or None
+
+        self.stats = {"requests": 0, "cache_hits": 0, "shared": 0}
+
+        self._cache: Dict[str, Any] = {}
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._session: Optional[aiohttp.ClientSession] = None
+
+        self._closed = False
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(
+            target=self._run_loop,
+            name="los-api",
+            daemon=True,
+        )
+        self._thread.start()
+
+    def _run_loop(self) -> None:
+        try:
+            self._loop.run_forever()
+        finally:
+            self._loop.close()
+
+    # ------------------------------------------------------------
+    # CACHE
+    # ------------------------------------------------------------
+
+    def _cache_path(self, path: str) -> str:
+        key = hashlib.sha1(f"{self.base_url}{path}".encode()).hexdigest()[:16]
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def _cache_get(self, path: str) -> Optional[Any]:
+        hit = self._cache.get(path)
+        if hit is not None and hit[0] > time.time():
+            return hit[1]
+
+        if not self.cache_dir:
+            return None
+
+        try:
+            with open(self._cache_path(path)) as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+
+        if float(entry.get("expires", 0)) <= time.time():
+            return None
+
+        self._cache[path] = (entry["expires"], entry["data"])
+        return entry["data"]
+
+    def _cache_put(self, path: str, data: Any) -> None:
+        if self.cache_ttl <= 0:
+            return
+
+        expires = time.time() + self.cache_ttl
+        self._cache[path] = (expires, data)
+
+        if not self.cache_dir:
+            return
+
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            atomic_write_json(self._cache_path(path), {"expires": expires, "data": data})
+        except OSError:
+            pass
+
+    # ------------------------------------------------------------
+    # HTTP (roda no loop do cliente)
+    # ------------------------------------------------------------
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                timeout=aiohttp.ClientTimeout(total=self.timeout, connect=5),
+                connector=aiohttp.TCPConnector(
+                    limit=4,
+                    keepalive_timeout=60,
+                    ssl=None if self.verify_tls else False,
+                ),
+            )
+        return self._session
+
+    async def _request(self, path: str) -> Any:
+        self.stats["requests"] += 1
+        async with self._get_session().get(f"{self.base_url}{path}") as r:
+            if r.status != 200:
+                text = await r.text()
+                raise RuntimeError(f"LOS API error {r.status} on {path}: {text[:200]}")
+            return await r.json(content_type=None)
+
+    async def _get(self, path: str, fresh: bool) -> Any:
+        if not fresh:
+            data = self._cache_get(path)
+            if data is not None:
+                self.stats["cache_hits"] += 1
+                return data
+
+        fut = self._inflight.get(path)
+        if fut is not None:
+            self.stats["shared"] += 1
+            return await asyncio.shield(fut)
+
+        fut = self._loop.create_future()
+        self._inflight[path] = fut
+
+        try:
+            data = await self._request(path)
+            self._cache_put(path, data)
+            fut.set_result(data)
+            return data
+        except BaseException as e:
+            fut.set_exception(e)
+            # evita "exception never retrieved" quando ninguém compartilhou
+            fut.exception()
+            raise
+        finally:
+            self._inflight.pop(path, None)
+
+    # ------------------------------------------------------------
+    # PUBLIC API
+    # ------------------------------------------------------------
+
+    def _submit(self, path: str, fresh: bool):
+        # loop parado (close/reset_client) nunca completaria o future
+        if self._closed or self._loop.is_closed() or not self._thread.is_alive():
+            raise RuntimeError(f"LOS client for {self.base_url} is closed")
+        return asyncio.run_coroutine_threadsafe(self._get(path, fresh), self._loop)
+
+    def get(self, path: str, fresh: bool = False) -> Any:
+        """
+        Blocking GET for threads / scripts
+        """
+        return self._submit(path, fresh).result(timeout=self.timeout + 5)
+
+    async def get_async(self, path: str, fresh: bool = False) -> Any:
+        """
+        GET awaitable from any event loop; fails after the client's
+        timeout (+5s) instead of waiting on a loop that stopped
+        """
+        fut = self._submit(path, fresh)
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(fut), self.timeout + 5)
+        except asyncio.TimeoutError:
+            fut.cancel()
+            raise RuntimeError(f"LOS API timeout on {path}") from None
+
+    def rebalance_history(self) -> Dict[str, Any]:
+        return self.get("/api/rebalance/history")
+
+    def close(self) -> None:
+        if self._closed:
+            return
+        self._closed = True
+
+        async def _close():
+            if self._session is not None:
+                await self._session.close()
+
+        try:
+            asyncio.run_coroutine_threadsafe(_close(), self._loop).result(timeout=5)
+        finally:
+            self._loop.call_soon_threadsafe(self._loop.stop)
+
+# =========================
+# SHARED INSTANCE
+# =========================
+
+_client_lock = threading.Lock()
+_clients: Dict[Tuple[str, bool], LosClient] = {}
+
+
+def client_from_env(base_url: Optional[str] = None, verify_tls: Optional[bool] = None,
+                    cache_dir: Optional[str] = None) -> LosClient:
+    """
+    Client from the LOS_* settings. LOS_CACHE_DIR wins over `cache_dir`;
+    without either, the cache lives under ORCHESTRATOR_BASE_DIR.
+    """
+    setting = os.getenv("LOS_CACHE_DIR")
+    if setting is not None:
+        cache_dir = setting if setting.lower() not in ("", "none", "false") else None
+    elif cache_dir is None:
+        cache_dir = default_cache_dir()
+
+    if base_url is None:
+        base_url = os.getenv("LOS_BASE_URL", DEFAULT_LOS_BASE_URL)
+    if verify_tls is None:
+        verify_tls = os.getenv("LOS_VERIFY_TLS", "false").lower() == "true"
+
+    return LosClient(
+        base_url=base_url,
+        verify_tls=verify_tls,
+        timeout=float(os.getenv("LOS_TIMEOUT_SECONDS", "15")),
+        cache_ttl=float(os.getenv("LOS_CACHE_TTL_SECONDS", "10")),
+        cache_dir=cache_dir,
+    )
+
+
+def get_client(base_url: Optional[str] = None, verify_tls: Optional[bool] = None,
+               cache_dir: Optional[str] = None) -> LosClient:
+    """
+    Process-wide LOS client per (base_url, verify_tls), built on first
+    use; both default to the env settings. `cache_dir` (e.g. the node's
+    directory) only applies when the client is built.
+    """
+    if base_url is None:
+        base_url = os.getenv("LOS_BASE_URL", DEFAULT_LOS_BASE_URL)
+    if verify_tls is None:
+        verify_tls = os.getenv("LOS_VERIFY_TLS", "false").lower() == "true"
+
+    key = (base_url.rstrip("/"), verify_tls)
+
+    with _client_lock:
+        client = _clients.get(key)
+        if client is None:
+            client = client_from_env(*key, cache_dir=cache_dir)
+            _clients[key] = client
+        return client
+
+
+def reset_client() -> None:
+    """
+    Drop all shared clients (e.g. after LOS_* settings change)
+    """
+    with _client_lock:
+        old = list(_clients.values())
+        _clients.clear()
+    for client in old:
+        client.close()
@@ -0,0 +1,385 @@
+import asyncio
+import hashlib
+import json
+import os
+import socket
+import time
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+import aiohttp
+
+import los_api
+from checkpoint import atomic_write_json
+from lndg_api import fetch_all_channels, get_lndg_config
+
+# =========================
+# CONFIG
+# =========================
+
+LOS_INDEX_FILE = "/tmp/los_channels.index.json"
+ERROR_THRESHOLD = 2
+DEFAULT_OUT_TARGET = 5
+
+# campos do LOS que definem o estado alvo no LNDg
+LOS_CHANNEL_FIELDS = (
+    "channel_id",
+    "target_outbound_pct",
+    "auto_enabled",
+    "excluded_as_source",
+    "econ_ratio_override",
+    "use_default_econ_ratio",
+    "eligible_as_target",
+    "eligible_as_source",
+)
+
+# campos do LNDg comparados com o estado alvo
+LNDG_STATE_FIELDS = (
+    "ar_in_target",
+    "ar_out_target",
+    "auto_rebalance",
+    "ar_max_cost",
+)
+
+
+def _env_bool(name: str, default: bool = False) -> bool:
+    val = os.getenv(name)
+    if val is None:
+        return default
+    return val.lower() in ("1", "true", "yes", "on")
+
+# =========================
+# RULES
+# =========================
+
+def desired_lndg_state(
+    los_ch: Dict[str, Any],
+    default_econ_ratio: float,
+    use_target_eligibility: bool = False,
+    use_source_eligibility: bool = False,
+) -> Dict[str, Any]:
+    """
+    LNDg settings a LOS channel maps to (same rules as sync_los_to_lndg.sh)
+    """
+    in_target = 100 - int(los_ch.get("target_outbound_pct") or 0)
+    out_target = 100 if los_ch.get("excluded_as_source") is True else DEFAULT_OUT_TARGET
+
+    ar = los_ch.get("auto_enabled") is True
+    reason = f"auto_enabled = {str(ar).lower()} (fallback)"
+
+    if use_target_eligibility and los_ch.get("eligible_as_target") is True:
+        ar = True
+        reason = "eligible_as_target = true → TARGET"
+
+    if use_source_eligibility and los_ch.get("eligible_as_source") is True:
+        ar = False
+        reason = "eligible_as_source = true → SOURCE"
+
+    override = los_ch.get("econ_ratio_override")
+    if los_ch.get("use_default_econ_ratio") is False and override is not None:
+        econ_ratio = float(override)
+        econ_source = "override"
+    else:
+        econ_ratio = float(default_econ_ratio)
+        econ_source = "default"
+
+    return {
+        "ar_in_target": in_target,
+        "ar_out_target": out_target,
+        "auto_rebalance": ar,
+        # trunca como o `awk printf "%d"` do script (0.555 → 55, 0.29 → 28)
+        "ar_max_cost": int(econ_ratio * 100),
+        "reason": reason,
+        "econ_source": econ_source,
+    }
+
+
+def lndg_diff(current: Dict[str, Any], desired: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Fields whose current LNDg value differs from the desired one,
+    as {field: (current, desired)}
+    """
+    diff = {}
+
+    for field in ("ar_in_target", "ar_out_target", "ar_max_cost"):
+        try:
+            cur = int(current.get(field))
+        except (TypeError, ValueError):
+            cur = current.get(field)
+        if cur != desired[field]:
+            diff[field] = (current.get(field), desired[field])
+
+    cur_ar = bool(current.get("auto_rebalance"))
+    if cur_ar != desired["auto_rebalance"]:
+        diff["auto_rebalance"] = (current.get("auto_rebalance"), desired["auto_rebalance"])
+
+    return diff
+
+
+def channel_fingerprint(los_ch: Dict[str, Any], lndg_state: Dict[str, Any], econ_ratio: Any) -> str:
+    """
+    Digest of everything that decides one channel's sync: its LOS
+    settings, the LOS default econ_ratio and its current LNDg state
+    """
+    payload = json.dumps(
+        [
+            [los_ch.get(k) for k in LOS_CHANNEL_FIELDS],
+            econ_ratio,
+            [lndg_state.get(k) for k in LNDG_STATE_FIELDS],
+        ],
+        separators=(",", ":"),
+        default=str,
+    )
+    return hashlib.blake2b(payload.encode(), digest_size=8).hexdigest()
+
+# =========================
+# ENGINE
+# =========================
+
+class LosSyncEngine:
+    """
+    In-process LOS → LNDg sync.
+
+    One pass: read LOS channels + config (shared los_api client) and
+    LNDg channels over a pooled session, skip channels whose fingerprint is unchanged since
+    the last run, diff the rest in memory and PUT only the changed
+    channels concurrently.
+    """
+
+    def __init__(self, index_file: str = LOS_INDEX_FILE, lndg_config=None, los_client=None):
+        self.index_file = index_file
+        # (base_url, auth) / LosClient de um nó específico; None → env
+        self.lndg_config = lndg_config
+        self.los_client = los_client
+        self.dry_run = _env_bool("LOS_SYNC_DRY_RUN", False)
+        self.concurrency = int(os.getenv("LOS_SYNC_CONCURRENCY", "8"))
+        self.use_target_eligibility = _env_bool("LOS_SYNC_USE_TARGET_ELIGIBILITY", False)
+        self.use_source_eligibility = _env_bool("LOS_SYNC_USE_SOURCE_ELIGIBILITY", False)
+
+        self.telegram_token = os.getenv("TELEGRAM_SYNC_TO_LNDG_TOKEN")
+        self.telegram_chat_id = os.getenv("TELEGRAM_SYNC_TO_LNDG_CHAT_ID")
+        self.send_changes = _env_bool("SEND_SYNC_TO_LNDG_CHANGES_TELEGRAM", True)
+        self.send_errors = _env_bool("SEND_SYNC_TO_LNDG_ERROR_TELEGRAM", True)
+
+        self.index = self._read_index()
+        self.error_count = 0
+        self.last_stats: Optional[Dict[str, Any]] = None
+
+    # ------------------------------------------------------------
+    # FINGERPRINT INDEX (por canal, persistido entre execuções)
+    # ------------------------------------------------------------
+
+    def _read_index(self) -> Dict[str, str]:
+        try:
+            with open(self.index_file) as f:
+                data = json.load(f)
+            return data if isinstance(data, dict) else {}
+        except (OSError, ValueError):
+            return {}
+
+    def _write_index(self) -> None:
+        try:
+            atomic_write_json(self.index_file, self.index)
+        except OSError as e:
+            print(f"[LOS-SYNC] Failed to write {self.index_file}: {e}")
+
+    # ------------------------------------------------------------
+    # HTTP
+    # ------------------------------------------------------------
+
+    async def _put_channel(self, session, sem, base_url, auth, chan_id, body):
+        async with sem:
+            async with session.put(
+                f"{base_url}/api/channels/{chan_id}/",
+                json=body,
+                auth=auth,
+            ) as r:
+                if r.status not in (200, 202, 204):
+                    text = await r.text()
+                    raise RuntimeError(f"LNDg PUT {chan_id} → {r.status}: {text[:200]}")
+
+    async def _send_telegram(self, session: aiohttp.ClientSession, msg: str) -> None:
+        if not self.telegram_token or not self.telegram_chat_id:
+            return
+        try:
+            async with session.post(
+                f"https://api.telegram.org/bot{self.telegram_token}/sendMessage",
+                data={
+                    "chat_id": self.telegram_chat_id,
+                    "text": msg,
+                    "parse_mode": "HTML",
+                },
+                timeout=aiohttp.ClientTimeout(total=10),
+            ) as r:
+                await r.read()
+        except Exception as e:
+            print(f"[LOS-SYNC] Telegram error: {e}")
+
+    # ------------------------------------------------------------
+    # SYNC
+    # ------------------------------------------------------------
+
+    async def run_once(self) -> Dict[str, Any]:
+        started = time.monotonic()
+        stats = {
+            "los_channels": 0,
+            "changed": 0,
+            "updated": 0,
+            "failed": 0,
+            "missing_in_lndg": 0,
+            "skipped": 0,
+            "duration_s": 0.0,
+        }
+
+        base_url, auth = self.lndg_config or get_lndg_config()
+        timeout = aiohttp.ClientTimeout(total=60)
+        connector = aiohttp.TCPConnector(limit=self.concurrency + 2)
+
+        async with aiohttp.ClientSession(timeout=timeout, connector=connector) as session:
+            los = self.los_client or los_api.get_client()
+            los_config, los_data = await asyncio.gather(
+                los.get_async("/api/rebalance/config"),
+                los.get_async("/api/rebalance/channels"),
+            )
+
+            los_channels = los_data.get("channels") or []
+            default_econ = los_config.get("econ_ratio")
+            stats["los_channels"] = len(los_channels)
+
+            if default_econ is None:
+                raise RuntimeError("Could not read default econ_ratio from LOS")
+
+            lndg_raw = await fetch_all_channels(session, base_url, auth, query="limit=1000")
+            lndg_by_id = {str(ch.get("chan_id")): ch for ch in lndg_raw}
+
+            index = {}
+            changes = []
+            for los_ch in los_channels:
+                chan_id = str(los_ch.get("channel_id"))
+                current = lndg_by_id.get(chan_id)
+                if current is None:
+                    stats["missing_in_lndg"] += 1
+                    continue
+
+                fp = channel_fingerprint(los_ch, current, default_econ)
+                if self.index.get(chan_id) == fp:
+                    index[chan_id] = fp
+                    stats["skipped"] += 1
+                    continue
+
+                desired = desired_lndg_state(
+                    los_ch,
+                    default_econ,
+                    self.use_target_eligibility,
+                    self.use_source_eligibility,
+                )
+                diff = lndg_diff(current, desired)
+                if diff:
+                    changes.append((chan_id, los_ch, current, desired, diff))
+                else:
+                    index[chan_id] = fp
+
+            stats["changed"] = len(changes)
+
+            for chan_id, los_ch, current, desired, diff in changes:
+                alias = los_ch.get("peer_alias") or current.get("alias") or "?"
+                fields = ", ".join(f"{k}: {a} → {b}" for k, (a, b) in diff.items())
+                print(f"[LOS-SYNC] {alias} ({chan_id}) {fields} [{desired['reason']}]")
+
+            if changes and not self.dry_run:
+                sem = asyncio.Semaphore(self.concurrency)
+                results = await asyncio.gather(*[
+                    self._put_channel(session, sem, base_url, auth, chan_id, {
+                        "ar_in_target": desired["ar_in_target"],
+                        "ar_out_target": desired["ar_out_target"],
+                        "auto_rebalance": desired["auto_rebalance"],
+                        "ar_amt_target": current.get("ar_amt_target"),
+                        "ar_max_cost": desired["ar_max_cost"],
+                    })
+                    for chan_id, _, current, desired, _ in changes
+                ], return_exceptions=True)
+
+                notify = []
+                for change, res in zip(changes, results):
+                    if isinstance(res, Exception):
+                        stats["failed"] += 1
+                        print(f"[LOS-SYNC] {res}")
+                        continue
+
+                    stats["updated"] += 1
+                    notify.append(change)
+
+                    # LNDg agora está no estado alvo
+                    chan_id, los_ch, current, desired, _ = change
+                    applied = {**current, **{k: desired[k] for k in LNDG_STATE_FIELDS}}
+                    index[chan_id] = channel_fingerprint(los_ch, applied, default_econ)
+
+                if self.send_changes and notify:
+                    await asyncio.gather(*[
+                        self._send_telegram(session, self._change_message(*change))
+                        for change in notify
+                    ])
+
+            # canais com PUT falho ficam fora do índice → reprocessados
+            if index != self.index:
+                self.index = index
+                self._write_index()
+
+        stats["duration_s"] = round(time.monotonic() - started, 2)
+        self.last_stats = stats
+
+        if stats["failed"]:
+            raise RuntimeError(f"{stats['failed']} LNDg update(s) failed")
+
+        return stats
+
+    @staticmethod
+    def _change_message(chan_id, los_ch, current, desired, diff) -> str:
+        alias = los_ch.get("peer_alias") or current.get("alias") or "?"
+        target_fill = 100 - desired["ar_in_target"]
+
+        def cur(field):
+            val = current.get(field)
+            return str(val).lower() if isinstance(val, bool) else val
+
+        return (
+            "🔄 <b>SYNC LOS → LNDg CHANGE</b>\n\n"
+            f"  Channel: {alias}\n"
+            f"  SCID: {chan_id}\n\n"
+            "  In Target:\n"
+            f"  {cur('ar_in_target')}% → {desired['ar_in_target']}% (encher até {target_fill}%)\n\n"
+            "  Out Target:\n"
+            f"  {cur('ar_out_target')}% → {desired['ar_out_target']}%\n\n"
+            "  Auto Rebalance:\n"
+            f"  {cur('auto_rebalance')} → {str(desired['auto_rebalance']).lower()}\n\n"
+            f"  Max Cost ({desired['econ_source']}):\n"
+            f"  {cur('ar_max_cost')}% → {desired['ar_max_cost']}%"
+        )
+
+    async def _send_error(self, error: Exception) -> None:
+        msg = (
+            "🚨 <b>SYNC LOS → LNDg FAILURE</b>\n\n"
+            f"🖥️ Host: {socket.gethostname()}\n"
+            f"🕒 Time: {datetime.now().strftime('%d/%m/%Y %H:%M:%S')}\n\n"
+            f"💬 Description:\n{error}\n\n"
+            f"📊 Consecutive failures: {self.error_count}"
+        )
+        async with aiohttp.ClientSession() as session:
+            await self._send_telegram(session, msg)
+
+    def run(self) -> Dict[str, Any]:
+        """
+        Blocking entry point for the orchestrator thread.
+        Tracks consecutive failures and alerts past ERROR_THRESHOLD.
+        """
+        try:
+            stats = asyncio.run(self.run_once())
+        except Exception as e:
+            self.error_count += 1
+            print(f"[LOS-SYNC] ❗ Consecutive error count: {self.error_count}")
+            if self.send_errors and self.error_count >= ERROR_THRESHOLD:
+                asyncio.run(self._send_error(e))
+            raise
+
+        self.error_count = 0
+        return stats
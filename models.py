@@ -0,0 +1,82 @@
+from dataclasses import dataclass
+
+# =========================
+# CHANNEL / PAIR
+# =========================
+
+@dataclass
+class Channel:
+    """
+    Normalized LNDg channel (see lndg_api.normalize_channels)
+    """
+    __slots__ = (
+        "chan_id",
+        "pubkey",
+        "alias",
+        "capacity",
+        "local",
+        "remote",
+        "local_pct",
+        "ar_out_target",
+        "ar_in_target",
+        "ar",
+        "local_fee_rate",
+        "remote_fee_rate",
+        "ar_max_cost",
+    )
+
+    chan_id: str
+    pubkey: str
+    alias: str
+
+    capacity: int
+    local: int
+    remote: int
+
+    local_pct: int
+    ar_out_target: int
+    ar_in_target: int
+    ar: bool
+
+    # ppm; remote_fee_rate é o que o peer cobra pra nos enviar por este canal
+    local_fee_rate: int
+    remote_fee_rate: int
+    ar_max_cost: int  # % do local_fee_rate (LNDg AR)
+
+
+class Pair:
+    """
+    Source → target candidate. pfrom/pto are derived on access,
+    so a pair only holds two references.
+    """
+    __slots__ = ("source", "target")
+
+    def __init__(self, source: Channel, target: Channel):
+        self.source = source
+        self.target = target
+
+    @property
+    def pfrom(self) -> int:
+        return 100 - self.source.ar_out_target
+
+    @property
+    def pto(self) -> int:
+        # pto é outbound %, e outbound % = local %
+        return 100 - self.target.ar_in_target
+
+    def __repr__(self):
+        return f"Pair({self.source.alias} → {self.target.alias})"
+
+
+@dataclass
+class RunResult:
+    """
+    Outcome of one regolancer run
+    """
+    __slots__ = ("ok", "elapsed", "budget", "returncode", "overrun")
+
+    ok: bool
+    elapsed: float
+    budget: float
+    returncode: int
+    overrun: bool
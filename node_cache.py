@@ -0,0 +1,131 @@
+import os
+import shutil
+import threading
+import time
+from typing import Any, Dict, Optional
+
+# =========================
+# NODE CACHE
+# =========================
+
+class NodeCache:
+    """
+    Orchestrator-owned copy of regolancer's `node_cache_filename`.
+
+    One master file lives under `work_dir`. Every run gets a private
+    snapshot of it (so parallel regolancer processes never write the
+    same file), and a snapshot the run refreshed is renamed over the
+    master atomically. The cache format is opaque to us, so merging is
+    "newest finished run wins".
+    """
+
+    def __init__(self, work_dir: str):
+        self.work_dir = work_dir
+        self.master = os.path.join(work_dir, "master.dat")
+
+        self._lock = threading.Lock()
+        self.counters = {"snapshots": 0, "merges": 0, "unchanged": 0, "swept": 0}
+
+    def warm(self, seed: Optional[str] = None) -> None:
+        """
+        Create the work dir and, if there is no master yet, seed it
+        once from `seed` (the template's cache file)
+        """
+        os.makedirs(self.work_dir, exist_ok=True)
+
+        with self._lock:
+            if os.path.exists(self.master) or not seed or not os.path.isfile(seed):
+                return
+
+            tmp = self.master + ".tmp"
+            shutil.copyfile(seed, tmp)
+            os.replace(tmp, self.master)
+
+    def sweep(self, max_age: float) -> int:
+        """
+        Remove run snapshots older than `max_age` seconds (left behind
+        by runs that died before checkin); returns how many
+        """
+        cutoff = time.time() - max_age
+        removed = 0
+
+        try:
+            names = os.listdir(self.work_dir)
+        except FileNotFoundError:
+            return 0
+
+        for name in names:
+            if not (name.startswith("run-") and name.endswith(".dat")):
+                continue
+            path = os.path.join(self.work_dir, name)
+            try:
+                if os.stat(path).st_mtime < cutoff:
+                    os.remove(path)
+                    removed += 1
+            except FileNotFoundError:
+                pass
+
+        with self._lock:
+            self.counters["swept"] += removed
+        return removed
+
+    def checkout(self, run_id: str):
+        """
+        Private snapshot path for one run, plus the (mtime, size) it
+        started with so checkin can tell whether regolancer rewrote it
+        """
+        path = os.path.join(self.work_dir, f"run-{run_id}.dat")
+
+        with self._lock:
+            self.counters["snapshots"] += 1
+            try:
+                shutil.copyfile(self.master, path)
+            except FileNotFoundError:
+                # sem master ainda: o regolancer cria o arquivo do zero
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+                return path, None
+
+        st = os.stat(path)
+        return path, (st.st_mtime_ns, st.st_size)
+
+    def checkin(self, path: str, before) -> bool:
+        """
+        Promote a refreshed snapshot to master; drop it otherwise
+        """
+        try:
+            st = os.stat(path)
+        except FileNotFoundError:
+            return False
+
+        refreshed = st.st_size > 0 and (st.st_mtime_ns, st.st_size) != before
+
+        with self._lock:
+            if refreshed:
+                os.replace(path, self.master)
+                self.counters["merges"] += 1
+                return True
+
+            self.counters["unchanged"] += 1
+
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        return False
+
+    def stats(self) -> Dict[str, Any]:
+        try:
+            st = os.stat(self.master)
+            age = round(time.time() - st.st_mtime, 1)
+            size = st.st_size
+        except FileNotFoundError:
+            age = None
+            size = 0
+
+        with self._lock:
+            counters = dict(self.counters)
+
+        return {"age_s": age, "size_bytes": size, **counters}
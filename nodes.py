@@ -0,0 +1,106 @@
+import json
+import os
+from dataclasses import dataclass, fields
+from typing import Any, Dict, List
+
+# =========================
+# NODE REGISTRY
+# =========================
+
+@dataclass
+class Node:
+    """
+    One LND node driven by the orchestrator: its LNDg / LOS endpoints,
+    regolancer template and state directory, and its worker budget
+    """
+    __slots__ = (
+        "name",
+        "base_dir",
+        "template_file",
+        "regolancer_bin",
+        "max_workers",
+        "lndg_base_url",
+        "lndg_user",
+        "lndg_pass",
+        "los_base_url",
+        "los_verify_tls",
+    )
+
+    name: str
+    base_dir: str
+    template_file: str
+    regolancer_bin: str
+    max_workers: int
+
+    lndg_base_url: str
+    lndg_user: str
+    lndg_pass: str
+
+    los_base_url: str
+    los_verify_tls: bool
+
+    def path(self, *parts: str) -> str:
+        return os.path.join(self.base_dir, *parts)
+
+
+REQUIRED_KEYS = ("name", "base_dir", "lndg_user", "lndg_pass")
+
+
+def node_from_dict(entry: Dict[str, Any], defaults: Node) -> Node:
+    """
+    Build a Node from a registry entry; anything not given falls back
+    to `defaults` (the .env node), paths fall back to `base_dir`
+    """
+    missing = [k for k in REQUIRED_KEYS if not entry.get(k)]
+    if missing:
+        raise ValueError(f"node {entry.get('name', '?')!r}: missing {', '.join(missing)}")
+
+    unknown = set(entry) - {f.name for f in fields(Node)}
+    if unknown:
+        raise ValueError(f"node {entry['name']!r}: unknown key(s) {', '.join(sorted(unknown))}")
+
+    base_dir = str(entry["base_dir"]).rstrip("/")
+
+    return Node(
+        name=str(entry["name"]),
+        base_dir=base_dir,
+        template_file=entry.get("template_file") or os.path.join(base_dir, "config.template.json"),
+        regolancer_bin=entry.get("regolancer_bin") or defaults.regolancer_bin,
+        max_workers=int(entry.get("max_workers", defaults.max_workers)),
+
+        lndg_base_url=str(entry.get("lndg_base_url") or defaults.lndg_base_url).rstrip("/"),
+        lndg_user=entry["lndg_user"],
+        lndg_pass=entry["lndg_pass"],
+
+        los_base_url=str(entry.get("los_base_url") or defaults.los_base_url).rstrip("/"),
+        los_verify_tls=bool(entry.get("los_verify_tls", defaults.los_verify_tls)),
+    )
+
+
+def load_nodes(path: str, defaults: Node) -> List[Node]:
+    """
+    Nodes from the registry file ({"nodes": [...]}), or just `defaults`
+    when there is no registry
+    """
+    if not path or not os.path.exists(path):
+        return [defaults]
+
+    with open(path) as f:
+        data = json.load(f)
+
+    entries = data.get("nodes") if isinstance(data, dict) else data
+    if not entries:
+        raise ValueError(f"{path}: no nodes defined")
+
+    nodes = [node_from_dict(e, defaults) for e in entries]
+
+    names = [n.name for n in nodes]
+    dupes = {n for n in names if names.count(n) > 1}
+    if dupes:
+        raise ValueError(f"{path}: duplicate node name(s) {', '.join(sorted(dupes))}")
+
+    dirs = [n.base_dir for n in nodes]
+    if len(set(dirs)) != len(dirs):
+        raise ValueError(f"{path}: nodes must not share a base_dir")
+
+    return nodes
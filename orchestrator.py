@@ -7,18 +7,47 @@ import json
 import subprocess
 import tempfile
 import threading
+from collections import deque
 import sys
 import random
+import signal
+import contextlib
+import socket
 sys.stdout.reconfigure(line_buffering=True)
 import urllib3
 urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
 from datetime import datetime
-from dotenv import load_dotenv
-from lndg_api import load_channels
-from logic import build_pairs
-from logging_utils import log_pair
-
-load_dotenv()
+from dotenv import dotenv_values, find_dotenv, load_dotenv
+from lndg_api import load_channels, make_lndg_config
+from los_sync import LosSyncEngine
+import los_api
+from logic import (
+    iter_pairs, economically_feasible, econ_runs_saved, valid_target,
+    expected_run, update_run_estimate, RUN_ESTIMATE_MAX_SHARE, RUN_ESTIMATE_RELAX,
+    advance_amount_state, amount_for_state,
+)
+from logging_utils import log_pair, LogSink, RotatingFile, SinkStream
+from models import Channel, RunResult
+from checkpoint import load_checkpoint, save_checkpoint, read_json, resume_snapshot
+from flight_recorder import FlightRecorder, CaptureStore
+from node_cache import NodeCache
+from nodes import Node, load_nodes
+from coordination import LeaseStore, owner_of
+from state_store import StateStore
+from fairness import TargetFairness
+from pair_selector import PairSelector, MODES as SELECTOR_MODES
+from liquidity import LiquidityProjection
+from status import StatusBoard
+from concurrency import AIMDController
+from breaker import CircuitBreaker, CircuitOpen, OPEN
+from latency import LatencyHistograms
+from velocity import ForwardVelocity
+
+ENV_FILE = os.getenv("ORCHESTRATOR_ENV_FILE") or find_dotenv()
+# ambiente de antes do .env: chave apagada do .env volta a este valor no reload
+STARTUP_ENV = dict(os.environ)
+load_dotenv(ENV_FILE)
+ENV_FILE_KEYS = set(dotenv_values(ENV_FILE)) if ENV_FILE else set()
 
 # =========================
 # ENV HELPERS
@@ -34,82 +63,567 @@ def env_bool(name: str, default: bool = False) -> bool:
 # CONFIG (ENV)
 # =========================
 
+SETTING_NAMES = (
+    "LOG_OPERATIONAL",
+    "RUN_FOREVER",
+    "SLEEP_SECONDS",
+    "MAX_WORKERS",
+    "ADAPTIVE_CONCURRENCY",
+    "CONCURRENCY_MIN",
+    "CONCURRENCY_WINDOW",
+    "CONCURRENCY_BACKOFF",
+    "MAX_CYCLE_SECONDS",
+    "MIN_RUN_SECONDS",
+    "RUN_KILL_GRACE_SECONDS",
+    "TIMEOUT_TUNING",
+    "TIMEOUT_PERCENTILE",
+    "TIMEOUT_MARGIN_SECONDS",
+    "TIMEOUT_MIN_SECONDS",
+    "TIMEOUT_MIN_SAMPLES",
+    "TIMEOUT_EXPLORE",
+    "RANDOMIZE_PAIRS",
+    "TARGET_FAIRNESS",
+    "PAIR_SELECTOR",
+    "PAIR_SELECTOR_HALF_LIFE_HOURS",
+    "PAIR_SELECTOR_MAX_RANKED",
+    "FORWARD_VELOCITY_ORDER",
+    "FORWARD_VELOCITY_WINDOW_HOURS",
+    "LIQUIDITY_PROJECTION",
+    "ECON_FILTER",
+    "ECON_MIN_ROUTE_PPM",
+    "ENABLE_FILE_LOGS",
+    "DRY_RUN",
+    "REGOLANCER_LIVE_LOGS",
+    "REGOLANCER_CAPTURE",
+    "REGOLANCER_CAPTURE_BYTES",
+    "LOG_TEMPLATE_CONFIG",
+    "SYNC_LOS_TO_LNDG",
+    "LOS_SYNC_ENGINE",
+    "SEND_REBALANCE_MSG_REGO_ORCH",
+    "SEND_REBALANCE_MSG_LNDG",
+    "SEND_REBALANCE_MSG_LOS",
+    "LNDG_BASE_URL",
+    "LNDG_USER",
+    "LNDG_PASS",
+    "LOS_BASE_URL",
+    "LOS_VERIFY_TLS",
+    "TELEGRAM_TOKEN",
+    "TELEGRAM_CHAT_ID",
+    "TELEGRAM_API_URL",
+)
+
+def load_settings():
+    """
+    (Re)read every reloadable setting from the environment
+    """
+    global LOG_OPERATIONAL, RUN_FOREVER, SLEEP_SECONDS, MAX_WORKERS
+    global ADAPTIVE_CONCURRENCY, CONCURRENCY_MIN, CONCURRENCY_WINDOW, CONCURRENCY_BACKOFF
+    global MAX_CYCLE_SECONDS, MIN_RUN_SECONDS, RUN_KILL_GRACE_SECONDS
+    global TIMEOUT_TUNING, TIMEOUT_PERCENTILE, TIMEOUT_MARGIN_SECONDS
+    global TIMEOUT_MIN_SECONDS, TIMEOUT_MIN_SAMPLES, TIMEOUT_EXPLORE
+    global RANDOMIZE_PAIRS, TARGET_FAIRNESS, ECON_FILTER, ECON_MIN_ROUTE_PPM
+    global PAIR_SELECTOR, PAIR_SELECTOR_HALF_LIFE_HOURS, PAIR_SELECTOR_MAX_RANKED, LIQUIDITY_PROJECTION
+    global FORWARD_VELOCITY_ORDER, FORWARD_VELOCITY_WINDOW_HOURS
+    global ENABLE_FILE_LOGS, DRY_RUN, REGOLANCER_LIVE_LOGS
+    global REGOLANCER_CAPTURE, REGOLANCER_CAPTURE_BYTES
+    global LOG_TEMPLATE_CONFIG, SYNC_LOS_TO_LNDG, LOS_SYNC_ENGINE
+    global SEND_REBALANCE_MSG_REGO_ORCH, SEND_REBALANCE_MSG_LNDG, SEND_REBALANCE_MSG_LOS
+    global LNDG_BASE_URL, LNDG_USER, LNDG_PASS, LOS_BASE_URL, LOS_VERIFY_TLS
+    global TELEGRAM_TOKEN, TELEGRAM_CHAT_ID, TELEGRAM_API_URL
+
+    # ------------------------------------------------------------
+    # GENERAL EXECUTION
+    # ------------------------------------------------------------
+    LOG_OPERATIONAL      = env_bool("LOG_OPERATIONAL", False)
+    RUN_FOREVER          = env_bool("RUN_FOREVER", True)
+    SLEEP_SECONDS        = int(os.getenv("SLEEP_SECONDS", "5"))
+    MAX_WORKERS          = int(os.getenv("MAX_WORKERS", "1"))
+    ADAPTIVE_CONCURRENCY = env_bool("ADAPTIVE_CONCURRENCY", False)
+    CONCURRENCY_MIN      = int(os.getenv("CONCURRENCY_MIN", "1"))
+    CONCURRENCY_WINDOW   = int(os.getenv("CONCURRENCY_WINDOW", "20"))
+    CONCURRENCY_BACKOFF  = float(os.getenv("CONCURRENCY_BACKOFF", "0.5"))
+    MAX_CYCLE_SECONDS    = int(os.getenv("MAX_CYCLE_SECONDS", "300"))
+    MIN_RUN_SECONDS      = int(os.getenv("MIN_RUN_SECONDS", "20"))
+    RUN_KILL_GRACE_SECONDS = int(os.getenv("RUN_KILL_GRACE_SECONDS", "10"))
+    if MIN_RUN_SECONDS > MAX_CYCLE_SECONDS * RUN_ESTIMATE_MAX_SHARE:
+        print(
+            f"[CONFIG] ⚠️ MIN_RUN_SECONDS={MIN_RUN_SECONDS} is over "
+            f"{RUN_ESTIMATE_MAX_SHARE:.0%} of MAX_CYCLE_SECONDS={MAX_CYCLE_SECONDS} "
+            f"→ expected run capped at {MAX_CYCLE_SECONDS * RUN_ESTIMATE_MAX_SHARE:g}s"
+        )
+    TIMEOUT_TUNING       = env_bool("TIMEOUT_TUNING", False)
+    TIMEOUT_PERCENTILE   = float(os.getenv("TIMEOUT_PERCENTILE", "95"))
+    TIMEOUT_MARGIN_SECONDS = float(os.getenv("TIMEOUT_MARGIN_SECONDS", "30"))
+    TIMEOUT_MIN_SECONDS  = float(os.getenv("TIMEOUT_MIN_SECONDS", "60"))
+    TIMEOUT_MIN_SAMPLES  = float(os.getenv("TIMEOUT_MIN_SAMPLES", "5"))
+    TIMEOUT_EXPLORE      = float(os.getenv("TIMEOUT_EXPLORE", "0.05"))
+    RANDOMIZE_PAIRS      = env_bool("RANDOMIZE_PAIRS", True)
+    TARGET_FAIRNESS      = env_bool("TARGET_FAIRNESS", False)
+    PAIR_SELECTOR        = os.getenv("PAIR_SELECTOR", "off").lower()  # off | thompson | ucb
+    PAIR_SELECTOR_HALF_LIFE_HOURS = float(os.getenv("PAIR_SELECTOR_HALF_LIFE_HOURS", "24"))
+    PAIR_SELECTOR_MAX_RANKED = int(os.getenv("PAIR_SELECTOR_MAX_RANKED", "1000"))  # 0 = todos
+    FORWARD_VELOCITY_ORDER = env_bool("FORWARD_VELOCITY_ORDER", False)
+    FORWARD_VELOCITY_WINDOW_HOURS = float(os.getenv("FORWARD_VELOCITY_WINDOW_HOURS", "24"))
+    LIQUIDITY_PROJECTION = env_bool("LIQUIDITY_PROJECTION", True)
+    ECON_FILTER          = os.getenv("ECON_FILTER", "rank").lower()  # off | drop | rank
+    ECON_MIN_ROUTE_PPM   = int(os.getenv("ECON_MIN_ROUTE_PPM", "0"))
+    ENABLE_FILE_LOGS     = env_bool("ENABLE_FILE_LOGS", False)
+
+    DRY_RUN              = env_bool("DRY_RUN", True)
+    REGOLANCER_LIVE_LOGS = env_bool("REGOLANCER_LIVE_LOGS", True)
+    REGOLANCER_CAPTURE   = env_bool("REGOLANCER_CAPTURE", True)
+    # saída do regolancer fica num ring buffer; só vai pro disco se o run falhar
+    REGOLANCER_CAPTURE_BYTES = int(os.getenv("REGOLANCER_CAPTURE_BYTES", "65536"))
+    if REGOLANCER_CAPTURE_BYTES < 0:
+        print(f"[CONFIG] REGOLANCER_CAPTURE_BYTES={REGOLANCER_CAPTURE_BYTES} < 0 → 0 (capture off)")
+        REGOLANCER_CAPTURE_BYTES = 0
+    LOG_TEMPLATE_CONFIG  = env_bool("LOG_TEMPLATE_CONFIG", False)
+
+    SYNC_LOS_TO_LNDG     = env_bool("SYNC_LOS_TO_LNDG", False)
+    LOS_SYNC_ENGINE      = os.getenv("LOS_SYNC_ENGINE", "native").lower()
+
+
+    # ------------------------------------------------------------
+    # TELEGRAM — REBALANCE NOTIFICATIONS
+    # ------------------------------------------------------------
+    SEND_REBALANCE_MSG_REGO_ORCH = env_bool("SEND_REBALANCE_MSG_REGO_ORCH", True)
+    SEND_REBALANCE_MSG_LNDG      = env_bool("SEND_REBALANCE_MSG_LNDG", True)
+    SEND_REBALANCE_MSG_LOS       = env_bool("SEND_REBALANCE_MSG_LOS", True)
+
+
+    # ------------------------------------------------------------
+    # LNDg CONFIG
+    # ------------------------------------------------------------
+    LNDG_BASE_URL = os.getenv("LNDG_BASE_URL", "http://localhost:8889").rstrip("/")
+    LNDG_USER     = os.getenv("LNDG_USER")
+    LNDG_PASS     = os.getenv("LNDG_PASS")
+
+
+    # ------------------------------------------------------------
+    # LOS CONFIG
+    # ------------------------------------------------------------
+    LOS_BASE_URL  = os.getenv("LOS_BASE_URL", "https://localhost:8443").rstrip("/")
+    LOS_VERIFY_TLS = os.getenv("LOS_VERIFY_TLS", "false").lower() == "true"
+
+
+    # ------------------------------------------------------------
+    # TELEGRAM
+    # ------------------------------------------------------------
+    TELEGRAM_TOKEN   = os.getenv("TELEGRAM_TOKEN")
+    TELEGRAM_CHAT_ID = os.getenv("TELEGRAM_CHAT_ID")
+    TELEGRAM_API_URL = f"https://api.telegram.org/bot{TELEGRAM_TOKEN}/sendMessage"
+
+
+load_settings()
+
 # ------------------------------------------------------------
-# GENERAL EXECUTION
+# BASE DIRECTORY
 # ------------------------------------------------------------
-LOG_OPERATIONAL      = env_bool("LOG_OPERATIONAL", False)
-RUN_FOREVER          = env_bool("RUN_FOREVER", True)
-SLEEP_SECONDS        = int(os.getenv("SLEEP_SECONDS", "5"))
-MAX_WORKERS          = int(os.getenv("MAX_WORKERS", "1"))
-MAX_CYCLE_SECONDS    = int(os.getenv("MAX_CYCLE_SECONDS", "300"))
-RANDOMIZE_PAIRS      = env_bool("RANDOMIZE_PAIRS", True)
-ENABLE_FILE_LOGS     = env_bool("ENABLE_FILE_LOGS", False)
-
-DRY_RUN              = env_bool("DRY_RUN", True)
-REGOLANCER_LIVE_LOGS = env_bool("REGOLANCER_LIVE_LOGS", True)
-LOG_TEMPLATE_CONFIG  = env_bool("LOG_TEMPLATE_CONFIG", False)
-
-SYNC_LOS_TO_LNDG     = env_bool("SYNC_LOS_TO_LNDG", False)
+BASE_DIR = os.getenv("ORCHESTRATOR_BASE_DIR", "/home/admin/regolancer-orchestrator").rstrip("/")
 
 
 # ------------------------------------------------------------
-# TELEGRAM — REBALANCE NOTIFICATIONS
+# SYSTEM PATHS
 # ------------------------------------------------------------
-SEND_REBALANCE_MSG_REGO_ORCH = env_bool("SEND_REBALANCE_MSG_REGO_ORCH", True)
-SEND_REBALANCE_MSG_LNDG      = env_bool("SEND_REBALANCE_MSG_LNDG", True)
-SEND_REBALANCE_MSG_LOS       = env_bool("SEND_REBALANCE_MSG_LOS", True)
+REGOLANCER_BIN   = os.getenv("REGOLANCER_BIN", os.path.join(BASE_DIR, "regolancer"))
+TEMPLATE_FILE    = os.path.join(BASE_DIR, "config.template.json")
+REPORT_PY        = os.path.join(BASE_DIR, "report.py")
 
+ERROR_LOG_FILE             = os.path.join(BASE_DIR, "errors.log")
+MAIN_LOG_FILE              = os.path.join(BASE_DIR, "orchestrator.log")
 
-# ------------------------------------------------------------
-# LNDg CONFIG
-# ------------------------------------------------------------
-LNDG_BASE_URL = os.getenv("LNDG_BASE_URL", "http://localhost:8889").rstrip("/")
-LNDG_USER     = os.getenv("LNDG_USER")
-LNDG_PASS     = os.getenv("LNDG_PASS")
+SYNC_SCRIPT_PATH           = os.path.join(BASE_DIR, "sync_los_to_lndg.sh")
+NODES_FILE                 = os.getenv("NODES_FILE", os.path.join(BASE_DIR, "nodes.json"))
+
+# =========================
+# LOG SINK
+# =========================
+# prints e erros viram registros numa fila; uma thread grava em lote
+
+LOG_QUEUE_SIZE         = int(os.getenv("LOG_QUEUE_SIZE", "10000"))
+LOG_MAX_BYTES          = int(os.getenv("LOG_MAX_BYTES", str(10 * 1024 * 1024)))
+LOG_ROTATE_WHEN        = os.getenv("LOG_ROTATE_WHEN", "size").lower()  # size | daily
+LOG_BACKUPS            = int(os.getenv("LOG_BACKUPS", "5"))
+LOG_RATE_WINDOW_SECONDS = float(os.getenv("LOG_RATE_WINDOW_SECONDS", "60"))
+LOG_RATE_MAX           = int(os.getenv("LOG_RATE_MAX", "20"))
+
+ERRORS = "errors"
+
+LOG_SINK = LogSink(
+    queue_size=LOG_QUEUE_SIZE,
+    rate_window=LOG_RATE_WINDOW_SECONDS,
+    rate_max=LOG_RATE_MAX,
+)
+LOG_SINK.add_file(
+    ERRORS,
+    RotatingFile(ERROR_LOG_FILE, LOG_MAX_BYTES, LOG_ROTATE_WHEN, LOG_BACKUPS, timestamps=True),
+)
+LOG_SINK.add_file(
+    "main",
+    RotatingFile(MAIN_LOG_FILE, LOG_MAX_BYTES, LOG_ROTATE_WHEN, LOG_BACKUPS, timestamps=True),
+    mirror_stdout=True,
+)
+LOG_SINK.mirror_enabled = ENABLE_FILE_LOGS
+
+
+def start_log_sink():
+    """
+    Start the writer thread and route print() through the sink
+    """
+    LOG_SINK.start()
+    sys.stdout = SinkStream(LOG_SINK)
+    print(
+        f"[LOG] sink started (queue={LOG_QUEUE_SIZE} rotate={LOG_ROTATE_WHEN} "
+        f"file_logs={ENABLE_FILE_LOGS})"
+    )
 
 
-# ------------------------------------------------------------
-# LOS CONFIG
-# ------------------------------------------------------------
-LOS_BASE_URL  = os.getenv("LOS_BASE_URL", "https://localhost:8443").rstrip("/")
-LOS_VERIFY_TLS = os.getenv("LOS_VERIFY_TLS", "false").lower() == "true"
+def log_error(msg: str):
+    # só enfileira; timestamp e escrita ficam com a thread do sink
+    LOG_SINK.emit(msg, ERRORS)
+
+# =========================
+# COORDINATION
+# =========================
+# várias instâncias no mesmo nó: leases num SQLite local compartilhado
+
+COORDINATION_DB   = os.getenv("COORDINATION_DB", "")
+INSTANCE_ID       = os.getenv("ORCHESTRATOR_INSTANCE_ID") or f"{socket.gethostname()}-{os.getpid()}"
+LEASE_TTL_SECONDS = int(os.getenv("LEASE_TTL_SECONDS", "90"))
+
+LEASES = LeaseStore(COORDINATION_DB, INSTANCE_ID) if COORDINATION_DB else None
+
+# =========================
+# NODES
+# =========================
+# sem nodes.json → um único nó "default" montado a partir do .env
+
+CAPTURE_KEEP = int(os.getenv("REGOLANCER_CAPTURE_KEEP", "50"))
+
+# cada run usa sua própria cópia do node cache (ver node_cache.py)
+NODE_CACHE_MANAGED = env_bool("REGOLANCER_NODE_CACHE", True)
+
+# saldo movido por runs ainda não visto no LNDg (ver liquidity.py)
+PROJECTION_MAX_AGE_SECONDS = int(os.getenv("PROJECTION_MAX_AGE_SECONDS", "900"))
+
+RECENT_OUTCOMES_MAX = 200
+
+
+def _read_text(path):
+    try:
+        with open(path) as f:
+            return f.read().strip() or None
+    except OSError:
+        return None
+
+
+def legacy_state(node):
+    """
+    Readers for the one-file-per-value state used before state.json
+    (imported once, on the first start with a StateStore)
+    """
+    telegram_dir = node.path("telegram")
+
+    def cursor(filename):
+        def read():
+            text = _read_text(os.path.join(telegram_dir, filename))
+            return int(text) if text and text.isdigit() else None
+        return read
+
+    return {
+        "amount_state": lambda: read_json(node.path("amount_state.json")),
+        "cursor:rego_offset": cursor("last_rego_offset.txt"),
+        "cursor:lndg_id": cursor("last_lndg_id.txt"),
+        "cursor:los_id": cursor("last_los_id.txt"),
+        "last_report_date": lambda: _read_text(node.path("last_report_date.txt")),
+        "last_report_error_date": lambda: _read_text(node.path("last_report_error_date.txt")),
+    }
+
+
+def default_node():
+    """
+    The single node described by .env (and the defaults for nodes.json)
+    """
+    return Node(
+        name="default",
+        base_dir=BASE_DIR,
+        template_file=TEMPLATE_FILE,
+        regolancer_bin=REGOLANCER_BIN,
+        max_workers=MAX_WORKERS,
+        lndg_base_url=LNDG_BASE_URL,
+        lndg_user=LNDG_USER,
+        lndg_pass=LNDG_PASS,
+        los_base_url=LOS_BASE_URL,
+        los_verify_tls=LOS_VERIFY_TLS,
+    )
+
+
+class NodeContext:
+    """
+    Per-node state: paths, template, amount ladder, run estimate,
+    scheduler state and worker threads
+    """
+
+    def __init__(self, node):
+        self.node = node
+        self.name = node.name
+
+        self.success_rebal_file     = node.path("success-rebal.csv")
+        self.checkpoint_file        = node.path(
+            "checkpoint.json" if LEASES is None else f"checkpoint-{INSTANCE_ID}.json"
+        )
+        self.los_sync_index_file    = node.path("los_sync_index.json")
+
+        # escada de amount, cursores do notifier e datas do relatório
+        self.state = StateStore(node.path("state.json"), legacy=legacy_state(node))
+
+        self.captures = CaptureStore(node.path("captures"), keep=CAPTURE_KEEP)
+        self.node_cache = NodeCache(node.path("node_cache"))
+
+        self.template = None
+        self.run_estimate = None  # EWMA (s) de runs bem-sucedidos
+
+        self.worker_state = {}     # wid → ciclo em andamento
+        self.recent_outcomes = deque(maxlen=RECENT_OUTCOMES_MAX)
+        self.last_snapshot = None  # (wall ts, channels)
+        self.econ_runs_saved = 0
+        self.fairness = TargetFairness()  # DRR por canal alvo (TARGET_FAIRNESS)
+
+        # aprende sempre; só ordena os pares com PAIR_SELECTOR ligado
+        self.selector_file = node.path(
+            "pair_selector.gz" if LEASES is None else f"pair_selector-{INSTANCE_ID}.gz"
+        )
+        self.selector = PairSelector(half_life=PAIR_SELECTOR_HALF_LIFE_HOURS * 3600)
+        self.projection = LiquidityProjection(max_age=PROJECTION_MAX_AGE_SECONDS)
+        # durações de runs bem-sucedidos (TIMEOUT_TUNING); registra sempre
+        self.latency_file = node.path(
+            "latency.json" if LEASES is None else f"latency-{INSTANCE_ID}.json"
+        )
+        self.latency = LatencyHistograms()
+        self.tuned_runs = 0
+        # sats/h de saída por canal, dos forwards do LNDg (FORWARD_VELOCITY_ORDER)
+        self.forwards_file = node.path(
+            "forward_velocity.json" if LEASES is None else f"forward_velocity-{INSTANCE_ID}.json"
+        )
+        self.forwards = ForwardVelocity()
+        # runs simultâneos entre CONCURRENCY_MIN e max_workers (ADAPTIVE_CONCURRENCY)
+        self.concurrency = AIMDController(
+            min(CONCURRENCY_MIN, node.max_workers), node.max_workers,
+            window=CONCURRENCY_WINDOW, backoff=CONCURRENCY_BACKOFF,
+        )
+
+        self.breakers = {}  # endpoint → CircuitBreaker (criados sob demanda)
+
+        self.resume_workers = {}
+        self.resume_snapshot = None  # (taken_at, channels) do checkpoint
+
+        self.workers = {}
+        self.los_sync_engine = None
+        self.roles = set()  # leases de papel (notifier, report, los-sync) em mãos
+        self.notifier_status = {}  # última passada (endpoint de status)
+        self.los_sync_status = {}
+
+    def tag(self, worker_id):
+        return f"W{worker_id}" if not MULTI_NODE else f"{self.name}/W{worker_id}"
+
+    def label(self, text):
+        return text if not MULTI_NODE else f"{text} @ {self.name}"
+
+    def lndg_config(self):
+        n = self.node
+        return make_lndg_config(n.lndg_base_url, n.lndg_user, n.lndg_pass)
+
+    def los_client(self):
+        return los_api.get_client(self.node.los_base_url, self.node.los_verify_tls,
+                                  cache_dir=self.node.path("los_cache"))
 
+    def env(self):
+        """
+        Environment for per-node child processes (report.py, sync script)
+        """
+        n = self.node
+        return {
+            **os.environ,
+            "ORCHESTRATOR_BASE_DIR": n.base_dir,
+            "LNDG_BASE_URL": n.lndg_base_url,
+            "LNDG_USER": n.lndg_user or "",
+            "LNDG_PASS": n.lndg_pass or "",
+            "LOS_BASE_URL": n.los_base_url,
+            "LOS_VERIFY_TLS": "true" if n.los_verify_tls else "false",
+        }
+
+
+NODES = [NodeContext(n) for n in load_nodes(NODES_FILE, default_node())]
+MULTI_NODE = len(NODES) > 1 or NODES[0].name != "default"
+
+
+def reload_nodes():
+    """
+    Refresh node settings after a config reload. Adding or removing
+    nodes needs a restart.
+    """
+    fresh = {n.name: n for n in load_nodes(NODES_FILE, default_node())}
+    current = {ctx.name for ctx in NODES}
+
+    for ctx in NODES:
+        if ctx.name in fresh:
+            ctx.node = fresh[ctx.name]
+
+    for name in sorted(set(fresh) - current):
+        print(f"[CONFIG] node {name} added → restart to start it")
+    for name in sorted(current - set(fresh)):
+        print(f"[CONFIG] node {name} removed → restart to stop it")
 
 # ------------------------------------------------------------
-# TELEGRAM STATE DIRECTORY
+# GLOBAL RUN LIMIT
 # ------------------------------------------------------------
-TELEGRAM_STATE_DIR = "/home/admin/regolancer-orchestrator/telegram"
-os.makedirs(TELEGRAM_STATE_DIR, exist_ok=True)
+# teto de regolancer simultâneos somando todos os nós (0 = sem teto)
+MAX_TOTAL_RUNS = int(os.getenv("MAX_TOTAL_RUNS", "0"))
+
+
+class RunSlots:
+    """
+    FIFO semaphore: a freed slot goes straight to the oldest waiter,
+    so a worker that loops back cannot starve other nodes' workers
+    """
+
+    def __init__(self, slots):
+        self._lock = threading.Lock()
+        self._free = slots
+        self._waiters = deque()
+
+    def __enter__(self):
+        with self._lock:
+            if self._free > 0 and not self._waiters:
+                self._free -= 1
+                return self
+            ev = threading.Event()
+            self._waiters.append(ev)
+
+        ev.wait()
+        return self
 
-REGO_STATE_FILE = os.path.join(TELEGRAM_STATE_DIR, "last_rego_offset.txt")
-LNDG_STATE_FILE = os.path.join(TELEGRAM_STATE_DIR, "last_lndg_id.txt")
-LOS_STATE_FILE  = os.path.join(TELEGRAM_STATE_DIR, "last_los_id.txt")
+    def __exit__(self, *exc):
+        with self._lock:
+            if self._waiters:
+                self._waiters.popleft().set()
+            else:
+                self._free += 1
 
 
+_run_slots = RunSlots(MAX_TOTAL_RUNS) if MAX_TOTAL_RUNS > 0 else None
+
+def run_slot():
+    return _run_slots if _run_slots is not None else contextlib.nullcontext()
+
 # ------------------------------------------------------------
-# SYSTEM PATHS
+# LEASES
 # ------------------------------------------------------------
-REGOLANCER_BIN   = "/home/admin/regolancer-orchestrator/regolancer"
-TEMPLATE_FILE    = "/home/admin/regolancer-orchestrator/config.template.json"
-REPORT_PY        = "/home/admin/regolancer-orchestrator/report.py"
+# sem COORDINATION_DB tudo abaixo é no-op (instância única)
+
+def hold_role(ctx, role):
+    """
+    Whether this instance does `role` (notifier, report, los-sync) for
+    the node. Holding renews the lease; a standby takes over once the
+    holder stops renewing for LEASE_TTL_SECONDS.
+    """
+    if LEASES is None:
+        return True
+
+    key = f"{ctx.name}:{role}"
+    held = LEASES.acquire([key], LEASE_TTL_SECONDS)
+
+    if held and role not in ctx.roles:
+        ctx.roles.add(role)
+        print(ctx.label(f"[LEASE] {role}: acquired by {INSTANCE_ID}"))
+    elif not held and role in ctx.roles:
+        ctx.roles.discard(role)
+        print(ctx.label(f"[LEASE] {role}: lost to {LEASES.holder(key)}"))
+
+    return held
+
+
+def fleet(ctx):
+    """
+    Live instances working this node (membership leases, renewed by
+    lease_heartbeat_loop); always includes this instance
+    """
+    if LEASES is None:
+        return [INSTANCE_ID]
+    members = LEASES.live(f"{ctx.name}:member:")
+    return members if INSTANCE_ID in members else sorted(members + [INSTANCE_ID])
+
+
+def owns_pair(pair, members):
+    # cada par pertence a exatamente uma instância viva
+    if len(members) < 2:
+        return True
+    src_id, tgt_id = pair_key(pair)
+    return owner_of(f"{src_id}:{tgt_id}", members) == INSTANCE_ID
+
+
+def claim_channels(ctx, worker_id, pair):
+    """
+    Lease both channels of a pair for one run (kept alive by the
+    heartbeat). Returns the keys to release afterwards, () without
+    coordination, None if either channel is busy in another worker or
+    instance.
+    """
+    if LEASES is None:
+        return ()
+
+    src_id, tgt_id = pair_key(pair)
+    keys = [f"{ctx.name}:chan:{src_id}", f"{ctx.name}:chan:{tgt_id}"]
+
+    if not LEASES.acquire(keys, LEASE_TTL_SECONDS, owner=f"{INSTANCE_ID}/{ctx.tag(worker_id)}"):
+        return None
+    return keys
+
+
+def release_channels(ctx, worker_id, keys):
+    if LEASES is not None and keys:
+        LEASES.release(keys, owner=f"{INSTANCE_ID}/{ctx.tag(worker_id)}")
+
+
+def lease_heartbeat_loop():
+    interval = max(1, LEASE_TTL_SECONDS // 3)
+    print(f"[LEASE] heartbeat started (interval={interval}s)")
+
+    while True:
+        try:
+            for ctx in NODES:
+                LEASES.acquire([f"{ctx.name}:member:{INSTANCE_ID}"], LEASE_TTL_SECONDS)
+            # canais de runs em andamento e papéis
+            LEASES.renew_owned(LEASE_TTL_SECONDS)
+        except Exception as e:
+            err = f"[LEASE] heartbeat failed: {e}"
+            print(err)
+            log_error(err)
 
-AMOUNT_STATE_FILE          = "/home/admin/regolancer-orchestrator/amount_state.json"
-LAST_REPORT_FILE           = "/home/admin/regolancer-orchestrator/last_report_date.txt"
-LAST_REPORT_ERROR_FILE     = "/home/admin/regolancer-orchestrator/last_report_error_date.txt"
+        time.sleep(interval)
 
-SUCCESS_REBAL_FILE         = "/home/admin/regolancer-orchestrator/success-rebal.csv"
-ERROR_LOG_FILE             = "/home/admin/regolancer-orchestrator/errors.log"
 
-SYNC_SCRIPT_PATH           = "/home/admin/regolancer-orchestrator/sync_los_to_lndg.sh"
+def state_get(ctx, name, default=None):
+    """
+    A node's persistent value: from the lease store when coordinating
+    (shared by every instance), else from the node's StateStore
+    """
+    if LEASES is not None:
+        value = LEASES.get(f"{ctx.name}:{name}")
+        if value is not None:
+            return value
+    return ctx.state.get(name, default)
+
+
+def state_set(ctx, name, value):
+    ctx.state.set(name, value)
+    if LEASES is not None:
+        LEASES.set(f"{ctx.name}:{name}", value)
 
 # =========================
 # TELEGRAM
 # =========================
 
-TELEGRAM_TOKEN   = os.getenv("TELEGRAM_TOKEN")
-TELEGRAM_CHAT_ID = os.getenv("TELEGRAM_CHAT_ID")
-TELEGRAM_API_URL = f"https://api.telegram.org/bot{TELEGRAM_TOKEN}/sendMessage"
-
 def send_telegram(msg):
     try:
         requests.post(
@@ -128,180 +642,828 @@ def send_telegram(msg):
 # AMOUNT STATE
 # =========================
 
-_amount_lock = threading.Lock()
+def advance_cycle_and_get_amount(ctx):
+    initial = int(os.getenv("AMOUNT_INITIAL", "10000"))
+    percent = float(os.getenv("AMOUNT_INCREASE_PERCENT", "50"))
+    every   = int(os.getenv("AMOUNT_EVERY_ROUNDS", "5"))
+    max_inc = int(os.getenv("AMOUNT_MAX_INCREASES", "8"))
 
-def advance_cycle_and_get_amount():
-    with _amount_lock:
-        initial = int(os.getenv("AMOUNT_INITIAL", "10000"))
-        percent = float(os.getenv("AMOUNT_INCREASE_PERCENT", "50"))
-        every   = int(os.getenv("AMOUNT_EVERY_ROUNDS", "5"))
-        max_inc = int(os.getenv("AMOUNT_MAX_INCREASES", "8"))
+    def step(state):
+        return advance_amount_state(state, every, max_inc)
 
-        state = {"cycle": 0, "increase": 0}
+    fresh = {"cycle": 0, "increase": 0}
 
-        if os.path.exists(AMOUNT_STATE_FILE):
-            try:
-                with open(AMOUNT_STATE_FILE) as f:
-                    state = json.load(f)
-            except Exception:
-                pass
+    if LEASES is not None:
+        # escada compartilhada: cada ciclo de worker de qualquer instância avança um passo
+        state = LEASES.update(
+            f"{ctx.name}:amount_state", step,
+            default=ctx.state.get("amount_state", fresh),
+        )
+        ctx.state.set("amount_state", state)
+    else:
+        # só memória; o snapshot vai pro disco pelo state_flush_loop
+        state = ctx.state.update("amount_state", step, default=fresh)
+
+    return amount_for_state(state, initial, percent), state
+
+# =========================
+# RUN DURATION ESTIMATE
+# =========================
+
+_run_estimate_lock = threading.Lock()
+
+def record_run_duration(ctx, result):
+    if result is None or not result.ok:
+        return
+
+    with _run_estimate_lock:
+        ctx.run_estimate = update_run_estimate(ctx.run_estimate, result.elapsed)
+
+
+def expected_run_seconds(ctx):
+    """
+    Time a run needs to have a realistic chance of succeeding (see
+    logic.expected_run)
+    """
+    with _run_estimate_lock:
+        est = ctx.run_estimate
+    return expected_run(est, MIN_RUN_SECONDS, MAX_CYCLE_SECONDS)
+
+
+def relax_run_estimate(ctx):
+    """
+    A cycle ran out of budget without starting a run. The EWMA only
+    moves on successes, so shrink it here or a stale high value would
+    keep every cycle idle.
+    """
+    with _run_estimate_lock:
+        if ctx.run_estimate is not None:
+            ctx.run_estimate *= RUN_ESTIMATE_RELAX
+
+# =========================
+# CONCURRENCY LIMIT
+# =========================
+
+def concurrency_limit(ctx):
+    """
+    Workers allowed to run: the AIMD limit, or max_workers when fixed
+    """
+    if not ADAPTIVE_CONCURRENCY:
+        return ctx.node.max_workers
+
+    c = ctx.concurrency
+    bounds = (min(CONCURRENCY_MIN, ctx.node.max_workers), ctx.node.max_workers)
+    if (c.min_limit, c.max_limit) != bounds:
+        c.set_bounds(*bounds)
+    c.window = CONCURRENCY_WINDOW
+    c.backoff = CONCURRENCY_BACKOFF
+    return c.limit
+
+
+def parked(ctx, worker_id):
+    return worker_id > concurrency_limit(ctx)
+
+
+def record_concurrency(ctx, result):
+    if not ADAPTIVE_CONCURRENCY or result is None:
+        return
+
+    change = ctx.concurrency.record(result.ok, result.elapsed)
+    if change is not None:
+        old, new, reason = change
+        print(ctx.label(f"[CONCURRENCY] limit {old} → {new} ({reason})"))
+        STATUS.touch()
+
+# =========================
+# API BREAKERS
+# =========================
+# um breaker por endpoint do LNDg/LOS; workers caem no último snapshot bom
 
-        state["cycle"] += 1
+LNDG_TIMEOUT_SECONDS      = float(os.getenv("LNDG_TIMEOUT_SECONDS", "60"))
+BREAKER_FAILURES          = int(os.getenv("BREAKER_FAILURES", "3"))
+BREAKER_RESET_SECONDS     = float(os.getenv("BREAKER_RESET_SECONDS", "30"))
+BREAKER_MAX_RESET_SECONDS = float(os.getenv("BREAKER_MAX_RESET_SECONDS", "600"))
+STALE_SNAPSHOT_MAX_AGE_SECONDS = float(os.getenv("STALE_SNAPSHOT_MAX_AGE_SECONDS", "600"))
 
-        if state["cycle"] % every == 0:
-            state["increase"] += 1
-            if state["increase"] > max_inc:
-                state["increase"] = 0
 
-        amount = initial
-        for _ in range(state["increase"]):
-            amount = int(amount * (1 + percent / 100))
+def breaker(ctx, name):
+    br = ctx.breakers.get(name)
+    if br is None:
+        br = ctx.breakers.setdefault(name, CircuitBreaker(
+            name,
+            failures=BREAKER_FAILURES,
+            reset_timeout=BREAKER_RESET_SECONDS,
+            max_reset_timeout=BREAKER_MAX_RESET_SECONDS,
+        ))
+    return br
 
-        with open(AMOUNT_STATE_FILE, "w") as f:
-            json.dump(state, f)
 
-        return amount, state
+def note_breaker(ctx, br, change):
+    if change is None:
+        return
+    msg = ctx.label(f"[BREAKER] {change}")
+    print(msg)
+    if br.state == OPEN:
+        log_error(msg)  # uma linha por abertura, não por request
+    STATUS.touch()
+
+
+def guarded(ctx, name, fn):
+    """
+    fn() through the endpoint's breaker; raises CircuitOpen without
+    calling it while the breaker is open
+    """
+    br = breaker(ctx, name)
+    if not br.allow():
+        raise CircuitOpen(name, br.retry_in())
+    try:
+        result = fn()
+    except Exception as e:
+        note_breaker(ctx, br, br.failure(e))
+        raise
+    note_breaker(ctx, br, br.success())
+    return result
+
+
+def read_channels(ctx, wtag):
+    """
+    (channels, taken_at). A fresh LNDg read when the breaker allows it;
+    if that fails or is refused, the last good snapshot while it is
+    younger than STALE_SNAPSHOT_MAX_AGE_SECONDS. Otherwise re-raises.
+    """
+    try:
+        channels = guarded(
+            ctx, "lndg:channels",
+            lambda: asyncio.run(load_channels(ctx.lndg_config(), LNDG_TIMEOUT_SECONDS)),
+        )
+    except Exception as e:
+        with _sched_lock:
+            snap = ctx.last_snapshot
+        if snap is None or time.time() - snap[0] > STALE_SNAPSHOT_MAX_AGE_SECONDS:
+            br = breaker(ctx, "lndg:channels")
+            if isinstance(e, CircuitOpen) or br.state != OPEN:
+                raise
+            raise CircuitOpen(br.name, br.retry_in()) from e  # já logado pelo breaker
+        print(
+            f"[{wtag}] 🧊 STALE SNAPSHOT ({int(time.time() - snap[0])}s old, "
+            f"{len(snap[1])} channels) — LNDg: {e}"
+        )
+        return snap[1], snap[0]
+
+    note_snapshot(ctx, channels)
+    ctx.projection.reconcile(channels, time.time())
+    return channels, time.time()
 
 # =========================
 # REGOLANCER
 # =========================
 
-def run_regolancer(worker_id, pair, amount, pair_id):
-    with open(TEMPLATE_FILE) as f:
+TEMPLATE_TIMEOUT_KEYS = ("timeout_rebalance", "timeout_attempt", "timeout_route")
+
+
+def timeout_status(ctx):
+    with _sched_lock:
+        tuned_runs = ctx.tuned_runs
+    return {"enabled": TIMEOUT_TUNING, "tuned_runs": tuned_runs, **ctx.latency.stats()}
+
+
+def tuned_timeout(ctx, pair, budget):
+    """
+    (seconds, level) for this pair from observed success latencies:
+    TIMEOUT_PERCENTILE plus TIMEOUT_MARGIN_SECONDS, at least
+    TIMEOUT_MIN_SECONDS. None (→ template timeouts) when TIMEOUT_TUNING
+    is off, history is too thin, the result is not shorter than `budget`,
+    or on an exploration run (TIMEOUT_EXPLORE), which keeps the long
+    tail observable.
+    """
+    if not TIMEOUT_TUNING or random.random() < TIMEOUT_EXPLORE:
+        return None
+
+    found = ctx.latency.timeout(
+        pair.source.chan_id, pair.target.chan_id,
+        q=TIMEOUT_PERCENTILE / 100, min_samples=TIMEOUT_MIN_SAMPLES,
+    )
+    if found is None:
+        return None
+
+    seconds, level, _ = found
+    tuned = max(TIMEOUT_MIN_SECONDS, seconds + TIMEOUT_MARGIN_SECONDS)
+    if tuned >= budget:
+        return None
+    return tuned, level
+
+
+def warm_node_cache(ctx):
+    if not NODE_CACHE_MANAGED:
+        return
+
+    ctx.node_cache.warm(seed=get_template(ctx).get("node_cache_filename"))
+    # snapshots de runs que morreram (crash, kill -9); um run vivo nunca passa de um ciclo
+    swept = ctx.node_cache.sweep(max_age=2 * MAX_CYCLE_SECONDS)
+    if swept:
+        print(ctx.label(f"[NODE-CACHE] removed {swept} stale run snapshot(s)"))
+    st = ctx.node_cache.stats()
+    if st["age_s"] is None:
+        print(ctx.label("[NODE-CACHE] no master yet → first finished run creates it"))
+    else:
+        print(ctx.label(f"[NODE-CACHE] master ready (size={st['size_bytes']}B age={st['age_s']}s)"))
+
+_template_lock = threading.Lock()
+
+def reload_template(ctx):
+    with open(ctx.node.template_file) as f:
         cfg = json.load(f)
 
-    src = pair["source"]
-    tgt = pair["target"]
+    with _template_lock:
+        ctx.template = cfg
+
+
+def get_template(ctx):
+    """
+    Copy of the node's cached regolancer template (refreshed by the config watcher)
+    """
+    with _template_lock:
+        cfg = ctx.template
+
+    if cfg is None:
+        reload_template(ctx)
+        with _template_lock:
+            cfg = ctx.template
+
+    return dict(cfg)
+
+def econ_filter(ctx):
+    """
+    Target pre-filter for iter_pairs from ECON_FILTER and the template's
+    econ_ratio / fee_limit_ppm (None when disabled)
+    """
+    if ECON_FILTER not in ("drop", "rank"):
+        return None
+
+    cfg = get_template(ctx)
+    econ_ratio = cfg.get("econ_ratio")
+    fee_limit_ppm = cfg.get("fee_limit_ppm")
+
+    return lambda t: economically_feasible(
+        t,
+        econ_ratio=float(econ_ratio) if econ_ratio is not None else None,
+        fee_limit_ppm=fee_limit_ppm,
+        min_route_ppm=ECON_MIN_ROUTE_PPM,
+    )
+
+def _terminate_overrun(proc, wtag, pair_id, flag):
+    if proc.poll() is not None:
+        return
+
+    flag.set()
+    print(f"[{wtag}] [PAIR {pair_id}] ⚠️ regolancer overran its budget → SIGTERM")
+    proc.terminate()
 
-    cfg["from"]   = [src["pubkey"]]
-    cfg["to"]     = [tgt["pubkey"]]
-    cfg["pfrom"]  = pair["pfrom"]
-    cfg["pto"]    = pair["pto"]
+    try:
+        proc.wait(timeout=RUN_KILL_GRACE_SECONDS)
+    except subprocess.TimeoutExpired:
+        print(f"[{wtag}] [PAIR {pair_id}] ⚠️ regolancer ignored SIGTERM → SIGKILL")
+        proc.kill()
+
+
+def run_regolancer(ctx, worker_id, pair, amount, pair_id, deadline=None):
+    cfg = get_template(ctx)
+    wtag = ctx.tag(worker_id)
+
+    # limita cada run ao orçamento restante do ciclo
+    budget = float(cfg.get("timeout_rebalance") or MAX_CYCLE_SECONDS)
+    tuned = tuned_timeout(ctx, pair, budget)
+    if tuned is not None:
+        budget = tuned[0]
+        cfg["timeout_rebalance"] = int(budget)
+        with _sched_lock:
+            ctx.tuned_runs += 1
+    if deadline is not None:
+        budget = max(1.0, min(budget, deadline - time.monotonic()))
+
+    for key in TEMPLATE_TIMEOUT_KEYS:
+        if key in cfg:
+            cfg[key] = min(int(cfg[key]), int(budget))
+
+    src = pair.source
+    tgt = pair.target
+
+    cfg["from"]   = [src.pubkey]
+    cfg["to"]     = [tgt.pubkey]
+    cfg["pfrom"]  = pair.pfrom
+    cfg["pto"]    = pair.pto
     cfg["amount"] = amount
+    # cada nó lê o seu próprio CSV (notifier, report, score)
+    cfg["stat"]   = ctx.success_rebal_file
 
     prefix = (
-        f"[W{worker_id}] "
+        f"[{wtag}] "
         f"[PAIR {pair_id}] "
         f"[AMOUNT {amount:,}] "
-        f"[pfrom={pair['pfrom']}%] "
-        f"[pto={pair['pto']}%]"
+        f"[pfrom={pair.pfrom}%] "
+        f"[pto={pair.pto}%]"
     )
 
     if LOG_OPERATIONAL:
         log_pair(worker_id, src, tgt, amount, prefix=prefix)
+        if tuned is not None:
+            print(f"{prefix} ⏱️ timeout {int(budget)}s (p{TIMEOUT_PERCENTILE:g} by {tuned[1]})")
 
-    with tempfile.NamedTemporaryFile("w", suffix=".json") as tmp:
-        json.dump(cfg, tmp, indent=2)
-        tmp.flush()
+    cache_path = None
+    # checkin no finally externo: devolve o snapshot mesmo se o Popen falhar
+    try:
+        if NODE_CACHE_MANAGED and not DRY_RUN and "node_cache_filename" in cfg:
+            run_id = f"w{worker_id}" if LEASES is None else f"{INSTANCE_ID}-w{worker_id}"
+            cache_path, cache_before = ctx.node_cache.checkout(run_id)
+            cfg["node_cache_filename"] = cache_path
+
+        with tempfile.NamedTemporaryFile("w", suffix=".json") as tmp:
+            json.dump(cfg, tmp, indent=2)
+            tmp.flush()
+
+            if DRY_RUN:
+                print(
+                    f"[{wtag}] [PAIR {pair_id}] DRY-RUN → "
+                    f"{src.alias} → {tgt.alias}"
+                )
+                return
+
+            #print(
+            #    f"{prefix} START regolancer "
+            #    f"{src.alias} → {tgt.alias}"
+            #)
+
+            # REGOLANCER_CAPTURE_BYTES=0 → nada a capturar
+            capture = REGOLANCER_CAPTURE and REGOLANCER_CAPTURE_BYTES > 0
+            read_output = REGOLANCER_LIVE_LOGS or capture
+
+            proc = subprocess.Popen(
+                [ctx.node.regolancer_bin, "--config", tmp.name],
+                stdout=subprocess.PIPE if read_output else subprocess.DEVNULL,
+                stderr=subprocess.STDOUT if read_output else subprocess.DEVNULL,
+                bufsize=0
+            )
 
-        if DRY_RUN:
-            print(
-                f"[W{worker_id}] [PAIR {pair_id}] DRY-RUN → "
-                f"{src['alias']} → {tgt['alias']}"
+            recorder = FlightRecorder(REGOLANCER_CAPTURE_BYTES)
+
+            started = time.monotonic()
+            overrun = threading.Event()
+
+            watchdog = threading.Timer(
+                budget + RUN_KILL_GRACE_SECONDS,
+                _terminate_overrun,
+                args=(proc, wtag, pair_id, overrun),
             )
-            return
+            watchdog.daemon = True
+            watchdog.start()
+
+            try:
+                if proc.stdout is not None:
+                    recorder.consume(
+                        proc.stdout,
+                        on_line=(lambda line: LOG_SINK.emit(f"{prefix} {line}"))
+                        if REGOLANCER_LIVE_LOGS else None,
+                    )
+                    proc.stdout.close()
+
+                proc.wait()
+            finally:
+                watchdog.cancel()
+
+            result = RunResult(
+                ok=proc.returncode == 0 and not overrun.is_set(),
+                elapsed=time.monotonic() - started,
+                budget=budget,
+                returncode=proc.returncode,
+                overrun=overrun.is_set(),
+            )
+
+            if capture and not result.ok:
+                save_capture(ctx, worker_id, pair, amount, pair_id, result, recorder)
 
-        #print(
-        #    f"{prefix} START regolancer "
-        #    f"{src['alias']} → {tgt['alias']}"
-        #)
+            return result
+    finally:
+        if cache_path is not None:
+            ctx.node_cache.checkin(cache_path, cache_before)
 
-        stdout_target = subprocess.PIPE if REGOLANCER_LIVE_LOGS else subprocess.DEVNULL
-        stderr_target = subprocess.STDOUT if REGOLANCER_LIVE_LOGS else subprocess.DEVNULL
 
-        proc = subprocess.Popen(
-            [REGOLANCER_BIN, "--config", tmp.name],
-            stdout=stdout_target,
-            stderr=stderr_target,
-            text=REGOLANCER_LIVE_LOGS,  # só precisa se for ler
-            bufsize=1 if REGOLANCER_LIVE_LOGS else 0
+def save_capture(ctx, worker_id, pair, amount, pair_id, result, recorder):
+    reason = "overrun" if result.overrun else f"rc{result.returncode}"
+
+    try:
+        ctx.captures.save(
+            f"w{worker_id}-p{pair_id}-{reason}",
+            {
+                "source": f"{pair.source.alias} ({pair.source.chan_id})",
+                "target": f"{pair.target.alias} ({pair.target.chan_id})",
+                "amount": amount,
+                "returncode": result.returncode,
+                "overrun": result.overrun,
+                "elapsed_s": round(result.elapsed, 1),
+                "budget_s": round(result.budget, 1),
+                "output_bytes": recorder.total,
+            },
+            recorder,
         )
+    except OSError as e:
+        log_error(f"[{ctx.tag(worker_id)}] [PAIR {pair_id}] capture failed: {e}")
 
-        if REGOLANCER_LIVE_LOGS and proc.stdout is not None:
-            for line in proc.stdout:
-                print(f"{prefix} {line.rstrip()}")
+# =========================
+# SCHEDULER STATE
+# =========================
 
-        proc.wait()
+_sched_lock = threading.Lock()
+_resume_lock = threading.Lock()
+
+
+def pair_key(pair):
+    return pair.source.chan_id, pair.target.chan_id
+
+
+def note_snapshot(ctx, channels):
+    with _sched_lock:
+        ctx.last_snapshot = (time.time(), channels)
+    STATUS.touch()
+
+
+def begin_cycle(ctx, worker_id, cycle, amount, elapsed=0.0, tried=None):
+    with _sched_lock:
+        ctx.worker_state[worker_id] = {
+            "cycle": cycle,
+            "amount": amount,
+            "cycle_started_at": time.time() - elapsed,
+            "tried": list(tried or ()),
+        }
+    STATUS.touch()
+
+
+def end_cycle(ctx, worker_id):
+    with _sched_lock:
+        ctx.worker_state.pop(worker_id, None)
+    STATUS.touch()
+
+
+def note_pair_started(ctx, worker_id, pair):
+    with _sched_lock:
+        ws = ctx.worker_state.get(worker_id)
+        if ws is not None:
+            ws["tried"].append(pair_key(pair))
+            ws["pair"] = {
+                "source": pair.source.chan_id,
+                "source_alias": pair.source.alias,
+                "target": pair.target.chan_id,
+                "target_alias": pair.target.alias,
+            }
+            ws["run_started_at"] = time.time()
+    STATUS.touch()
+
+
+def note_outcome(ctx, worker_id, pair, amount, result):
+    src_id, tgt_id = pair_key(pair)
+    with _sched_lock:
+        ws = ctx.worker_state.get(worker_id)
+        if ws is not None:
+            ws["pair"] = None
+        if result is not None:
+            ctx.recent_outcomes.append((
+                int(time.time()), worker_id, src_id, tgt_id, amount,
+                result.ok, round(result.elapsed, 1),
+            ))
+    STATUS.touch()
+
+
+def note_econ_saved(ctx, count):
+    with _sched_lock:
+        ctx.econ_runs_saved += count
+
+
+def scheduler_state(ctx):
+    """
+    Compact, JSON-ready view of a node's scheduler for checkpoints
+    """
+    with _sched_lock:
+        workers = {
+            str(wid): {**ws, "tried": [list(k) for k in ws["tried"]]}
+            for wid, ws in ctx.worker_state.items()
+        }
+        recent = [list(o) for o in ctx.recent_outcomes]
+        econ_runs_saved = ctx.econ_runs_saved
+        snapshot = None
+        if ctx.last_snapshot is not None:
+            taken_at, channels = ctx.last_snapshot
+            snapshot = {
+                "taken_at": taken_at,
+                "fields": list(Channel.__slots__),
+                "rows": [[getattr(c, f) for f in Channel.__slots__] for c in channels],
+            }
+
+    with _run_estimate_lock:
+        run_estimate = ctx.run_estimate
+
+    return {
+        "node": ctx.name,
+        "workers": workers,
+        "recent": recent,
+        "snapshot": snapshot,
+        "run_estimate": run_estimate,
+        "econ_runs_saved": econ_runs_saved,
+        "fairness": ctx.fairness.snapshot(),
+        "target_waits": ctx.fairness.waits(top=20),
+        "pair_selector": ctx.selector.summary(),
+        "projected_moves": ctx.projection.pending(),
+        "timeout_tuning": timeout_status(ctx),
+        "forward_velocity": velocity_status(ctx),
+        "concurrency": ctx.concurrency.snapshot(),
+        "concurrency_stats": ctx.concurrency.stats() if ADAPTIVE_CONCURRENCY else None,
+        "node_cache": ctx.node_cache.stats() if NODE_CACHE_MANAGED else None,
+    }
+
+
+def restore_scheduler_state(ctx, ckpt):
+    """
+    Seed a node's in-memory state from a fresh checkpoint: in-flight
+    cycles, recent outcomes, run estimate and (if recent enough) the snapshot
+    """
+    now = time.time()
+    saved_at = float(ckpt["saved_at"])
+
+    with _run_estimate_lock:
+        ctx.run_estimate = ckpt.get("run_estimate")
+
+    with _sched_lock:
+        for o in ckpt.get("recent") or []:
+            ctx.recent_outcomes.append(tuple(o))
+        ctx.econ_runs_saved = int(ckpt.get("econ_runs_saved") or 0)
+
+    ctx.fairness.restore(ckpt.get("fairness"))
+    ctx.concurrency.restore(ckpt.get("concurrency"))
+
+    with _resume_lock:
+        for wid, ws in (ckpt.get("workers") or {}).items():
+            ctx.resume_workers[int(wid)] = {
+                "cycle": int(ws["cycle"]),
+                "amount": int(ws["amount"]),
+                "elapsed": max(0.0, saved_at - float(ws["cycle_started_at"])),
+                "tried": {tuple(k) for k in ws.get("tried") or ()},
+            }
+
+        snap = resume_snapshot(ckpt, Channel.__slots__, RESUME_SNAPSHOT_MAX_AGE)
+        if snap is not None:
+            ctx.resume_snapshot = (snap[0], [Channel(*row) for row in snap[1]])
+
+    print(ctx.label(
+        f"[CHECKPOINT] resumed (age={int(now - saved_at)}s, "
+        f"workers={len(ctx.resume_workers)}, recent={len(ckpt.get('recent') or [])}, "
+        f"snapshot={'yes' if ctx.resume_snapshot is not None else 'no'})"
+    ))
+
+
+def take_resume_state(ctx, worker_id):
+    with _resume_lock:
+        return ctx.resume_workers.pop(worker_id, None), ctx.resume_snapshot
 
 # =========================
 # WORKER LOOP
 # =========================
 
-def worker_loop(worker_id):
-    print(f"[W{worker_id}] Worker started")
+def worker_loop(ctx, worker_id):
+    wtag = ctx.tag(worker_id)
+    print(f"[{wtag}] Worker started")
 
     while RUN_FOREVER:
-        cycle_start = time.monotonic()
+        # pool reduzido via reload → encerra após o run em andamento
+        if worker_id > ctx.node.max_workers:
+            print(f"[{wtag}] Worker retired (max_workers={ctx.node.max_workers})")
+            return
 
-        try:
-            amount, state = advance_cycle_and_get_amount()
+        # acima do limite AIMD → espera sem rodar (nem avançar a escada)
+        if parked(ctx, worker_id):
+            time.sleep(SLEEP_SECONDS)
+            continue
 
-            channels = asyncio.run(load_channels())
-            pairs = build_pairs(channels)
+        cycle_start = time.monotonic()
 
-            if pairs and RANDOMIZE_PAIRS:
-                random.shuffle(pairs)
+        try:
+            resume, resume_snapshot = take_resume_state(ctx, worker_id)
+
+            if resume is not None:
+                # ♻️ retoma o ciclo interrompido pelo restart
+                amount, state = resume["amount"], {"cycle": resume["cycle"]}
+                cycle_start -= resume["elapsed"]
+                tried = resume["tried"]
+                # snapshot do checkpoint: mantém a idade real p/ a projeção
+                snapshot_at, channels = resume_snapshot or (None, None)
+                print(
+                    f"[{wtag}] Resuming cycle {state['cycle']} "
+                    f"(elapsed={int(resume['elapsed'])}s, tried={len(tried)})"
+                )
+            else:
+                amount, state = advance_cycle_and_get_amount(ctx)
+                tried = set()
+                channels = None
+
+            if channels is None:
+                channels, snapshot_at = read_channels(ctx, wtag)
+
+            deadline = cycle_start + MAX_CYCLE_SECONDS
+            begin_cycle(ctx, worker_id, state["cycle"], amount, time.monotonic() - cycle_start, tried)
+            target_ok = econ_filter(ctx)
+            selector = ctx.selector if PAIR_SELECTOR in SELECTOR_MODES else None
+            fairness = None
+            if TARGET_FAIRNESS and selector is None:
+                fairness = ctx.fairness
+                fairness.runs_per_cycle = MAX_CYCLE_SECONDS / expected_run_seconds(ctx)
+                fairness.workers = concurrency_limit(ctx)
+            velocity = None
+            if FORWARD_VELOCITY_ORDER and selector is None and fairness is None:
+                velocity = ctx.forwards.rates(FORWARD_VELOCITY_WINDOW_HOURS)
+            pair_stats = {}
+            pairs = iter_pairs(
+                channels,
+                random if RANDOMIZE_PAIRS else None,
+                target_ok=target_ok,
+                defer=ECON_FILTER == "rank",
+                stats=pair_stats,
+                fairness=fairness,
+                target_rank=(lambda c: velocity.get(c.chan_id, 0.0)) if velocity is not None else None,
+            )
+            if selector is not None:
+                selector.mode = PAIR_SELECTOR
+                selector.half_life = PAIR_SELECTOR_HALF_LIFE_HOURS * 3600
+                selector.prior_seconds = expected_run_seconds(ctx)
+                last = None
+                if target_ok is not None and ECON_FILTER == "rank":
+                    last = lambda p: not target_ok(p.target)  # noqa: E731
+                pairs = selector.rank(pairs, last=last, limit=PAIR_SELECTOR_MAX_RANKED or None)
 
             pair_counter = 0  # 🔁 RESET A CADA CICLO
-
-            if pairs:
-                for pair in pairs:
+            ran_rejected = 0
+            members = fleet(ctx)
+            peer_pairs = busy_pairs = saturated_pairs = 0
+            completed = False
+
+            for pair in pairs:
+                if parked(ctx, worker_id):
+                    break
+
+                if tried and pair_key(pair) in tried:
+                    continue
+
+                # par de outra instância viva
+                if not owns_pair(pair, members):
+                    peer_pairs += 1
+                    continue
+
+                # origem esvaziada / alvo cheio por runs depois do snapshot
+                if LIQUIDITY_PROJECTION and not ctx.projection.eligible(pair, snapshot_at):
+                    saturated_pairs += 1
+                    continue
+
+                # teto global de runs simultâneos (todos os nós)
+                with run_slot():
                     elapsed = time.monotonic() - cycle_start
+                    remaining = deadline - time.monotonic()
+                    expected = expected_run_seconds(ctx)
 
-                    # ⏱️ TIMEOUT DO CICLO
-                    if elapsed > MAX_CYCLE_SECONDS:
-                        src_alias = pair.get("source", {}).get("alias", "?")
-                        tgt_alias = pair.get("target", {}).get("alias", "?")
+                    # ⏱️ TIMEOUT DO CICLO (ou run não cabe no tempo restante)
+                    if remaining < expected:
+                        src_alias = pair.source.alias
+                        tgt_alias = pair.target.alias
 
                         msg = (
-                            f"[W{worker_id}] CYCLE TIMEOUT: "
+                            f"[{wtag}] CYCLE TIMEOUT: "
                             f"elapsed={int(elapsed)}s max={MAX_CYCLE_SECONDS}s "
+                            f"remaining={int(remaining)}s expected_run={int(expected)}s "
                             f"(cycle={state['cycle']}, pair=SRC {src_alias} → TGT {tgt_alias})"
                         )
 
-                        print(f"[W{worker_id}] ⚠️ {msg}, restarting cycle")
+                        print(f"[{wtag}] ⚠️ {msg}, restarting cycle")
                         #log_error(msg)
+                        if pair_counter == 0:
+                            relax_run_estimate(ctx)
                         break
 
+                    # canal em uso por outro worker/instância
+                    leases = claim_channels(ctx, worker_id, pair)
+                    if leases is None:
+                        busy_pairs += 1
+                        continue
+
                     pair_counter += 1
-                    run_regolancer(worker_id, pair, amount, pair_counter)
+                    if target_ok is not None and not target_ok(pair.target):
+                        ran_rejected += 1
+                    note_pair_started(ctx, worker_id, pair)
+                    try:
+                        result = run_regolancer(ctx, worker_id, pair, amount, pair_counter, deadline)
+                    finally:
+                        release_channels(ctx, worker_id, leases)
+
+                record_run_duration(ctx, result)
+                record_concurrency(ctx, result)
+                note_outcome(ctx, worker_id, pair, amount, result)
+                if result is not None and result.ok:
+                    ctx.projection.record(pair, amount)
+                    ctx.latency.record(pair.source.chan_id, pair.target.chan_id, result.elapsed)
+                if result is not None:
+                    ctx.selector.record(
+                        pair.source.chan_id, pair.target.chan_id,
+                        result.ok, result.elapsed, amount if result.ok else 0,
+                    )
+                if fairness is not None:
+                    fairness.charge(pair.target.chan_id, result.elapsed if result else 0.0)
+            else:
+                completed = True
 
             total = int(time.monotonic() - cycle_start)
 
+            if pair_stats.get("rejected_targets"):
+                saved = econ_runs_saved(pair_stats, pair_counter, ran_rejected, completed)
+                note_econ_saved(ctx, saved)
+                print(
+                    f"[{wtag}] 💸 ECON FILTER ({ECON_FILTER}): "
+                    f"{pair_stats['rejected_targets']} target(s) below route cost → "
+                    f"{saved} run(s) saved"
+                )
+
+            if fairness is not None:
+                waits = fairness.waits()
+                if waits:
+                    w = waits[0]
+                    print(
+                        f"[{wtag}] ⚖️ FAIRNESS: {len(waits)} target(s), longest wait "
+                        f"{w['cycles_waiting']} cycle(s) / {int(w['wait_s'])}s ({w['alias']})"
+                    )
+
+            if saturated_pairs:
+                print(
+                    f"[{wtag}] 💧 PROJECTION: {saturated_pairs} pair(s) skipped "
+                    f"(source drained / target filled since snapshot)"
+                )
+
+            if selector is not None:
+                top = selector.summary(top=1)
+                best = top["top"][0] if top["top"] else None
+                print(
+                    f"[{wtag}] 🎯 SELECTOR ({PAIR_SELECTOR}): {top['pairs']} pair(s) learned"
+                    + (f", best {best['sats_per_s']} sats/s "
+                       f"({best['source']} → {best['target']})" if best else "")
+                )
+
+            if velocity:
+                ranked = [c for c in channels if c.chan_id in velocity and valid_target(c)]
+                if ranked:
+                    fastest = max(ranked, key=lambda c: velocity[c.chan_id])
+                    print(
+                        f"[{wtag}] 🚀 VELOCITY: {len(ranked)} target(s) forwarding, "
+                        f"fastest {fastest.alias} ({int(velocity[fastest.chan_id]):,} sats/h "
+                        f"over {FORWARD_VELOCITY_WINDOW_HOURS:g}h)"
+                    )
+
+            if len(members) > 1 or busy_pairs:
+                print(
+                    f"[{wtag}] 🔒 LEASES: {len(members)} instance(s), "
+                    f"{peer_pairs} pair(s) left to peers, {busy_pairs} skipped (channel busy)"
+                )
+
             print(
-                f"[W{worker_id}] === CYCLE FINISHED "
+                f"[{wtag}] === CYCLE FINISHED "
                 f"(cycle={state['cycle']} amount={amount} duration={total}s) "
                 f"— sleeping {SLEEP_SECONDS}s ==="
             )
+        except CircuitOpen as e:
+            # LNDg fora e sem snapshot utilizável: espera o próximo probe
+            print(f"[{wtag}] ⛔ {e}, no snapshot younger than {int(STALE_SNAPSHOT_MAX_AGE_SECONDS)}s")
+            time.sleep(max(e.retry_in - SLEEP_SECONDS, 0))
         except Exception:
             err = traceback.format_exc()
-            print(f"[W{worker_id}] ERROR")
+            print(f"[{wtag}] ERROR")
             print(err)
-            log_error(f"[W{worker_id}] Unhandled exception:\n{err}")
+            log_error(f"[{wtag}] Unhandled exception:\n{err}")
 
+        end_cycle(ctx, worker_id)
         time.sleep(SLEEP_SECONDS)
 
 # =========================
 # SUCCESS REBAL READER
 # =========================
 
-def read_new_rebalances():
+def read_new_rebalances(ctx):
+    last_offset = read_cursor(ctx, "rego_offset")
+
     # FIRST RUN → não enviar histórico
-    if not os.path.exists(REGO_STATE_FILE):
-        if os.path.exists(SUCCESS_REBAL_FILE):
-            with open(SUCCESS_REBAL_FILE, "rb") as f:
+    if last_offset is None:
+        if os.path.exists(ctx.success_rebal_file):
+            with open(ctx.success_rebal_file, "rb") as f:
                 f.seek(0, os.SEEK_END)
-                write_last_id(REGO_STATE_FILE, f.tell())
+                write_cursor(ctx, "rego_offset", f.tell())
         return []
 
-    last_offset = read_last_id(REGO_STATE_FILE)
-
-    if not os.path.exists(SUCCESS_REBAL_FILE):
+    if not os.path.exists(ctx.success_rebal_file):
         return []
 
     new_lines = []
 
-    with open(SUCCESS_REBAL_FILE, "r") as f:
+    with open(ctx.success_rebal_file, "r") as f:
         f.seek(last_offset)
         for line in f:
             line = line.strip()
@@ -310,7 +1472,7 @@ def read_new_rebalances():
 
         new_offset = f.tell()
 
-    write_last_id(REGO_STATE_FILE, new_offset)
+    write_cursor(ctx, "rego_offset", new_offset)
 
     return new_lines
 
@@ -322,98 +1484,104 @@ def telegram_notifier_loop():
     print("[TELEGRAM] notifier started")
 
     while True:
-        try:
-            # ---------------------------
-            # Regolancer-Orchestrator
-            # ---------------------------
-            if SEND_REBALANCE_MSG_REGO_ORCH:
-                new_rebalances = read_new_rebalances()
+        for ctx in NODES:
+            try:
+                if hold_role(ctx, "notifier"):
+                    started = time.time()
+                    notify_node_rebalances(ctx)
+                    ctx.notifier_status = {
+                        "last_pass_at": started,
+                        "duration_s": round(time.time() - started, 2),
+                    }
+                    STATUS.touch()
+            except Exception:
+                err = traceback.format_exc()
+                print(ctx.label("[TELEGRAM] ERROR"))
+                print(err)
+                log_error(ctx.label(f"[TELEGRAM] Unhandled exception:\n{err}"))
 
-                for line in new_rebalances:
-                    try:
-                        parts = line.split(",")
-                        amount_msat = int(parts[3])
-                        amount_sat = amount_msat // 1000
-                        msg = format_rebalance_source_msg(
-                            amount_sat,
-                            "Regolancer-Orchestrator"
-                        )
-                        send_telegram(msg)
-                    except Exception:
-                        continue
+        time.sleep(30)
 
-            # ---------------------------
-            # LNDg
-            # ---------------------------
-            lndg_events = read_new_lndg_rebalances()
+def notify_node_rebalances(ctx):
+    # ---------------------------
+    # Regolancer-Orchestrator
+    # ---------------------------
+    if SEND_REBALANCE_MSG_REGO_ORCH:
+        new_rebalances = read_new_rebalances(ctx)
 
-            for rb_id, amount in lndg_events:
-                msg = format_rebalance_source_msg(amount, "LNDg")
+        for line in new_rebalances:
+            try:
+                parts = line.split(",")
+                amount_msat = int(parts[3])
+                amount_sat = amount_msat // 1000
+                msg = format_rebalance_source_msg(
+                    amount_sat,
+                    ctx.label("Regolancer-Orchestrator")
+                )
                 send_telegram(msg)
+            except Exception:
+                continue
 
-            # ---------------------------
-            # LOS
-            # ---------------------------
-            los_events = read_new_los_rebalances()
+    # ---------------------------
+    # LNDg
+    # ---------------------------
+    lndg_events = read_new_lndg_rebalances(ctx)
 
-            for at_id, amount in los_events:
-                msg = format_rebalance_source_msg(amount, "LOS")
-                send_telegram(msg)
+    for rb_id, amount in lndg_events:
+        msg = format_rebalance_source_msg(amount, ctx.label("LNDg"))
+        send_telegram(msg)
 
-        except Exception:
-            err = traceback.format_exc()
-            print("[TELEGRAM] ERROR")
-            print(err)
-            log_error(f"[TELEGRAM] Unhandled exception:\n{err}")
+    # ---------------------------
+    # LOS
+    # ---------------------------
+    los_events = read_new_los_rebalances(ctx)
 
-        time.sleep(30)
+    for at_id, amount in los_events:
+        msg = format_rebalance_source_msg(amount, ctx.label("LOS"))
+        send_telegram(msg)
 
 def format_rebalance_source_msg(amount_sat: int, source: str) -> str:
     return f"☯️ ⚡ {amount_sat:,} by {source}"
 
-def read_last_id(path):
-    if not os.path.exists(path):
-        return 0
-    try:
-        with open(path, "r") as f:
-            return int(f.read().strip())
-    except Exception:
-        return 0
+def read_cursor(ctx, name):
+    """
+    Last notified id/offset for a source, None on first run
+    """
+    return state_get(ctx, f"cursor:{name}")
 
 
-def write_last_id(path, value):
-    try:
-        with open(path, "w") as f:
-            f.write(str(value))
-    except Exception:
-        pass
+def write_cursor(ctx, name, value):
+    state_set(ctx, f"cursor:{name}", value)
 
-def read_new_lndg_rebalances():
+def read_new_lndg_rebalances(ctx):
     if not SEND_REBALANCE_MSG_LNDG:
         return []
 
-    try:
+    def fetch():
         r = requests.get(
-            f"{LNDG_BASE_URL}/api/rebalancer/?status=2&limit=50",
-            auth=(LNDG_USER, LNDG_PASS),
+            f"{ctx.node.lndg_base_url}/api/rebalancer/?status=2&limit=50",
+            auth=(ctx.node.lndg_user, ctx.node.lndg_pass),
             timeout=10
         )
         r.raise_for_status()
-        data = r.json()
+        return r.json()
+
+    try:
+        data = guarded(ctx, "lndg:rebalancer", fetch)
     except Exception:
         return []
 
     results = data.get("results", [])
 
+    last_id = read_cursor(ctx, "lndg_id")
+
     # FIRST RUN → salvar maior ID e sair
-    if not os.path.exists(LNDG_STATE_FILE):
+    if last_id is None:
         if results:
             max_id = max(rb.get("id", 0) for rb in results)
-            write_last_id(LNDG_STATE_FILE, max_id)
+            write_cursor(ctx, "lndg_id", max_id)
         return []
 
-    last_id = read_last_id(LNDG_STATE_FILE)
-
     new_events = []
     max_id_seen = last_id
 
@@ -428,22 +1596,16 @@ def read_new_lndg_rebalances():
             max_id_seen = rb_id
 
     if max_id_seen > last_id:
-        write_last_id(LNDG_STATE_FILE, max_id_seen)
+        write_cursor(ctx, "lndg_id", max_id_seen)
 
     return new_events
 
-def read_new_los_rebalances():
+def read_new_los_rebalances(ctx):
     if not SEND_REBALANCE_MSG_LOS:
         return []
 
     try:
-        r = requests.get(
-            f"{LOS_BASE_URL}/api/rebalance/history",
-            verify=LOS_VERIFY_TLS,
-            timeout=15
-        )
-        r.raise_for_status()
-        data = r.json()
+        data = guarded(ctx, "los:history", ctx.los_client().rebalance_history)
     except Exception:
         return []
 
@@ -452,15 +1614,15 @@ def read_new_los_rebalances():
         if at.get("status") == "succeeded"
     ]
 
+    last_id = read_cursor(ctx, "los_id")
+
     # FIRST RUN → salvar maior ID e sair
-    if not os.path.exists(LOS_STATE_FILE):
+    if last_id is None:
         if attempts:
             max_id = max(at.get("id", 0) for at in attempts)
-            write_last_id(LOS_STATE_FILE, max_id)
+            write_cursor(ctx, "los_id", max_id)
         return []
 
-    last_id = read_last_id(LOS_STATE_FILE)
-
     new_events = []
     max_id_seen = last_id
 
@@ -475,7 +1637,7 @@ def read_new_los_rebalances():
             max_id_seen = at_id
 
     if max_id_seen > last_id:
-        write_last_id(LOS_STATE_FILE, max_id_seen)
+        write_cursor(ctx, "los_id", max_id_seen)
 
     return new_events
 
@@ -483,49 +1645,25 @@ def read_new_los_rebalances():
 # DAILY REPORT (23:59)
 # =========================
 
-def read_last_report_date():
-    if not os.path.exists(LAST_REPORT_FILE):
-        return None
-    try:
-        with open(LAST_REPORT_FILE, "r") as f:
-            return f.read().strip()
-    except Exception:
-        return None
+def read_last_report_date(ctx):
+    return state_get(ctx, "last_report_date")
 
 
-def write_last_report_date(date_str):
-    try:
-        with open(LAST_REPORT_FILE, "w") as f:
-            f.write(date_str)
-    except Exception as e:
-        print(f"[ERROR] Failed to write LAST_REPORT_FILE: {e}")
+def write_last_report_date(ctx, date_str):
+    state_set(ctx, "last_report_date", date_str)
 
-def read_last_report_error_date():
-    if not os.path.exists(LAST_REPORT_ERROR_FILE):
-        return None
-    try:
-        with open(LAST_REPORT_ERROR_FILE, "r") as f:
-            return f.read().strip()
-    except Exception:
-        return None
+def read_last_report_error_date(ctx):
+    return state_get(ctx, "last_report_error_date")
 
 
-def write_last_report_error_date(date_str):
-    try:
-        with open(LAST_REPORT_ERROR_FILE, "w") as f:
-            f.write(date_str)
-    except Exception as e:
-        print(f"[ERROR] Failed to write LAST_REPORT_ERROR_FILE: {e}")
+def write_last_report_error_date(ctx, date_str):
+    state_set(ctx, "last_report_error_date", date_str)
 
 
-def clear_last_report_error_date():
-    try:
-        if os.path.exists(LAST_REPORT_ERROR_FILE):
-            os.remove(LAST_REPORT_ERROR_FILE)
-    except Exception as e:
-        print(f"[ERROR] Failed to clear LAST_REPORT_ERROR_FILE: {e}")
+def clear_last_report_error_date(ctx):
+    state_set(ctx, "last_report_error_date", None)
 
-def maybe_run_daily_report():
+def maybe_run_daily_report(ctx):
     if os.getenv("ENABLE_DAILY_REPORT", "TRUE").upper() != "TRUE":
         return
 
@@ -537,42 +1675,47 @@ def maybe_run_daily_report():
         return
 
     # já rodou com sucesso hoje
-    if read_last_report_date() == today_str:
+    if read_last_report_date(ctx) == today_str:
         return
 
-    print("[INFO] Attempting to run daily report.py")
+    # só uma instância roda o relatório
+    if not hold_role(ctx, "report"):
+        return
+
+    print(ctx.label("[INFO] Attempting to run daily report.py"))
 
     try:
         subprocess.run(
             [sys.executable, REPORT_PY],
             check=True,
             capture_output=True,
-            text=True
+            text=True,
+            env=ctx.env(),
         )
 
-        print("[INFO] daily report.py executed successfully")
+        print(ctx.label("[INFO] daily report.py executed successfully"))
 
-        write_last_report_date(today_str)
-        clear_last_report_error_date()  # limpa estado de erro
+        write_last_report_date(ctx, today_str)
+        clear_last_report_error_date(ctx)  # limpa estado de erro
 
     except subprocess.CalledProcessError as e:
-        print("[ERROR] report.py failed")
+        print(ctx.label("[ERROR] report.py failed"))
 
         stderr = (e.stderr or "").strip()
         stdout = (e.stdout or "").strip()
 
         # evita spam: só 1 telegram por dia de erro
-        last_error_date = read_last_report_error_date()
+        last_error_date = read_last_report_error_date(ctx)
         if last_error_date != today_str:
             msg = (
-                "❌ Daily report failed\n\n"
+                f"❌ {ctx.label('Daily report failed')}\n\n"
                 f"📅 Date: {today_str}\n\n"
                 f"STDERR:\n{stderr[:350]}\n\n"
                 f"STDOUT:\n{stdout[:350]}"
             )
             log_error(msg)
             send_telegram(msg)
-            write_last_report_error_date(today_str)
+            write_last_report_error_date(ctx, today_str)
 
         # continua tentando a cada 30s
 
@@ -580,67 +1723,551 @@ def scheduler_loop():
     print("[SCHEDULER] daily report scheduler started")
 
     while True:
-        try:
-            maybe_run_daily_report()
-        except Exception:
-            print("[SCHEDULER] ERROR")
-            traceback.print_exc()
+        for ctx in NODES:
+            try:
+                maybe_run_daily_report(ctx)
+            except Exception:
+                print(ctx.label("[SCHEDULER] ERROR"))
+                traceback.print_exc()
 
         time.sleep(30)  # checa a cada 30s
 
-_error_log_lock = threading.Lock()
+# =========================
+# LOS → LNDg SYNC
+# =========================
 
-def log_error(msg: str):
-    timestamp = datetime.now().isoformat(timespec="seconds")
-    line = f"[{timestamp}] {msg}\n"
+def los_sync_node(ctx):
+    if LOS_SYNC_ENGINE == "script":
+        subprocess.run(
+            [SYNC_SCRIPT_PATH],
+            check=True,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            env=ctx.env(),
+        )
+        return
+
+    if ctx.los_sync_engine is None:
+        ctx.los_sync_engine = LosSyncEngine(
+            ctx.los_sync_index_file,
+            lndg_config=ctx.lndg_config(),
+            los_client=ctx.los_client(),
+        )
+
+    stats = ctx.los_sync_engine.run()
+    if stats["changed"] or stats["los_channels"] != stats["skipped"]:
+        print(ctx.label(
+            f"[LOS-SYNC] channels={stats['los_channels']} "
+            f"skipped={stats['skipped']} changed={stats['changed']} "
+            f"updated={stats['updated']} duration={stats['duration_s']}s"
+        ))
 
-    try:
-        with _error_log_lock:
-            with open(ERROR_LOG_FILE, "a") as f:
-                f.write(line)
-    except Exception:
-        # último recurso: não deixa crashar por erro de log
-        pass
 
 def los_sync_loop():
     if not SYNC_LOS_TO_LNDG:
         print("[LOS-SYNC] Disabled")
         return
 
-    print("[LOS-SYNC] Sync loop started (interval=60s)")
+    print(f"[LOS-SYNC] Sync loop started (interval=60s, engine={LOS_SYNC_ENGINE})")
 
     while True:
-        try:
-            #print("[LOS-SYNC] Running sync_los_to_lndg.sh")
+        for ctx in NODES:
+            started = time.time()
+            try:
+                #print("[LOS-SYNC] Running sync_los_to_lndg.sh")
+                if not hold_role(ctx, "los-sync"):
+                    continue
+                guarded(ctx, "los-sync", lambda: los_sync_node(ctx))
+                note_los_sync(ctx, started)
+
+            except CircuitOpen as e:
+                note_los_sync(ctx, started, e)
+            except Exception as e:
+                note_los_sync(ctx, started, e)
+                err = ctx.label(f"[LOS-SYNC] ERROR: {e}")
+                print(err)
+                log_error(err)
+
+        time.sleep(60)
+
+# =========================
+# FORWARD VELOCITY
+# =========================
+# só forwards novos: cada poll lê páginas até o último id já indexado
 
-            subprocess.run(
-                [SYNC_SCRIPT_PATH],
-                check=True,
-                stdout=subprocess.DEVNULL,
-                stderr=subprocess.DEVNULL
+FORWARD_VELOCITY_POLL_SECONDS = int(os.getenv("FORWARD_VELOCITY_POLL_SECONDS", "300"))  # 0 = desligado
+FORWARD_VELOCITY_MAX_PAGES    = int(os.getenv("FORWARD_VELOCITY_MAX_PAGES", "50"))
+
+
+def velocity_status(ctx):
+    return {"order": FORWARD_VELOCITY_ORDER, "window_h": FORWARD_VELOCITY_WINDOW_HOURS, **ctx.forwards.stats()}
+
+
+def poll_forwards(ctx):
+    """
+    Fetch LNDg forwards newest first until the index's last id (or its
+    horizon, or FORWARD_VELOCITY_MAX_PAGES) and ingest them in one go,
+    so a failed page leaves the cursor where it was. Returns
+    (added, pages).
+    """
+    url = f"{ctx.node.lndg_base_url}/api/forwards/?limit=100"
+    rows = []
+    pages = 0
+
+    def fetch():
+        r = requests.get(url, auth=(ctx.node.lndg_user, ctx.node.lndg_pass), timeout=LNDG_TIMEOUT_SECONDS)
+        r.raise_for_status()
+        return r.json()
+
+    while url and pages < FORWARD_VELOCITY_MAX_PAGES:
+        data = guarded(ctx, "lndg:forwards", fetch)
+        pages += 1
+        page = data.get("results") or []
+        rows.extend(page)
+        if not ctx.forwards.wants_more(page):
+            break
+        url = data.get("next")
+    else:
+        if url:
+            print(ctx.label(
+                f"[VELOCITY] stopped after {pages} page(s) → older forwards not indexed"
+            ))
+
+    return ctx.forwards.ingest(rows), pages
+
+
+def forward_velocity_loop():
+    if FORWARD_VELOCITY_POLL_SECONDS <= 0:
+        print("[VELOCITY] Disabled")
+        return
+
+    print(f"[VELOCITY] forwards index started (interval={FORWARD_VELOCITY_POLL_SECONDS}s)")
+
+    idle = False
+    while True:
+        # sem FORWARD_VELOCITY_ORDER ninguém lê o índice → não consulta o LNDg
+        # (a thread fica viva p/ o reload ligar a opção sem restart)
+        if not FORWARD_VELOCITY_ORDER:
+            if not idle:
+                print("[VELOCITY] FORWARD_VELOCITY_ORDER off → polling paused")
+                idle = True
+            time.sleep(FORWARD_VELOCITY_POLL_SECONDS)
+            continue
+        if idle:
+            print("[VELOCITY] FORWARD_VELOCITY_ORDER on → polling resumed")
+            idle = False
+
+        for ctx in NODES:
+            try:
+                first = ctx.forwards.last_id is None
+                added, pages = poll_forwards(ctx)
+                if first or (added and LOG_OPERATIONAL):
+                    print(ctx.label(
+                        f"[VELOCITY] {added} forward(s) indexed from {pages} page(s), "
+                        f"{len(ctx.forwards)} channel(s) forwarding"
+                    ))
+                STATUS.touch()
+            except CircuitOpen:
+                pass  # já logado pelo breaker
+            except Exception as e:
+                print(ctx.label(f"[VELOCITY] poll failed: {e}"))
+
+        time.sleep(FORWARD_VELOCITY_POLL_SECONDS)
+
+# =========================
+# WORKER POOL
+# =========================
+
+_workers_lock = threading.Lock()
+
+def ensure_workers(ctx):
+    """
+    Start a node's workers up to its max_workers. Workers above the
+    limit retire on their own once their in-flight run finishes.
+    """
+    with _workers_lock:
+        for wid in range(1, ctx.node.max_workers + 1):
+            t = ctx.workers.get(wid)
+            if t is not None and t.is_alive():
+                continue
+
+            t = threading.Thread(
+                target=worker_loop,
+                args=(ctx, wid),
+                daemon=True
             )
+            ctx.workers[wid] = t
+            t.start()
 
+# =========================
+# CONFIG RELOAD
+# =========================
+
+CONFIG_CHECK_SECONDS = int(os.getenv("CONFIG_CHECK_SECONDS", "10"))
+
+_reload_requested = threading.Event()
+
+def _mtime(path):
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+
+def reload_env_file():
+    """
+    Re-read .env over the environment. Keys deleted from it go back to
+    their value from before .env was loaded (unset → code default).
+    """
+    global ENV_FILE_KEYS
+
+    if not ENV_FILE:
+        return
+
+    keys = set(dotenv_values(ENV_FILE))
+    for name in ENV_FILE_KEYS - keys:
+        if name in STARTUP_ENV:
+            os.environ[name] = STARTUP_ENV[name]
+        else:
+            os.environ.pop(name, None)
+        print(f"[CONFIG] {name} removed from .env → default")
+
+    load_dotenv(ENV_FILE, override=True)
+    ENV_FILE_KEYS = keys
+
+
+def apply_config_reload():
+    before = {name: globals()[name] for name in SETTING_NAMES}
+
+    reload_env_file()
+    load_settings()
+
+    changed = [
+        name for name in SETTING_NAMES
+        if globals()[name] != before[name]
+    ]
+
+    hidden = ("LNDG_PASS", "TELEGRAM_TOKEN", "TELEGRAM_API_URL")
+    for name in changed:
+        if name in hidden:
+            print(f"[CONFIG] {name} changed")
+        else:
+            print(f"[CONFIG] {name}: {before[name]} → {globals()[name]}")
+
+    apply_nodes_reload()
+
+    if "LOS_BASE_URL" in changed or "LOS_VERIFY_TLS" in changed:
+        los_api.reset_client()
+
+    # engines leem LOS_SYNC_* ao serem criadas e seguram o cliente LOS
+    # (fechado pelo reset acima) → recria no próximo sync; o índice fica no disco
+    for ctx in NODES:
+        ctx.los_sync_engine = None
+
+    if "ENABLE_FILE_LOGS" in changed:
+        LOG_SINK.mirror_enabled = ENABLE_FILE_LOGS
+
+    return changed
+
+
+def apply_nodes_reload():
+    """
+    Re-read node settings; start workers for raised budgets and rebuild
+    LOS sync engines whose endpoints changed
+    """
+    old = {ctx.name: ctx.node for ctx in NODES}
+    reload_nodes()
+
+    for ctx in NODES:
+        if ctx.node == old[ctx.name]:
+            continue
+
+        if MULTI_NODE and ctx.node.max_workers != old[ctx.name].max_workers:
+            print(ctx.label(f"[CONFIG] max_workers: {old[ctx.name].max_workers} → {ctx.node.max_workers}"))
+
+        ctx.los_sync_engine = None
+        ensure_workers(ctx)
+
+
+def _request_reload(signum, frame):
+    _reload_requested.set()
+
+
+def config_watcher_loop():
+    """
+    Reload .env, nodes.json and the regolancer templates on SIGHUP or
+    when any of those files' mtime changes
+    """
+    print(f"[CONFIG] watcher started (interval={CONFIG_CHECK_SECONDS}s, SIGHUP to force)")
+
+    env_mtime = _mtime(ENV_FILE) if ENV_FILE else None
+    nodes_mtime = _mtime(NODES_FILE)
+    template_mtimes = {ctx.name: _mtime(ctx.node.template_file) for ctx in NODES}
+
+    while True:
+        forced = _reload_requested.wait(CONFIG_CHECK_SECONDS)
+        _reload_requested.clear()
+
+        try:
+            new_env_mtime = _mtime(ENV_FILE) if ENV_FILE else None
+            new_nodes_mtime = _mtime(NODES_FILE)
+
+            if forced or new_env_mtime != env_mtime or new_nodes_mtime != nodes_mtime:
+                env_mtime = new_env_mtime
+                nodes_mtime = new_nodes_mtime
+                changed = apply_config_reload()
+                print(f"[CONFIG] .env reloaded ({len(changed)} setting(s) changed)")
+
+            for ctx in NODES:
+                new_template_mtime = _mtime(ctx.node.template_file)
+
+                if forced or new_template_mtime != template_mtimes.get(ctx.name):
+                    template_mtimes[ctx.name] = new_template_mtime
+                    reload_template(ctx)
+                    print(ctx.label("[CONFIG] template reloaded"))
+
+        except Exception:
+            err = traceback.format_exc()
+            print("[CONFIG] ERROR")
+            print(err)
+            log_error(f"[CONFIG] Reload failed:\n{err}")
+
+# =========================
+# CHECKPOINT
+# =========================
+
+CHECKPOINT_SECONDS         = int(os.getenv("CHECKPOINT_SECONDS", "30"))
+CHECKPOINT_MAX_AGE_SECONDS = int(os.getenv("CHECKPOINT_MAX_AGE_SECONDS", "600"))
+RESUME_SNAPSHOT_MAX_AGE    = int(os.getenv("RESUME_SNAPSHOT_MAX_AGE", "120"))
+STATE_FLUSH_SECONDS        = int(os.getenv("STATE_FLUSH_SECONDS", "10"))
+
+def write_checkpoint():
+    for ctx in NODES:
+        try:
+            save_checkpoint(ctx.checkpoint_file, scheduler_state(ctx))
         except Exception as e:
-            err = f"[LOS-SYNC] ERROR: {e}"
+            err = ctx.label(f"[CHECKPOINT] write failed: {e}")
             print(err)
             log_error(err)
 
-        time.sleep(60)
+
+def flush_state():
+    for ctx in NODES:
+        try:
+            ctx.state.flush()
+            if ctx.selector.dirty:
+                ctx.selector.save(ctx.selector_file)
+            if ctx.latency.dirty:
+                ctx.latency.save(ctx.latency_file)
+            if ctx.forwards.dirty:
+                ctx.forwards.save(ctx.forwards_file)
+        except Exception as e:
+            err = ctx.label(f"[STATE] flush failed: {e}")
+            print(err)
+            log_error(err)
+
+
+def state_flush_loop():
+    print(f"[STATE] write-behind started (interval={STATE_FLUSH_SECONDS}s)")
+
+    while True:
+        time.sleep(STATE_FLUSH_SECONDS)
+        flush_state()
+
+
+def checkpoint_loop():
+    print(f"[CHECKPOINT] writer started (interval={CHECKPOINT_SECONDS}s)")
+
+    while True:
+        time.sleep(CHECKPOINT_SECONDS)
+        write_checkpoint()
+
+
+def _handle_sigterm(signum, frame):
+    print("[CHECKPOINT] SIGTERM → writing checkpoint and exiting")
+    write_checkpoint()
+    flush_state()
+    if LEASES is not None:
+        # libera já; a instância em standby não precisa esperar o TTL
+        LEASES.close()
+    LOG_SINK.stop()
+    raise SystemExit(0)
+
+# =========================
+# STATUS ENDPOINT
+# =========================
+# JSON read-only em http://STATUS_HTTP_HOST:STATUS_HTTP_PORT/status
+
+STATUS_HTTP_PORT       = int(os.getenv("STATUS_HTTP_PORT", "0"))  # 0 = desligado
+STATUS_HTTP_HOST       = os.getenv("STATUS_HTTP_HOST", "127.0.0.1")
+STATUS_REFRESH_SECONDS = float(os.getenv("STATUS_REFRESH_SECONDS", "5"))
+STATUS_RECENT_OUTCOMES = int(os.getenv("STATUS_RECENT_OUTCOMES", "20"))
+
+STARTED_AT = time.time()
+NOTIFIER_CURSORS = ("rego_offset", "lndg_id", "los_id")
+OUTCOME_FIELDS = ("at", "worker", "source", "target", "amount", "ok", "elapsed_s")
+
+
+def note_los_sync(ctx, started, error=None):
+    ctx.los_sync_status = {
+        "last_run_at": started,
+        "duration_s": round(time.time() - started, 2),
+        "error": str(error) if error is not None else None,
+    }
+    STATUS.touch()
+
+
+def node_status(ctx, now):
+    with _sched_lock:
+        states = {wid: dict(ws) for wid, ws in ctx.worker_state.items()}
+        recent = list(ctx.recent_outcomes)[-STATUS_RECENT_OUTCOMES:]
+        snapshot_at = ctx.last_snapshot[0] if ctx.last_snapshot is not None else None
+
+    limit = concurrency_limit(ctx)
+    workers = []
+    for wid in sorted(set(ctx.workers) | set(states)):
+        ws = states.get(wid)
+        if ws is None:
+            workers.append({"worker": wid, "state": "parked" if wid > limit else "sleeping"})
+            continue
+
+        pair = ws.get("pair")
+        workers.append({
+            "worker": wid,
+            "state": "running" if pair else "cycle",
+            "cycle": ws["cycle"],
+            "amount": ws["amount"],
+            "cycle_elapsed_s": round(now - ws["cycle_started_at"], 1),
+            "cycle_remaining_s": round(ws["cycle_started_at"] + MAX_CYCLE_SECONDS - now, 1),
+            "pairs_tried": len(ws["tried"]),
+            "pair": pair,
+            "run_elapsed_s": round(now - ws["run_started_at"], 1) if pair else None,
+        })
+
+    cursors = {name: read_cursor(ctx, name) for name in NOTIFIER_CURSORS}
+    backlog = None
+    if cursors["rego_offset"] is not None and os.path.exists(ctx.success_rebal_file):
+        backlog = max(0, os.path.getsize(ctx.success_rebal_file) - cursors["rego_offset"])
+
+    notifier = dict(ctx.notifier_status)
+    if notifier:
+        notifier["age_s"] = round(now - notifier["last_pass_at"], 1)
+
+    los_sync = dict(ctx.los_sync_status)
+    if los_sync:
+        los_sync["age_s"] = round(now - los_sync["last_run_at"], 1)
+
+    return {
+        "workers": workers,
+        "snapshot_age_s": round(now - snapshot_at, 1) if snapshot_at is not None else None,
+        "breakers": {name: br.stats() for name, br in sorted(ctx.breakers.items())},
+        "timeout_tuning": timeout_status(ctx),
+        "forward_velocity": velocity_status(ctx),
+        "run_estimate_s": round(expected_run_seconds(ctx), 1),
+        "concurrency": (
+            ctx.concurrency.stats() if ADAPTIVE_CONCURRENCY
+            else {"limit": limit, "adaptive": False}
+        ),
+        "notifier": {**notifier, "cursors": cursors, "rego_backlog_bytes": backlog},
+        "los_sync": los_sync or None,
+        "roles": sorted(ctx.roles),
+        "recent": [dict(zip(OUTCOME_FIELDS, o)) for o in reversed(recent)],
+    }
+
+
+def build_status():
+    now = time.time()
+    return {
+        "instance": INSTANCE_ID,
+        "uptime_s": round(now - STARTED_AT),
+        "max_cycle_seconds": MAX_CYCLE_SECONDS,
+        "nodes": {ctx.name: node_status(ctx, now) for ctx in NODES},
+    }
+
+
+STATUS = StatusBoard(build_status, refresh=STATUS_REFRESH_SECONDS)
 
 # =========================
 # MAIN
 # =========================
 
 if __name__ == "__main__":
+    start_log_sink()
     print("=== REGOLANCER ORCHESTRATOR (MULTI-WORKER MODE) ===")
 
+    if MULTI_NODE:
+        print(
+            f"[NODES] {len(NODES)} node(s) from {NODES_FILE}: "
+            + ", ".join(f"{ctx.name} ({ctx.node.max_workers}w)" for ctx in NODES)
+            + (f" — max {MAX_TOTAL_RUNS} concurrent run(s)" if MAX_TOTAL_RUNS > 0 else "")
+        )
+
+    if LEASES is not None:
+        print(
+            f"[LEASE] coordinating via {COORDINATION_DB} as {INSTANCE_ID} "
+            f"(ttl={LEASE_TTL_SECONDS}s)"
+        )
+
+    for ctx in NODES:
+        reload_template(ctx)
+        warm_node_cache(ctx)
+
+        if ctx.state.imported:
+            print(ctx.label(f"[STATE] imported {', '.join(ctx.state.imported)} into state.json"))
+
+        if ctx.selector.load(ctx.selector_file):
+            print(ctx.label(f"[SELECTOR] loaded {len(ctx.selector)} pair(s) from {ctx.selector_file}"))
+        if ctx.latency.load(ctx.latency_file):
+            print(ctx.label(f"[TIMEOUTS] loaded {len(ctx.latency)} latency histogram(s) from {ctx.latency_file}"))
+        if ctx.forwards.load(ctx.forwards_file):
+            print(ctx.label(
+                f"[VELOCITY] loaded {len(ctx.forwards)} channel(s) from {ctx.forwards_file} "
+                f"(last forward id {ctx.forwards.last_id})"
+            ))
+
+        # warm restart
+        ckpt = load_checkpoint(ctx.checkpoint_file, CHECKPOINT_MAX_AGE_SECONDS)
+        if ckpt is not None:
+            restore_scheduler_state(ctx, ckpt)
+        else:
+            print(ctx.label("[CHECKPOINT] no fresh checkpoint → cold start"))
+
+    signal.signal(signal.SIGTERM, _handle_sigterm)
+    threading.Thread(
+        target=checkpoint_loop,
+        daemon=True
+    ).start()
+    threading.Thread(
+        target=state_flush_loop,
+        daemon=True
+    ).start()
+
+    # membership p/ dividir pares entre instâncias
+    if LEASES is not None:
+        threading.Thread(
+            target=lease_heartbeat_loop,
+            daemon=True
+        ).start()
+
     # workers
-    for wid in range(1, MAX_WORKERS + 1):
+    for ctx in NODES:
+        ensure_workers(ctx)
+
+    # status endpoint (local, read-only)
+    if STATUS_HTTP_PORT:
+        STATUS.serve(STATUS_HTTP_HOST, STATUS_HTTP_PORT)
         threading.Thread(
-            target=worker_loop,
-            args=(wid,),
+            target=STATUS.run,
             daemon=True
         ).start()
+        print(f"[STATUS] serving http://{STATUS_HTTP_HOST}:{STATUS_HTTP_PORT}/status")
+
+    # config reload (SIGHUP or mtime change)
+    signal.signal(signal.SIGHUP, _request_reload)
+    threading.Thread(
+        target=config_watcher_loop,
+        daemon=True
+    ).start()
 
     # telegram notifier
     threading.Thread(
@@ -660,6 +2287,12 @@ if __name__ == "__main__":
         daemon=True
     ).start()
 
+    # índice de forwards (FORWARD_VELOCITY_ORDER)
+    threading.Thread(
+        target=forward_velocity_loop,
+        daemon=True
+    ).start()
+
 
     # keep main alive
     while True:
@@ -0,0 +1,330 @@
+import gzip
+import heapq
+import itertools
+import json
+import math
+import os
+import random
+import threading
+import time
+from array import array
+from typing import Any, Callable, Dict, List, Optional
+
+# =========================
+# PAIR SELECTOR
+# =========================
+
+FIELDS = ("succ", "fail", "secs", "sats", "stamp")
+CHANNEL_FIELDS = ("succ", "fail", "stamp")
+FORMAT_VERSION = 1
+
+MODES = ("thompson", "ucb")
+
+
+class PairSelector:
+    """
+    Learned value of each source → target pair.
+
+    Per pair: decayed success / failure counts, decayed regolancer
+    seconds and sats moved, in parallel `array('d')` columns indexed by
+    a dict (~40 bytes per pair plus the key), so tens of thousands of
+    pairs stay cheap. Old evidence halves every `half_life` seconds.
+
+    Most pairs are never tried, so a pair's prior comes from its
+    channels: Beta(m·p0, m·(1-p0)), where p0 averages the source's and
+    the target's success rates (each shrunk toward the global rate).
+    The posterior adds the pair's own successes / failures.
+
+    `rank` orders a cycle's pairs by sampled success per second of
+    runtime (Thompson) or its upper confidence bound (UCB). The amount
+    is the same for every pair in a cycle, so this maximizes sats moved
+    per regolancer-hour. Scoring works on a snapshot of the evidence,
+    so `record` from other workers is not blocked while a cycle ranks.
+    """
+
+    def __init__(self, mode: str = "thompson", half_life: float = 86400,
+                 prior_seconds: float = 60.0, prior_strength: float = 4.0,
+                 ucb_c: float = 0.5, rnd: Optional[random.Random] = None,
+                 clock: Callable[[], float] = time.time):
+        self.mode = mode
+        self.half_life = half_life
+        self.prior_seconds = prior_seconds  # duração assumida p/ par sem histórico
+        self.prior_strength = prior_strength
+        self.ucb_c = ucb_c
+        self.rnd = rnd or random.Random()
+        self.clock = clock
+
+        self._lock = threading.Lock()
+        self._index: Dict[tuple, int] = {}
+        self._keys: List[tuple] = []
+        self._cols = {name: array("d") for name in FIELDS}
+
+        # por canal, como origem ("s") e como destino ("t")
+        self._chan_index: Dict[tuple, int] = {}
+        self._chan_keys: List[tuple] = []
+        self._chan_cols = {name: array("d") for name in CHANNEL_FIELDS}
+
+        self._global = [0.0, 0.0, clock()]  # succ, fail, stamp (todos os pares)
+        self.dirty = False
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._keys)
+
+    # ------------------------------------------------------------
+    # UPDATES
+    # ------------------------------------------------------------
+
+    def _decay(self, age: float) -> float:
+        if age <= 0 or not self.half_life:
+            return 1.0
+        return math.exp(-age * math.log(2) / self.half_life)
+
+    def record(self, src_id: str, tgt_id: str, ok: bool, seconds: float, sats: int = 0) -> None:
+        now = self.clock()
+        key = (src_id, tgt_id)
+        c = self._cols
+
+        with self._lock:
+            i = self._index.get(key)
+            if i is None:
+                i = len(self._keys)
+                self._index[key] = i
+                self._keys.append(key)
+                for name in FIELDS:
+                    c[name].append(0.0)
+            else:
+                k = self._decay(now - c["stamp"][i])
+                for name in ("succ", "fail", "secs", "sats"):
+                    c[name][i] *= k
+
+            c["succ" if ok else "fail"][i] += 1
+            c["secs"][i] += seconds
+            c["sats"][i] += sats
+            c["stamp"][i] = now
+
+            self._bump_channel(("s", src_id), ok, now)
+            self._bump_channel(("t", tgt_id), ok, now)
+
+            g = self._global
+            k = self._decay(now - g[2])
+            g[0] = g[0] * k + ok
+            g[1] = g[1] * k + (not ok)
+            g[2] = now
+            self.dirty = True
+
+    def _bump_channel(self, key: tuple, ok: bool, now: float) -> None:
+        c = self._chan_cols
+        j = self._chan_index.get(key)
+        if j is None:
+            j = len(self._chan_keys)
+            self._chan_index[key] = j
+            self._chan_keys.append(key)
+            for name in CHANNEL_FIELDS:
+                c[name].append(0.0)
+        else:
+            k = self._decay(now - c["stamp"][j])
+            c["succ"][j] *= k
+            c["fail"][j] *= k
+
+        c["succ" if ok else "fail"][j] += 1
+        c["stamp"][j] = now
+
+    # ------------------------------------------------------------
+    # SELECTION
+    # ------------------------------------------------------------
+
+    def _evidence(self, i: Optional[int], now: float):
+        """
+        (successes, failures, seconds) for pair index `i`, decayed to now
+        """
+        if i is None:
+            return 0.0, 0.0, 0.0
+        c = self._cols
+        k = self._decay(now - c["stamp"][i])
+        return c["succ"][i] * k, c["fail"][i] * k, c["secs"][i] * k
+
+    def _snapshot(self, now: float):
+        """
+        (pair evidence, channel rates, base, log_total) decayed to now;
+        caller holds the lock
+        """
+        g = self._global
+        k = self._decay(now - g[2])
+        base = (g[0] * k + 1) / ((g[0] + g[1]) * k + 2)
+        log_total = math.log((g[0] + g[1]) * k + 2)
+
+        evidence = {key: self._evidence(i, now) for key, i in self._index.items()}
+        rates = {key: self._channel_rate(key, now, base) for key in self._chan_index}
+        return evidence, rates, base, log_total
+
+    def _channel_rate(self, key: tuple, now: float, base: float) -> float:
+        """
+        Channel's success rate, shrunk toward `base` (2 pseudo-runs)
+        """
+        j = self._chan_index.get(key)
+        if j is None:
+            return base
+        c = self._chan_cols
+        k = self._decay(now - c["stamp"][j])
+        s = c["succ"][j] * k
+        f = c["fail"][j] * k
+        return (s + 2 * base) / (s + f + 2)
+
+    def _score(self, pair, evidence, rates, base: float, log_total: float) -> float:
+        src_id, tgt_id = pair.source.chan_id, pair.target.chan_id
+        s, f, secs = evidence.get((src_id, tgt_id), (0.0, 0.0, 0.0))
+        runs = s + f
+        duration = (secs + self.prior_seconds) / (runs + 1)
+
+        p0 = (rates.get(("s", src_id), base) + rates.get(("t", tgt_id), base)) / 2
+        a = self.prior_strength * p0 + s
+        b = self.prior_strength * (1 - p0) + f
+
+        if self.mode == "ucb":
+            p = a / (a + b) + self.ucb_c * math.sqrt(log_total / (a + b))
+        else:
+            p = self.rnd.betavariate(a, b)
+
+        return p / duration
+
+    def rank(self, pairs, last: Optional[Callable[[Any], bool]] = None,
+             limit: Optional[int] = None) -> List[Any]:
+        """
+        `pairs` best first. Pairs for which `last(pair)` is true (e.g.
+        economically infeasible targets) keep their order, after the rest.
+
+        With `limit`, only the best `limit` pairs are returned (tail
+        included), so a lazy `pairs` walk is never materialized: memory
+        is O(limit) however large S×T is.
+        """
+        now = self.clock()
+        with self._lock:
+            evidence, rates, base, log_total = self._snapshot(now)
+
+        seq = itertools.count()
+        scored = []
+        tail = []
+        for pair in pairs:
+            if last is not None and last(pair):
+                if limit is None or len(tail) < limit:
+                    tail.append(pair)
+                continue
+            item = (self._score(pair, evidence, rates, base, log_total), -next(seq), pair)
+            if limit is None:
+                scored.append(item)
+            elif len(scored) < limit:
+                heapq.heappush(scored, item)
+            elif item[0] > scored[0][0]:
+                heapq.heapreplace(scored, item)
+
+        scored.sort(key=lambda item: item[:2], reverse=True)
+        ranked = [p for _, _, p in scored] + tail
+        return ranked if limit is None else ranked[:limit]
+
+    # ------------------------------------------------------------
+    # STATS
+    # ------------------------------------------------------------
+
+    def summary(self, top: int = 10) -> Dict[str, Any]:
+        """
+        Pair count plus the pairs with the best mean sats per runtime second
+        """
+        now = self.clock()
+        c = self._cols
+        rows = []
+
+        with self._lock:
+            for i, (src_id, tgt_id) in enumerate(self._keys):
+                s, f, secs = self._evidence(i, now)
+                sats = c["sats"][i] * self._decay(now - c["stamp"][i])
+                rows.append({
+                    "source": src_id,
+                    "target": tgt_id,
+                    "runs": round(s + f, 2),
+                    "success_rate": round((1 + s) / (2 + s + f), 3),
+                    "sats_per_s": round(sats / secs, 1) if secs else 0.0,
+                })
+
+        rows.sort(key=lambda r: -r["sats_per_s"])
+        return {"mode": self.mode, "pairs": len(rows), "top": rows[:top]}
+
+    # ------------------------------------------------------------
+    # PERSISTENCE
+    # ------------------------------------------------------------
+
+    def save(self, path: str) -> None:
+        """
+        gzip file: one JSON header line, then each column's raw doubles
+        (pair columns, then channel columns)
+        """
+        with self._lock:
+            header = {
+                "version": FORMAT_VERSION,
+                "fields": list(FIELDS),
+                "channel_fields": list(CHANNEL_FIELDS),
+                "keys": [f"{s}:{t}" for s, t in self._keys],
+                "channels": [f"{r}:{c}" for r, c in self._chan_keys],
+                "global": list(self._global),
+            }
+            blobs = [self._cols[name].tobytes() for name in FIELDS]
+            blobs += [self._chan_cols[name].tobytes() for name in CHANNEL_FIELDS]
+            # limpa antes de escrever: record() durante a escrita volta a sujar
+            self.dirty = False
+
+        tmp = path + ".tmp"
+        try:
+            with gzip.open(tmp, "wb", compresslevel=6) as f:
+                f.write(json.dumps(header, separators=(",", ":")).encode() + b"\n")
+                for blob in blobs:
+                    f.write(blob)
+            os.replace(tmp, path)
+        except Exception:
+            # não salvou → próximo flush tenta de novo
+            with self._lock:
+                self.dirty = True
+            raise
+
+    def load(self, path: str) -> bool:
+        try:
+            with gzip.open(path, "rb") as f:
+                header = json.loads(f.readline())
+                body = f.read()
+        except (OSError, ValueError, EOFError):
+            return False
+
+        if (header.get("version") != FORMAT_VERSION or
+                header.get("fields") != list(FIELDS) or
+                header.get("channel_fields") != list(CHANNEL_FIELDS)):
+            return False
+
+        keys = [tuple(k.split(":", 1)) for k in header["keys"]]
+        chan_keys = [tuple(k.split(":", 1)) for k in header["channels"]]
+        size = array("d").itemsize
+        width = len(keys) * size
+        chan_width = len(chan_keys) * size
+        if len(body) != width * len(FIELDS) + chan_width * len(CHANNEL_FIELDS):
+            return False
+
+        def columns(names, offset, w):
+            cols = {}
+            for n, name in enumerate(names):
+                col = array("d")
+                col.frombytes(body[offset + n * w:offset + (n + 1) * w])
+                cols[name] = col
+            return cols
+
+        cols = columns(FIELDS, 0, width)
+        chan_cols = columns(CHANNEL_FIELDS, width * len(FIELDS), chan_width)
+
+        with self._lock:
+            self._keys = keys
+            self._index = {k: i for i, k in enumerate(keys)}
+            self._cols = cols
+            self._chan_keys = chan_keys
+            self._chan_index = {k: j for j, k in enumerate(chan_keys)}
+            self._chan_cols = chan_cols
+            self._global = [float(v) for v in header["global"]]
+            self.dirty = False
+
+        return True
@@ -13,6 +13,8 @@ from requests.adapters import HTTPAdapter
 from urllib3.util.retry import Retry
 from zoneinfo import ZoneInfo
 
+import los_api
+
 _session = None
 load_dotenv()
 
@@ -20,7 +22,7 @@ load_dotenv()
 # CONFIG
 # =========================
 
-BASE_DIR = "/home/admin/regolancer-orchestrator"
+BASE_DIR = os.getenv("ORCHESTRATOR_BASE_DIR", "/home/admin/regolancer-orchestrator").rstrip("/")
 LOCK_FILE = "/tmp/regolancer-report.lock"
 DAILY_REPORT_CSV = f"{BASE_DIR}/daily-report.csv"
 SUCCESS_REBAL_CSV = f"{BASE_DIR}/success-rebal.csv"
@@ -37,9 +39,6 @@ LNDG_BASE_URL = os.getenv("LNDG_BASE_URL", "http://localhost:8889").rstrip("/")
 LNDG_USER = os.getenv("LNDG_USER")
 LNDG_PASS = os.getenv("LNDG_PASS")
 
-# LOS (LightningOS)
-LOS_BASE_URL = os.getenv("LOS_BASE_URL", "https://localhost:8443").rstrip("/")
-
 # Telegram
 TELEGRAM_TOKEN = os.getenv("TELEGRAM_TOKEN")
 TELEGRAM_CHAT_ID = os.getenv("TELEGRAM_CHAT_ID")
@@ -235,14 +234,10 @@ def load_regolancer_rebalances():
 def fetch_los_rebalances(skip_days):
     daily = defaultdict(int)
 
-    url = f"{LOS_BASE_URL}/api/rebalance/history"
-
     log("Starting LOS rebalances fetch")
 
     try:
-        r = requests.get(url, verify=False, timeout=30)
-        r.raise_for_status()
-        data = r.json()
+        data = los_api.get_client().rebalance_history()
     except Exception as e:
         log(f"LOS fetch error: {e}")
         return daily
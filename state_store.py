@@ -0,0 +1,89 @@
+import copy
+import threading
+from typing import Any, Callable, Dict, Optional
+
+from checkpoint import atomic_write_json, read_json
+
+# =========================
+# STATE STORE
+# =========================
+
+class StateStore:
+    """
+    Small persistent values of one node (amount ladder, notifier
+    cursors, report dates) held in memory.
+
+    Reads and writes never touch the disk; `flush()` writes the whole
+    dict as one atomic JSON snapshot when something changed since the
+    last one (called on an interval and at shutdown).
+    """
+
+    def __init__(self, path: str, legacy: Optional[Dict[str, Callable[[], Any]]] = None):
+        self.path = path
+
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._values: Dict[str, Any] = {}
+        self._version = 0  # incrementa a cada mudança
+        self._flushed = 0
+        self.imported = []  # chaves vindas dos arquivos antigos
+
+        data = read_json(path)
+        if isinstance(data, dict):
+            self._values = data
+        elif legacy:
+            # primeira vez: importa os arquivos antigos (um por valor)
+            for key, read in legacy.items():
+                value = read()
+                if value is not None:
+                    self._values[key] = value
+            self.imported = sorted(self._values)
+            if self._values:
+                self._version = 1
+
+    def get(self, key: str, default: Any = None) -> Any:
+        with self._lock:
+            value = self._values.get(key, default)
+        return copy.deepcopy(value)
+
+    def set(self, key: str, value: Any) -> None:
+        with self._lock:
+            if value is None:
+                if self._values.pop(key, None) is None:
+                    return
+            elif self._values.get(key) == value:
+                return
+            else:
+                self._values[key] = copy.deepcopy(value)
+            self._version += 1
+
+    def update(self, key: str, fn: Callable[[Any], Any], default: Any = None) -> Any:
+        """
+        Atomic read-modify-write of one value; returns the new value
+        """
+        with self._lock:
+            value = fn(copy.deepcopy(self._values.get(key, default)))
+            self._values[key] = value
+            self._version += 1
+            return copy.deepcopy(value)
+
+    @property
+    def dirty(self) -> bool:
+        with self._lock:
+            return self._version != self._flushed
+
+    def flush(self) -> bool:
+        """
+        Write a snapshot if anything changed; True when one was written
+        """
+        with self._flush_lock:
+            with self._lock:
+                if self._version == self._flushed:
+                    return False
+                version = self._version
+                snapshot = copy.deepcopy(self._values)
+
+            atomic_write_json(self.path, snapshot)
+            with self._lock:
+                self._flushed = version
+            return True
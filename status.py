@@ -0,0 +1,86 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict
+
+# =========================
+# STATUS BOARD
+# =========================
+
+class StatusBoard:
+    """
+    Precomputed JSON status document.
+
+    Hot paths only call `touch()` (sets an Event). A builder thread
+    rebuilds the document when touched, at most once per `min_interval`,
+    and every `refresh` seconds regardless, so elapsed times stay
+    current. Requests just return the last encoded bytes.
+    """
+
+    def __init__(self, build: Callable[[], Dict[str, Any]],
+                 refresh: float = 5.0, min_interval: float = 0.5):
+        self.build = build
+        self.refresh = refresh
+        self.min_interval = min_interval
+
+        self._changed = threading.Event()
+        self._body = b"{}"
+        self.builds = 0
+
+    def touch(self) -> None:
+        self._changed.set()
+
+    def body(self) -> bytes:
+        return self._body
+
+    def rebuild(self) -> None:
+        doc = self.build()
+        doc["generated_at"] = round(time.time(), 3)
+        self._body = json.dumps(doc, separators=(",", ":"), default=str).encode()
+        self.builds += 1
+
+    def run(self) -> None:
+        """
+        Builder loop (daemon thread)
+        """
+        while True:
+            self._changed.wait(self.refresh)
+            self._changed.clear()
+            try:
+                self.rebuild()
+            except Exception as e:
+                print(f"[STATUS] build failed: {e}")
+            time.sleep(self.min_interval)
+
+    def serve(self, host: str, port: int) -> ThreadingHTTPServer:
+        """
+        Start the read-only HTTP server in a daemon thread
+        """
+        board = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                path = self.path.split("?", 1)[0]
+                if path in ("/", "/status"):
+                    self._reply(200, board.body(), "application/json")
+                elif path == "/healthz":
+                    self._reply(200, b"ok\n", "text/plain")
+                else:
+                    self._reply(404, b"not found\n", "text/plain")
+
+            def _reply(self, code, body, ctype):
+                self.send_response(code)
+                self.send_header("Content-Type", ctype)
+                self.send_header("Content-Length", str(len(body)))
+                self.send_header("Cache-Control", "no-store")
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, fmt, *args):
+                pass  # sem log por request
+
+        server = ThreadingHTTPServer((host, port), Handler)
+        server.daemon_threads = True
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        return server
@@ -6,13 +6,34 @@ set -Eeuo pipefail
 ##################################################
 
 SCRIPT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)"
-source "$SCRIPT_DIR/.env"
+
+# valores por nó passados pelo orchestrator (ctx.env) prevalecem sobre o .env
+NODE_VARS=(ORCHESTRATOR_BASE_DIR LNDG_BASE_URL LNDG_USER LNDG_PASS LOS_BASE_URL LOS_VERIFY_TLS)
+declare -A PRESET=()
+for var in "${NODE_VARS[@]}"; do
+  if [[ -n "${!var+x}" ]]; then
+    PRESET[$var]="${!var}"
+  fi
+done
+
+if [[ -f "$SCRIPT_DIR/.env" ]]; then
+  source "$SCRIPT_DIR/.env"
+fi
+
+for var in "${!PRESET[@]}"; do
+  export "$var=${PRESET[$var]}"
+done
 
 ##################################################
 # CONFIG
 ##################################################
 
-LOS_API="https://localhost:8443"
+LOS_API="${LOS_BASE_URL:-https://localhost:8443}"
+LOS_API="${LOS_API%/}"
+LOS_CURL_TLS=(-k)
+if [[ "${LOS_VERIFY_TLS:-false}" =~ ^(1|true|yes|on)$ ]]; then
+  LOS_CURL_TLS=()
+fi
 LNDG_API="${LNDG_BASE_URL%/}/api"
 
 : "${LNDG_USER:?Missing LNDG_USER}"
@@ -31,8 +52,10 @@ SEND_SYNC_TO_LNDG_ERROR_TELEGRAM=${SEND_SYNC_TO_LNDG_ERROR_TELEGRAM:-true}
 : "${TELEGRAM_SYNC_TO_LNDG_TOKEN:?Missing TELEGRAM_SYNC_TO_LNDG_TOKEN}"
 : "${TELEGRAM_SYNC_TO_LNDG_CHAT_ID:?Missing TELEGRAM_SYNC_TO_LNDG_CHAT_ID}"
 
-LOS_HASH_FILE="/tmp/los_channels.hash"
-ERROR_STATE_FILE="/tmp/sync_los_to_lndg.error_state"
+# estado por nó (um base dir por nó)
+STATE_DIR="${ORCHESTRATOR_BASE_DIR:-/tmp}"
+LOS_HASH_FILE="$STATE_DIR/los_channels.hash"
+ERROR_STATE_FILE="$STATE_DIR/sync_los_to_lndg.error_state"
 ERROR_THRESHOLD=2
 
 ##################################################
@@ -201,12 +224,12 @@ log() { echo -e "$1"; }
 
 log "🔎 Checking LOS state hash..."
 
-LOS_CONFIG_RAW=$(curl -s -k "$LOS_API/api/rebalance/config")
+LOS_CONFIG_RAW=$(curl -s "${LOS_CURL_TLS[@]}" "$LOS_API/api/rebalance/config")
 
 LOS_CONFIG_NORMALIZED=$(echo "$LOS_CONFIG_RAW" | \
   jq -S '{econ_ratio}')
 
-LOS_JSON_RAW=$(curl -s -k "$LOS_API/api/rebalance/channels")
+LOS_JSON_RAW=$(curl -s "${LOS_CURL_TLS[@]}" "$LOS_API/api/rebalance/channels")
 
 LOS_JSON_NORMALIZED=$(echo "$LOS_JSON_RAW" | \
   jq -S '[.channels[] | {
@@ -272,7 +295,7 @@ log ""
 
 log "📥 Carregando config global do LOS..."
 
-LOS_CONFIG=$(curl -s -k "$LOS_API/api/rebalance/config")
+LOS_CONFIG=$(curl -s "${LOS_CURL_TLS[@]}" "$LOS_API/api/rebalance/config")
 
 LOS_DEFAULT_ECON_RATIO="$(jq -r '.econ_ratio' <<<"$LOS_CONFIG")"
 
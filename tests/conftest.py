@@ -0,0 +1,41 @@
+import os
+import sys
+
+import pytest
+
+# módulos ficam na raiz do repo (sem pacote)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models import Channel  # noqa: E402
+
+
+class Clock:
+    """
+    Manual time source for the `clock=` arguments; tests move `now`
+    """
+
+    def __init__(self, now=1_000_000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return Clock()
+
+
+@pytest.fixture
+def make_channel():
+    """
+    Channel factory: 1M sats, 50/50 AR targets, `local_pct` of it local
+    """
+    def make(chan_id, ar=False, local_pct=50, local_fee_rate=100, remote_fee_rate=10):
+        return Channel(
+            chan_id=str(chan_id), pubkey=f"pk{chan_id}", alias=f"peer-{chan_id}",
+            capacity=1_000_000, local=local_pct * 10_000, remote=(100 - local_pct) * 10_000,
+            local_pct=local_pct, ar_out_target=50, ar_in_target=50, ar=ar,
+            local_fee_rate=local_fee_rate, remote_fee_rate=remote_fee_rate, ar_max_cost=50,
+        )
+    return make
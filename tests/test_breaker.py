@@ -0,0 +1,62 @@
+from breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker
+
+
+def test_opens_after_consecutive_failures(clock):
+    br = CircuitBreaker("lndg", failures=3, reset_timeout=30, clock=clock)
+    assert br.failure("boom") is None
+    assert br.failure("boom") is None
+    assert br.success() is None  # sucesso zera a contagem
+    assert br.failure("boom") is None
+    assert br.failure("boom") is None
+    msg = br.failure("boom")
+
+    assert br.state == OPEN
+    assert "open after 3 failure(s)" in msg
+    assert not br.allow()
+    assert br.refused == 1
+
+
+def test_half_open_lets_one_probe_through(clock):
+    br = CircuitBreaker("lndg", failures=1, reset_timeout=30, clock=clock)
+    br.failure("boom")
+
+    clock.now += 30
+    assert br.allow()
+    assert br.state == HALF_OPEN
+    assert not br.allow()  # um probe por vez
+
+    assert "recovered" in br.success()
+    assert br.state == CLOSED
+    assert br.allow()
+
+
+def test_failed_probe_doubles_the_wait(clock):
+    br = CircuitBreaker("lndg", failures=1, reset_timeout=30, max_reset_timeout=100, clock=clock)
+    br.failure("boom")
+
+    for wait in (60, 100, 100):
+        clock.now += br.retry_in()
+        assert br.allow()
+        assert "probe failed" in br.failure("still down")
+        assert br.retry_in() == wait
+
+
+def test_stuck_probe_is_replaced(clock):
+    br = CircuitBreaker("lndg", failures=1, reset_timeout=30, clock=clock)
+    br.failure("boom")
+    clock.now += 30
+    assert br.allow()
+    clock.now += 30
+    assert br.allow()
+
+
+def test_stats(clock):
+    br = CircuitBreaker("lndg", failures=1, reset_timeout=30, clock=clock)
+    br.failure(TimeoutError())
+    clock.now += 10
+
+    st = br.stats()
+    assert st["state"] == OPEN
+    assert st["retry_in_s"] == 20
+    assert st["opens"] == 1
+    assert st["last_error"] == "TimeoutError"
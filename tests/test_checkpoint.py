@@ -0,0 +1,68 @@
+import json
+import time
+
+from checkpoint import (
+    CHECKPOINT_VERSION, atomic_write_json, load_checkpoint, read_json, resume_snapshot, save_checkpoint,
+)
+
+
+def test_atomic_write_round_trip_leaves_no_temp_files(tmp_path):
+    path = tmp_path / "data.json"
+    atomic_write_json(str(path), {"a": [1, 2], "b": None})
+    atomic_write_json(str(path), {"a": [3]})
+
+    assert read_json(str(path)) == {"a": [3]}
+    assert [p.name for p in tmp_path.iterdir()] == ["data.json"]
+
+
+def test_read_json_is_none_when_missing_or_invalid(tmp_path):
+    path = tmp_path / "data.json"
+    assert read_json(str(path)) is None
+    path.write_text('{"a": ')
+    assert read_json(str(path)) is None
+
+
+def test_checkpoint_round_trip(tmp_path):
+    path = str(tmp_path / "checkpoint.json")
+    save_checkpoint(path, {"workers": {"1": {"amount": 50_000}}})
+
+    state = load_checkpoint(path, max_age=60)
+    assert state["workers"] == {"1": {"amount": 50_000}}
+    assert state["version"] == CHECKPOINT_VERSION
+
+
+def write(path, saved_at, version=CHECKPOINT_VERSION):
+    path.write_text(json.dumps({"version": version, "saved_at": saved_at}))
+
+
+def test_stale_or_foreign_checkpoints_are_rejected(tmp_path):
+    path = tmp_path / "checkpoint.json"
+    now = time.time()
+
+    write(path, now - 30)
+    assert load_checkpoint(str(path), max_age=60) is not None
+
+    write(path, now - 120)
+    assert load_checkpoint(str(path), max_age=60) is None
+
+    # relógio voltou no tempo: não confia no snapshot
+    write(path, now + 3600)
+    assert load_checkpoint(str(path), max_age=60) is None
+
+    write(path, now, version=CHECKPOINT_VERSION + 1)
+    assert load_checkpoint(str(path), max_age=60) is None
+
+
+def test_resume_uses_only_a_recent_snapshot_with_the_same_fields():
+    fields = ("chan_id", "local")
+    now = time.time()
+
+    def ckpt(age, saved_fields=fields):
+        return {"snapshot": {"taken_at": now - age, "fields": list(saved_fields), "rows": [["1", 10]]}}
+
+    taken_at, rows = resume_snapshot(ckpt(30), fields, max_age=120)
+    assert taken_at == now - 30 and rows == [["1", 10]]
+
+    assert resume_snapshot(ckpt(300), fields, max_age=120) is None
+    assert resume_snapshot(ckpt(30, ("chan_id",)), fields, max_age=120) is None
+    assert resume_snapshot({"snapshot": None}, fields, max_age=120) is None
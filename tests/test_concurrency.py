@@ -0,0 +1,56 @@
+from concurrency import AIMDController
+
+
+def feed(ctl, runs, success_rate, latency):
+    changes = []
+    for i in range(runs):
+        # sucessos espalhados: cada janela vê a mesma taxa
+        ok = int((i + 1) * success_rate) > int(i * success_rate)
+        change = ctl.record(ok, latency)
+        if change is not None:
+            changes.append(change)
+    return changes
+
+
+def test_grows_while_healthy():
+    ctl = AIMDController(1, 4, window=10)
+    feed(ctl, 10, 0.5, 30)
+    assert ctl.limit == 2
+    feed(ctl, 30, 0.5, 30)
+    assert ctl.limit == 4
+    assert ctl.increases == 3
+
+
+def test_backs_off_on_significant_success_drop():
+    ctl = AIMDController(1, 8, window=20, backoff=0.5)
+    feed(ctl, 20, 0.6, 30)  # referência no limite 1
+    assert ctl.limit == 2
+
+    changes = feed(ctl, 20, 0.05, 30)
+    assert ctl.limit == 1
+    assert changes[-1][:2] == (2, 1)
+    assert "success" in changes[-1][2]
+    assert ctl.last_window["verdict"] == "degraded"
+
+
+def test_backs_off_on_latency():
+    ctl = AIMDController(1, 8, window=20)
+    feed(ctl, 20, 0.5, 20)
+    changes = feed(ctl, 20, 0.5, 200)
+    assert ctl.limit == 1
+    assert "latency" in changes[-1][2]
+
+
+def test_bounds_and_snapshot():
+    ctl = AIMDController(2, 3, window=5)
+    assert ctl.limit == 2
+    feed(ctl, 50, 1.0, 10)
+    assert ctl.limit == 3
+
+    ctl.set_bounds(1, 2)
+    assert ctl.limit == 2
+
+    other = AIMDController(1, 2, window=5)
+    other.restore(ctl.snapshot())
+    assert other.limit == ctl.limit
+    assert other.stats()["levels"] == ctl.stats()["levels"]
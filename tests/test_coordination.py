@@ -0,0 +1,87 @@
+from collections import Counter
+
+from coordination import LeaseStore, owner_of
+
+
+def test_owner_of_is_deterministic_and_balanced():
+    members = ["a", "b", "c"]
+    owners = [owner_of(f"chan-{i}", members) for i in range(3000)]
+
+    assert owners == [owner_of(f"chan-{i}", list(reversed(members))) for i in range(3000)]
+    counts = Counter(owners)
+    assert set(counts) == set(members)
+    assert min(counts.values()) > 800
+
+
+def test_owner_of_only_moves_the_leavers_items():
+    before = {i: owner_of(f"chan-{i}", ["a", "b", "c"]) for i in range(1000)}
+    after = {i: owner_of(f"chan-{i}", ["a", "c"]) for i in range(1000)}
+
+    for i, owner in before.items():
+        if owner != "b":
+            assert after[i] == owner
+
+
+def test_leases_are_exclusive_until_released(tmp_path):
+    path = str(tmp_path / "leases.db")
+    a = LeaseStore(path, "a")
+    b = LeaseStore(path, "b")
+
+    assert a.acquire(["chan:1", "chan:2"], ttl=60)
+    assert not b.acquire(["chan:2", "chan:3"], ttl=60)
+    # tudo ou nada: chan:3 não ficou com b
+    assert a.holder("chan:3") is None
+    assert a.acquire(["chan:1"], ttl=60)  # renovar a própria
+
+    a.release(["chan:1", "chan:2"])
+    assert b.acquire(["chan:2", "chan:3"], ttl=60)
+
+
+def test_expired_lease_can_be_taken(tmp_path):
+    path = str(tmp_path / "leases.db")
+    a = LeaseStore(path, "a")
+    b = LeaseStore(path, "b")
+
+    assert a.acquire(["role:notifier"], ttl=-1)
+    assert b.acquire(["role:notifier"], ttl=60)
+    assert a.holder("role:notifier") == "b"
+
+
+def test_close_drops_own_leases(tmp_path):
+    path = str(tmp_path / "leases.db")
+    a = LeaseStore(path, "a")
+    b = LeaseStore(path, "b")
+
+    a.acquire(["member:a"], ttl=60)
+    a.acquire(["chan:1"], ttl=60, owner="a/w1")
+    assert b.live("member:") == ["a"]
+
+    a.close()
+    assert b.live("member:") == []
+    assert b.acquire(["chan:1"], ttl=60)
+    assert not a.acquire(["chan:9"], ttl=60)
+
+
+def test_update_is_read_modify_write(tmp_path):
+    store = LeaseStore(str(tmp_path / "leases.db"), "a")
+
+    store.update("ladder", lambda v: {"cycle": v["cycle"] + 1}, default={"cycle": 0})
+    store.update("ladder", lambda v: {"cycle": v["cycle"] + 1}, default={"cycle": 0})
+    assert store.get("ladder") == {"cycle": 2}
+    assert store.get("missing", 7) == 7
+
+
+def test_wildcards_in_owner_ids_are_literal(tmp_path):
+    path = str(tmp_path / "leases.db")
+    a = LeaseStore(path, "host_1")
+    b = LeaseStore(path, "hostX1")
+
+    assert b.acquire(["chan:1"], ttl=60, owner="hostX1/w1")
+    assert a.renew_owned(60) == 0
+    a.close()
+    assert a.holder("chan:1") == "hostX1/w1"
+
+    c = LeaseStore(path, "100%")
+    assert c.acquire(["chan:2"], ttl=60, owner="100%/w1")
+    assert LeaseStore(path, "100").renew_owned(60) == 0
+    assert c.renew_owned(60) == 1
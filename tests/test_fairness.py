@@ -0,0 +1,89 @@
+import random
+
+from fairness import TargetFairness
+
+
+def keys(pairs):
+    return [(p.source.chan_id, p.target.chan_id) for p in pairs]
+
+
+def test_walk_yields_every_pair_once(make_channel, clock):
+    sources = [make_channel(i, False) for i in range(4)]
+    targets = [make_channel(100 + i, True) for i in range(6)]
+    fair = TargetFairness(runs_per_cycle=3, clock=clock)
+
+    got = keys(fair.walk(list(sources), list(targets), random.Random(2)))
+    assert len(got) == len(set(got)) == 24
+
+
+def test_walk_skips_self_pairs(make_channel, clock):
+    both = make_channel(1, False)
+    fair = TargetFairness(clock=clock)
+    got = keys(fair.walk([both, make_channel(2, False)], [both]))
+    assert got == [("2", "1")]
+
+
+def test_funded_targets_take_turns(make_channel, clock):
+    sources = [make_channel(i, False) for i in range(3)]
+    targets = [make_channel(100 + i, True) for i in range(3)]
+    fair = TargetFairness(runs_per_cycle=3, clock=clock)
+
+    # 1 run por ciclo cabe p/ cada alvo → primeira rodada passa por todos
+    first = keys(fair.walk(list(sources), list(targets)))[:3]
+    assert sorted(t for _, t in first) == ["100", "101", "102"]
+
+
+def test_charged_target_waits_for_the_others(make_channel, clock):
+    sources = [make_channel(i, False) for i in range(2)]
+    targets = [make_channel(100 + i, True) for i in range(2)]
+    fair = TargetFairness(runs_per_cycle=1, clock=clock)
+
+    walk = fair.walk(list(sources), list(targets))
+    first = next(walk)
+    fair.charge(first.target.chan_id, 30)
+    walk.close()
+
+    clock.now += 60
+    nxt = next(fair.walk(list(sources), list(targets)))
+    assert nxt.target.chan_id != first.target.chan_id
+
+
+def test_credit_is_capped(make_channel, clock):
+    targets = [make_channel(100, True)]
+    fair = TargetFairness(runs_per_cycle=1, max_credit_cycles=4, clock=clock)
+    for _ in range(10):
+        fair.replenish(targets)
+    assert fair.deficit("100") == 4
+
+
+def test_forgets_targets_no_longer_depleted(make_channel, clock):
+    fair = TargetFairness(clock=clock)
+    fair.replenish([make_channel(100, True), make_channel(101, True)])
+    fair.replenish([make_channel(101, True)])
+    assert fair.deficit("100") == 0
+    assert [w["chan_id"] for w in fair.waits()] == ["101"]
+
+
+def test_snapshot_restore(make_channel, clock):
+    fair = TargetFairness(clock=clock)
+    fair.replenish([make_channel(100, True)])
+    fair.charge("100", 12.5)
+
+    other = TargetFairness(clock=clock)
+    other.restore(fair.snapshot())
+    assert other.waits() == fair.waits()
+
+
+def test_credit_is_added_once_per_round(make_channel, clock):
+    targets = [make_channel(100, True), make_channel(101, True)]
+    one = TargetFairness(runs_per_cycle=2, workers=1, clock=clock)
+    three = TargetFairness(runs_per_cycle=2, workers=3, clock=clock)
+
+    one.start_cycle(targets)
+    opened = [three.start_cycle(targets) for _ in range(6)]
+
+    assert opened == [True, False, False, True, False, False]
+    # 2 rodadas × 3 workers × 2 runs ÷ 2 alvos
+    assert three.deficit("100") == 6
+    assert [w["cycles_waiting"] for w in three.waits()] == [2, 2]
+    assert one.deficit("100") == 1
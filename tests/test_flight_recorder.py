@@ -0,0 +1,53 @@
+import os
+
+from flight_recorder import FlightRecorder
+
+
+def feed(recorder, *chunks):
+    r, w = os.pipe()
+    for chunk in chunks:
+        os.write(w, chunk)
+    os.close(w)
+    with os.fdopen(r, "rb", buffering=0) as stream:
+        recorder.consume(stream)
+
+
+def test_keeps_last_max_bytes():
+    rec = FlightRecorder(max_bytes=10)
+    for chunk in (b"aaaa", b"bbbb", b"cccc", b"dddd"):
+        rec._append(chunk)
+
+    assert rec.tail() == b"bbccccdddd"
+    assert rec.total == 16
+    assert rec.dropped == 4  # só chunks inteiros saem
+
+
+def test_zero_bytes_buffers_nothing():
+    rec = FlightRecorder(max_bytes=0)
+    feed(rec, b"x" * 1000)
+
+    assert rec.tail() == b""
+    assert rec.total == 1000
+    assert rec.dropped == 1000
+
+
+def test_chunk_larger_than_buffer():
+    rec = FlightRecorder(max_bytes=4)
+    rec._append(b"0123456789")
+    rec._append(b"ab")
+
+    assert rec.tail() == b"89ab"
+
+
+def test_consume_forwards_lines():
+    rec = FlightRecorder(max_bytes=1024)
+    lines = []
+    r, w = os.pipe()
+    os.write(w, b"one\ntwo\nthr")
+    os.write(w, b"ee")
+    os.close(w)
+    with os.fdopen(r, "rb", buffering=0) as stream:
+        rec.consume(stream, on_line=lines.append)
+
+    assert lines == ["one", "two", "three"]
+    assert rec.tail() == b"one\ntwo\nthree"
@@ -0,0 +1,54 @@
+import pytest
+
+from latency import BUCKETS, LatencyHistograms, bucket_of
+
+
+def test_bucket_upper_bound_covers_the_duration():
+    for seconds in (0.5, 1, 7, 59.9, 600, 3600):
+        assert BUCKETS[bucket_of(seconds)] >= seconds
+    assert bucket_of(10 ** 6) == len(BUCKETS) - 1
+
+
+def test_timeout_falls_back_to_broader_levels(clock):
+    h = LatencyHistograms(clock=clock)
+    for _ in range(5):
+        h.record("s1", "t1", 30)
+
+    assert h.timeout("s1", "t1")[1] == "pair"
+    assert h.timeout("s2", "t1")[1] == "target"
+    assert h.timeout("s1", "t2")[1] == "source"
+    assert h.timeout("s2", "t2") is None
+
+
+def test_quantile_follows_the_tail(clock):
+    h = LatencyHistograms(clock=clock)
+    for _ in range(90):
+        h.record("s", "t", 10)
+    for _ in range(10):
+        h.record("s", "t", 200)
+
+    assert h.timeout("s", "t", q=0.5)[0] < 15
+    assert h.timeout("s", "t", q=0.95)[0] >= 200
+
+
+def test_old_samples_decay(clock):
+    h = LatencyHistograms(half_life=3600, clock=clock)
+    for _ in range(8):
+        h.record("s", "t", 10)
+
+    clock.now += 3600
+    assert h.timeout("s", "t", min_samples=3.5)[2] == pytest.approx(4)
+    assert h.timeout("s", "t", min_samples=4.5) is None
+
+
+def test_save_load_round_trip(tmp_path, clock):
+    path = str(tmp_path / "latency.json")
+    h = LatencyHistograms(clock=clock)
+    for _ in range(6):
+        h.record("s", "t", 42)
+    h.save(path)
+    assert not h.dirty
+
+    other = LatencyHistograms(clock=clock)
+    assert other.load(path)
+    assert other.timeout("s", "t") == h.timeout("s", "t")
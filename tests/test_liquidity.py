@@ -0,0 +1,74 @@
+import dataclasses
+
+from liquidity import LiquidityProjection
+from models import Pair
+
+
+def shifted(c, sats):
+    local = c.local + sats
+    return dataclasses.replace(c, local=local, remote=c.capacity - local,
+                               local_pct=int(local * 100 / c.capacity))
+
+
+def test_success_is_projected_on_both_channels(make_channel, clock):
+    src, tgt = make_channel(1, False, 60), make_channel(100, True, 10)
+    proj = LiquidityProjection(clock=clock)
+    taken_at = clock()
+    assert proj.eligible(Pair(src, tgt), taken_at)
+
+    clock.now += 5
+    proj.record(Pair(src, tgt), 200_000)
+
+    assert proj.view(src, taken_at).local_pct == 40
+    assert proj.view(tgt, taken_at).local_pct == 30
+    # origem ficaria abaixo do alvo de saída
+    assert not proj.eligible(Pair(src, tgt), taken_at)
+    assert proj.pending() == 2
+
+
+def test_moves_expire_after_max_age(make_channel, clock):
+    src, tgt = make_channel(1, False, 60), make_channel(100, True, 10)
+    proj = LiquidityProjection(max_age=900, clock=clock)
+    taken_at = clock()
+    proj.record(Pair(src, tgt), 200_000)
+
+    clock.now += 899
+    assert proj.delta("1", taken_at) == -200_000
+    clock.now += 1
+    assert proj.delta("1", taken_at) == 0
+    assert proj.eligible(Pair(src, tgt), taken_at)
+
+    assert proj.reconcile([src, tgt], clock()) == 0
+    assert proj.pending() == 0
+
+
+def test_landed_moves_stop_applying_to_later_snapshots(make_channel, clock):
+    src, tgt = make_channel(1, False, 60), make_channel(100, True, 10)
+    proj = LiquidityProjection(clock=clock)
+    old = clock()
+    proj.record(Pair(src, tgt), 200_000)
+
+    # LNDg ainda não mostra o run: continua projetado
+    clock.now += 30
+    assert proj.reconcile([src, tgt], clock()) == 0
+    assert proj.delta("1", clock()) == -200_000
+
+    # mostra pelo menos metade → landed
+    clock.now += 30
+    fresh = clock()
+    assert proj.reconcile([shifted(src, -100_000), shifted(tgt, 200_000)], fresh) == 2
+    assert proj.delta("1", fresh) == 0
+    assert proj.delta("100", fresh) == 0
+    # snapshot anterior ao run continua vendo o movimento
+    assert proj.delta("1", old) == -200_000
+
+
+def test_view_clamps_to_capacity(make_channel, clock):
+    tgt = make_channel(100, True, 90)
+    proj = LiquidityProjection(clock=clock)
+    proj.record(Pair(make_channel(1, False, 60), tgt), 500_000)
+
+    view = proj.view(tgt, clock() - 1)
+    assert (view.local, view.remote, view.local_pct) == (1_000_000, 0, 100)
+    other = make_channel(2, False, 60)
+    assert proj.view(other, 0) is other
@@ -0,0 +1,74 @@
+import io
+import threading
+
+from logging_utils import LogSink, RotatingFile
+
+
+def test_counts_survive_concurrent_producers():
+    sink = LogSink(stream=io.StringIO(), queue_size=100, rate_max=10 ** 9)
+    sink._thread = threading.current_thread()  # enfileira sem writer: nada é drenado
+
+    def produce():
+        for i in range(2000):
+            sink.emit(f"line {i}")
+
+    threads = [threading.Thread(target=produce) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert sink.stats["enqueued"] == 100
+    assert sink.stats["dropped"] == 8 * 2000 - 100
+
+
+def test_rotates_once_the_size_limit_is_reached(tmp_path):
+    path = tmp_path / "orchestrator.log"
+    f = RotatingFile(str(path), max_bytes=100, backups=2)
+
+    for i in range(4):
+        f.write_lines([(0, f"{i}" * 99)])  # 100 bytes com o \n
+    f.close()
+
+    assert path.read_text() == "3" * 99 + "\n"
+    assert (tmp_path / "orchestrator.log.1").read_text() == "2" * 99 + "\n"
+    assert (tmp_path / "orchestrator.log.2").read_text() == "1" * 99 + "\n"
+    assert not (tmp_path / "orchestrator.log.3").exists()
+
+
+def test_below_the_limit_keeps_appending(tmp_path):
+    path = tmp_path / "orchestrator.log"
+    f = RotatingFile(str(path), max_bytes=1000)
+    for i in range(3):
+        f.write_lines([(0, f"line {i}")])
+    f.close()
+
+    assert path.read_text().splitlines() == ["line 0", "line 1", "line 2"]
+    assert [p.name for p in tmp_path.iterdir()] == ["orchestrator.log"]
+
+
+def test_repeats_are_limited_per_target_and_text(tmp_path):
+    out = io.StringIO()
+    sink = LogSink(stream=out, rate_max=2)
+    errors = RotatingFile(str(tmp_path / "errors.log"))
+    sink.add_file("errors", errors)
+
+    for _ in range(5):
+        sink.emit("LNDg timeout")
+        sink.emit("LNDg timeout", "errors")
+    sink.emit("other line")
+
+    assert out.getvalue().splitlines() == ["LNDg timeout", "LNDg timeout", "other line"]
+    assert sink.stats["suppressed"] == 6
+
+    # janela seguinte: resume o que foi suprimido e volta a escrever
+    sink._rate_started -= sink.rate_window
+    sink.emit("LNDg timeout")
+    errors.close()
+
+    assert out.getvalue().splitlines()[-2:] == [
+        "[LOG] suppressed 3 repeat(s) of: LNDg timeout", "LNDg timeout",
+    ]
+    assert (tmp_path / "errors.log").read_text().splitlines() == [
+        "LNDg timeout", "LNDg timeout", "[LOG] suppressed 3 repeat(s) of: LNDg timeout",
+    ]
@@ -0,0 +1,112 @@
+import random
+
+import pytest
+
+from logic import (
+    RUN_ESTIMATE_MAX_SHARE, econ_runs_saved, economically_feasible, expected_run, iter_pairs,
+    update_run_estimate,
+)
+
+
+@pytest.fixture
+def node(make_channel):
+    # origens: sem AR e acima do alvo de saída; alvos: AR e abaixo do alvo de entrada
+    def make(n_src=5, n_tgt=7):
+        return (
+            [make_channel(i, False, 90) for i in range(n_src)] +
+            [make_channel(100 + i, True, 10) for i in range(n_tgt)]
+        )
+    return make
+
+
+def keys(pairs):
+    return [(p.source.chan_id, p.target.chan_id) for p in pairs]
+
+
+def all_pairs(channels):
+    src = [c.chan_id for c in channels if not c.ar]
+    tgt = [c.chan_id for c in channels if c.ar]
+    return {(s, t) for s in src for t in tgt}
+
+
+def test_fixed_walk_covers_every_pair_once(node):
+    chs = node()
+    got = keys(iter_pairs(chs))
+    assert len(got) == len(set(got))
+    assert set(got) == all_pairs(chs)
+
+
+def test_random_walk_is_a_permutation(node):
+    chs = node(6, 9)
+    for seed in range(20):
+        got = keys(iter_pairs(list(chs), random.Random(seed)))
+        assert len(got) == len(set(got)) == 54
+        assert set(got) == all_pairs(chs)
+
+
+def test_random_walk_changes_order(node):
+    chs = node(6, 9)
+    orders = {tuple(keys(iter_pairs(list(chs), random.Random(seed)))) for seed in range(5)}
+    assert len(orders) > 1
+
+
+def test_target_filter_and_defer(node):
+    chs = node(3, 4)
+    bad = {"100", "101"}
+    stats = {}
+    got = keys(iter_pairs(chs, random.Random(1), target_ok=lambda t: t.chan_id not in bad,
+                          defer=True, stats=stats))
+
+    assert stats == {"sources": 3, "targets": 2, "rejected_targets": 2, "rejected_pairs": 6}
+    assert set(got) == all_pairs(chs)
+    # alvos rejeitados só depois de todos os aceitos
+    assert all(t in bad for _, t in got[6:])
+    assert all(t not in bad for _, t in got[:6])
+
+    dropped = keys(iter_pairs(chs, target_ok=lambda t: t.chan_id not in bad))
+    assert len(dropped) == 6
+
+
+def test_target_rank_walks_best_target_first(node):
+    chs = node(4, 5)
+    score = {"103": 9.0, "101": 5.0}
+    got = keys(iter_pairs(list(chs), random.Random(3), target_rank=lambda c: score.get(c.chan_id, 0.0)))
+
+    assert set(got) == all_pairs(chs)
+    assert [t for _, t in got[:4]] == ["103"] * 4
+    assert [t for _, t in got[4:8]] == ["101"] * 4
+
+
+def test_no_sources_or_targets(make_channel):
+    assert list(iter_pairs([make_channel(1, False, 90)])) == []
+    assert list(iter_pairs([make_channel(1, True, 10)], random.Random(1))) == []
+
+
+def test_economically_feasible(make_channel):
+    # 50% de 100 ppm = 50 ppm disponíveis
+    assert economically_feasible(make_channel(1, True, 10, remote_fee_rate=40))
+    assert not economically_feasible(make_channel(1, True, 10, remote_fee_rate=60))
+    assert not economically_feasible(make_channel(1, True, 10, remote_fee_rate=40), min_route_ppm=20)
+    assert economically_feasible(make_channel(1, True, 10, remote_fee_rate=60), fee_limit_ppm=100)
+
+
+def test_econ_runs_saved():
+    stats = {"sources": 2, "targets": 3, "rejected_pairs": 4}
+    assert econ_runs_saved(stats, runs=10, ran_rejected=0, completed=True) == 4
+    assert econ_runs_saved(stats, runs=5, ran_rejected=0, completed=False) == 2
+    assert econ_runs_saved({}, runs=5, ran_rejected=0, completed=False) == 0
+
+
+def test_expected_run_bounds():
+    assert expected_run(None, 20, 300) == 20
+    assert expected_run(5, 20, 300) == 20
+    assert expected_run(80, 20, 300) == 80
+    # estimativa perto do orçamento do ciclo → teto
+    assert expected_run(299, 20, 300) == 300 * RUN_ESTIMATE_MAX_SHARE
+    # piso acima do ciclo → ainda cabe um run por ciclo
+    assert expected_run(None, 20, 10) < 10
+
+
+def test_update_run_estimate():
+    assert update_run_estimate(None, 30) == 30
+    assert update_run_estimate(30, 80) == 40
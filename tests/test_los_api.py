@@ -0,0 +1,40 @@
+import asyncio
+
+import pytest
+
+import los_api
+
+
+def test_closed_client_fails_fast():
+    client = los_api.LosClient("http://127.0.0.1:9", timeout=1)
+    client.close()
+
+    with pytest.raises(RuntimeError, match="closed"):
+        client.get("/api/rebalance/config")
+    with pytest.raises(RuntimeError, match="closed"):
+        asyncio.run(client.get_async("/api/rebalance/config"))
+
+
+def test_reset_client_closes_shared_clients(monkeypatch, tmp_path):
+    monkeypatch.setenv("LOS_CACHE_DIR", "none")
+    client = los_api.get_client("http://127.0.0.1:9", False)
+    assert los_api.get_client("http://127.0.0.1:9/", False) is client
+
+    los_api.reset_client()
+    assert los_api.get_client("http://127.0.0.1:9", False) is not client
+    with pytest.raises(RuntimeError, match="closed"):
+        client.get("/api/rebalance/config")
+    los_api.reset_client()
+
+
+def test_cache_dir_defaults_under_base_dir(monkeypatch, tmp_path):
+    monkeypatch.delenv("LOS_CACHE_DIR", raising=False)
+    monkeypatch.setenv("ORCHESTRATOR_BASE_DIR", str(tmp_path))
+    client = los_api.client_from_env("http://127.0.0.1:9", False)
+    assert client.cache_dir == str(tmp_path / "los_cache")
+    client.close()
+
+    monkeypatch.setenv("LOS_CACHE_DIR", "none")
+    client = los_api.client_from_env("http://127.0.0.1:9", False, cache_dir=str(tmp_path))
+    assert client.cache_dir is None
+    client.close()
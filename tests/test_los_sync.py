@@ -0,0 +1,188 @@
+import pytest
+
+import los_sync
+from los_sync import LosSyncEngine, channel_fingerprint, desired_lndg_state, lndg_diff
+
+
+def los_channel(chan_id="1", **kw):
+    ch = {
+        "channel_id": chan_id,
+        "peer_alias": f"peer-{chan_id}",
+        "target_outbound_pct": 30,
+        "auto_enabled": True,
+        "excluded_as_source": False,
+        "econ_ratio_override": None,
+        "use_default_econ_ratio": True,
+        "eligible_as_target": False,
+        "eligible_as_source": False,
+    }
+    ch.update(kw)
+    return ch
+
+
+def lndg_channel(chan_id="1", **kw):
+    ch = {"chan_id": chan_id, "alias": f"peer-{chan_id}", "ar_in_target": 70,
+          "ar_out_target": 5, "auto_rebalance": True, "ar_max_cost": 50, "ar_amt_target": 100_000}
+    ch.update(kw)
+    return ch
+
+# =========================
+# RULES
+# =========================
+
+def test_in_out_targets():
+    d = desired_lndg_state(los_channel(target_outbound_pct=30), 0.5)
+    assert (d["ar_in_target"], d["ar_out_target"]) == (70, 5)
+
+    d = desired_lndg_state(los_channel(target_outbound_pct=None, excluded_as_source=True), 0.5)
+    assert (d["ar_in_target"], d["ar_out_target"]) == (100, 100)
+
+
+def test_ar_flag_and_reason():
+    d = desired_lndg_state(los_channel(auto_enabled=False), 0.5)
+    assert d["auto_rebalance"] is False
+    assert d["reason"] == "auto_enabled = false (fallback)"
+
+    ch = los_channel(auto_enabled=False, eligible_as_target=True)
+    assert desired_lndg_state(ch, 0.5)["auto_rebalance"] is False
+    d = desired_lndg_state(ch, 0.5, use_target_eligibility=True)
+    assert d["auto_rebalance"] is True
+    assert "TARGET" in d["reason"]
+
+    # origem vence alvo, como no script
+    ch = los_channel(eligible_as_target=True, eligible_as_source=True)
+    d = desired_lndg_state(ch, 0.5, use_target_eligibility=True, use_source_eligibility=True)
+    assert d["auto_rebalance"] is False
+    assert "SOURCE" in d["reason"]
+
+
+def test_econ_override_versus_default():
+    d = desired_lndg_state(los_channel(), 0.6)
+    assert (d["ar_max_cost"], d["econ_source"]) == (60, "default")
+
+    d = desired_lndg_state(los_channel(use_default_econ_ratio=False, econ_ratio_override=0.8), 0.6)
+    assert (d["ar_max_cost"], d["econ_source"]) == (80, "override")
+
+    # override ignorado enquanto use_default_econ_ratio não é false
+    d = desired_lndg_state(los_channel(econ_ratio_override=0.8), 0.6)
+    assert d["econ_source"] == "default"
+
+
+@pytest.mark.parametrize("ratio, cost", [(0.555, 55), (0.29, 28), (0.57, 56), (1, 100)])
+def test_max_cost_truncates_like_the_script(ratio, cost):
+    assert desired_lndg_state(los_channel(), ratio)["ar_max_cost"] == cost
+
+
+def test_diff_empty_when_in_sync():
+    desired = desired_lndg_state(los_channel(), 0.5)
+    assert lndg_diff(lndg_channel(ar_in_target="70", ar_max_cost=50), desired) == {}
+
+    diff = lndg_diff(lndg_channel(ar_out_target=100, auto_rebalance=False), desired)
+    assert diff == {"ar_out_target": (100, 5), "auto_rebalance": (False, True)}
+
+
+def test_fingerprint_covers_los_econ_and_lndg():
+    fp = channel_fingerprint(los_channel(), lndg_channel(), 0.5)
+    assert fp == channel_fingerprint(los_channel(), lndg_channel(alias="renamed"), 0.5)
+    assert fp != channel_fingerprint(los_channel(target_outbound_pct=40), lndg_channel(), 0.5)
+    assert fp != channel_fingerprint(los_channel(), lndg_channel(), 0.6)
+    assert fp != channel_fingerprint(los_channel(), lndg_channel(ar_max_cost=49), 0.5)
+
+# =========================
+# ENGINE
+# =========================
+
+class FakeLos:
+    def __init__(self, channels, econ_ratio=0.5):
+        self.data = {
+            "/api/rebalance/config": {"econ_ratio": econ_ratio},
+            "/api/rebalance/channels": {"channels": channels},
+        }
+
+    async def get_async(self, path, fresh=False):
+        return self.data[path]
+
+
+@pytest.fixture
+def engine(tmp_path, monkeypatch):
+    for name in ("LOS_SYNC_DRY_RUN", "TELEGRAM_SYNC_TO_LNDG_TOKEN", "TELEGRAM_SYNC_TO_LNDG_CHAT_ID"):
+        monkeypatch.delenv(name, raising=False)
+
+    lndg = {}
+    puts = []
+    failing = set()
+
+    async def fetch_all_channels(session, base_url, auth, query=""):
+        return list(lndg.values())
+
+    async def put_channel(self, session, sem, base_url, auth, chan_id, body):
+        puts.append((chan_id, body))
+        if chan_id in failing:
+            raise RuntimeError(f"LNDg PUT {chan_id} → 500")
+        lndg[chan_id] = {**lndg[chan_id], **body}
+
+    monkeypatch.setattr(los_sync, "fetch_all_channels", fetch_all_channels)
+    monkeypatch.setattr(LosSyncEngine, "_put_channel", put_channel)
+
+    def make(los_channels, **kw):
+        eng = LosSyncEngine(str(tmp_path / "index.json"), lndg_config=("http://lndg", None),
+                            los_client=FakeLos(los_channels, **kw))
+        eng.lndg, eng.puts, eng.failing = lndg, puts, failing
+        return eng
+
+    return make
+
+
+def test_run_puts_only_changed_channels(engine):
+    eng = engine([los_channel("1"), los_channel("2", auto_enabled=False), los_channel("3")])
+    eng.lndg.update({"1": lndg_channel("1"), "2": lndg_channel("2")})
+
+    stats = eng.run()
+    assert stats["changed"] == stats["updated"] == 1
+    assert stats["missing_in_lndg"] == 1
+    assert eng.puts == [("2", {"ar_in_target": 70, "ar_out_target": 5, "auto_rebalance": False,
+                               "ar_amt_target": 100_000, "ar_max_cost": 50})]
+    assert set(eng.index) == {"1", "2"}
+
+
+def test_unchanged_fingerprints_are_skipped(engine):
+    eng = engine([los_channel("1"), los_channel("2", auto_enabled=False)])
+    eng.lndg.update({"1": lndg_channel("1"), "2": lndg_channel("2")})
+    eng.run()
+    eng.puts.clear()
+
+    stats = eng.run()
+    assert stats["skipped"] == 2
+    assert eng.puts == []
+
+    # índice persistido: um engine novo também pula
+    again = engine([los_channel("1"), los_channel("2", auto_enabled=False)])
+    assert again.run()["skipped"] == 2
+
+
+def test_failed_put_stays_out_of_the_index(engine):
+    eng = engine([los_channel("1", auto_enabled=False), los_channel("2", auto_enabled=False)])
+    eng.lndg.update({"1": lndg_channel("1"), "2": lndg_channel("2")})
+    eng.failing.add("2")
+
+    with pytest.raises(RuntimeError, match="1 LNDg update"):
+        eng.run()
+    assert set(eng.index) == {"1"}
+    assert eng.error_count == 1
+
+    eng.failing.clear()
+    eng.puts.clear()
+    stats = eng.run()
+    assert [chan_id for chan_id, _ in eng.puts] == ["2"]
+    assert stats["skipped"] == 1
+    assert eng.error_count == 0
+
+
+def test_dry_run_writes_nothing(engine, monkeypatch):
+    monkeypatch.setenv("LOS_SYNC_DRY_RUN", "true")
+    eng = engine([los_channel("1", auto_enabled=False)])
+    eng.lndg.update({"1": lndg_channel("1")})
+
+    assert eng.run()["changed"] == 1
+    assert eng.puts == []
+    assert eng.index == {}
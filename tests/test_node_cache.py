@@ -0,0 +1,76 @@
+import os
+import time
+
+from node_cache import NodeCache
+
+
+def cache(tmp_path, seed=b"seed"):
+    src = tmp_path / "cache.dat"
+    src.write_bytes(seed)
+    nc = NodeCache(str(tmp_path / "node_cache"))
+    nc.warm(seed=str(src))
+    return nc
+
+
+def read(path):
+    with open(path, "rb") as f:
+        return f.read()
+
+
+def test_warm_seeds_the_master_only_once(tmp_path):
+    nc = cache(tmp_path)
+    (tmp_path / "cache.dat").write_bytes(b"newer template")
+    nc.warm(seed=str(tmp_path / "cache.dat"))
+
+    assert read(nc.master) == b"seed"
+
+
+def test_checkout_without_master_starts_empty(tmp_path):
+    nc = NodeCache(str(tmp_path / "node_cache"))
+    nc.warm()
+
+    path, before = nc.checkout("w1")
+    assert before is None and not os.path.exists(path)
+    assert nc.checkin(path, before) is False
+
+
+def test_every_checkout_is_checked_back_in(tmp_path):
+    nc = cache(tmp_path)
+
+    a, a_before = nc.checkout("w1")
+    b, b_before = nc.checkout("w2")
+    assert a != b and read(a) == read(b) == b"seed"
+
+    with open(b, "wb") as f:
+        f.write(b"refreshed by w2")
+
+    assert nc.checkin(a, a_before) is False
+    assert nc.checkin(b, b_before) is True
+
+    assert read(nc.master) == b"refreshed by w2"
+    assert sorted(os.listdir(nc.work_dir)) == ["master.dat"]
+    st = nc.stats()
+    assert st["snapshots"] == st["merges"] + st["unchanged"] == 2
+
+
+def test_empty_snapshot_never_replaces_the_master(tmp_path):
+    nc = cache(tmp_path)
+    path, before = nc.checkout("w1")
+    open(path, "wb").close()
+
+    assert nc.checkin(path, before) is False
+    assert read(nc.master) == b"seed"
+
+
+def test_sweep_removes_only_stale_run_snapshots(tmp_path):
+    nc = cache(tmp_path)
+    stale, _ = nc.checkout("dead-host-1-w1")
+    live, _ = nc.checkout("w2")
+    old = time.time() - 3600
+    os.utime(stale, (old, old))
+    os.utime(nc.master, (old, old))
+
+    assert nc.sweep(max_age=600) == 1
+    assert sorted(os.listdir(nc.work_dir)) == ["master.dat", "run-w2.dat"]
+    assert os.path.exists(live)
+    assert nc.stats()["swept"] == 1
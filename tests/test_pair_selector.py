@@ -0,0 +1,85 @@
+import random
+
+import pytest
+
+from models import Pair
+from pair_selector import PairSelector
+
+
+@pytest.fixture
+def pairs(make_channel):
+    def make(n_src, n_tgt):
+        return [Pair(make_channel(s), make_channel(100 + t)) for s in range(n_src) for t in range(n_tgt)]
+    return make
+
+
+def test_rank_prefers_successful_pairs(clock, pairs):
+    sel = PairSelector("ucb", rnd=random.Random(1), clock=clock)
+    for _ in range(20):
+        sel.record("2", "103", True, 30, 50_000)
+        sel.record("0", "100", False, 300)
+
+    ranked = sel.rank(pairs(4, 5))
+    assert (ranked[0].source.chan_id, ranked[0].target.chan_id) == ("2", "103")
+    assert len(ranked) == 20
+
+
+def test_rank_keeps_last_pairs_at_the_end(clock, pairs):
+    sel = PairSelector("thompson", rnd=random.Random(1), clock=clock)
+    ranked = sel.rank(pairs(3, 3), last=lambda p: p.target.chan_id == "100")
+
+    assert [p.target.chan_id for p in ranked[-3:]] == ["100"] * 3
+    assert all(p.target.chan_id != "100" for p in ranked[:-3])
+
+
+def test_rank_limit_bounds_output_and_keeps_best(clock, pairs):
+    sel = PairSelector("ucb", rnd=random.Random(1), clock=clock)
+    for _ in range(20):
+        sel.record("7", "109", True, 10, 50_000)
+
+    walk = iter(pairs(10, 10))  # gerador: nada materializado pelo chamador
+    ranked = sel.rank(walk, limit=5)
+    assert len(ranked) == 5
+    assert (ranked[0].source.chan_id, ranked[0].target.chan_id) == ("7", "109")
+
+
+def test_rank_limit_fills_with_tail(clock, pairs):
+    sel = PairSelector("ucb", rnd=random.Random(1), clock=clock)
+    ranked = sel.rank(pairs(2, 2), last=lambda p: p.target.chan_id == "101", limit=3)
+
+    assert len(ranked) == 3
+    assert [p.target.chan_id for p in ranked[:2]] == ["100", "100"]
+    assert ranked[2].target.chan_id == "101"
+
+
+def test_evidence_decays(clock):
+    sel = PairSelector("ucb", half_life=3600, clock=clock)
+    sel.record("a", "b", True, 10, 1000)
+    clock.now += 3600
+
+    row = sel.summary()["top"][0]
+    assert row["runs"] == pytest.approx(0.5)
+
+
+def test_save_load_round_trip(tmp_path, clock):
+    sel = PairSelector(clock=clock)
+    sel.record("a", "b", True, 12.5, 20_000)
+    sel.record("a", "c", False, 300)
+    sel.record("d", "b", True, 40, 10_000)
+    path = str(tmp_path / "sel.gz")
+
+    sel.save(path)
+    assert not sel.dirty
+
+    other = PairSelector(clock=clock)
+    assert other.load(path)
+    assert len(other) == 3
+    assert other.summary() == sel.summary()
+    assert other._global == sel._global
+
+
+def test_load_rejects_garbage(tmp_path):
+    path = tmp_path / "sel.gz"
+    path.write_bytes(b"not gzip")
+    assert not PairSelector().load(str(path))
+    assert not PairSelector().load(str(tmp_path / "absent.gz"))
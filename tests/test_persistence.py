@@ -0,0 +1,52 @@
+import pytest
+
+from latency import LatencyHistograms
+from pair_selector import PairSelector
+from velocity import ForwardVelocity
+
+NOW = 1_700_000_000.0
+
+
+def selector():
+    sel = PairSelector(clock=lambda: NOW)
+    sel.record("a", "b", True, 10, 1000)
+    return sel
+
+
+def latency():
+    h = LatencyHistograms(clock=lambda: NOW)
+    h.record("s", "t", 42)
+    return h
+
+
+def velocity():
+    v = ForwardVelocity(clock=lambda: NOW)
+    v.ingest([{"id": 1, "chan_id_out": "a", "amt_out_msat": 1_000_000,
+               "forward_date": "2023-11-14T22:13:20Z"}])
+    return v
+
+
+# stores salvos pelo flush periódico: save que falha deixa dirty para a próxima tentativa
+STORES = [
+    pytest.param(selector, "sel.gz", id="pair_selector"),
+    pytest.param(latency, "latency.json", id="latency"),
+    pytest.param(velocity, "velocity.json", id="velocity"),
+]
+
+
+@pytest.mark.parametrize("make, name", STORES)
+def test_failed_save_keeps_dirty(tmp_path, make, name):
+    store = make()
+    assert store.dirty
+    path = tmp_path / "missing" / name
+
+    with pytest.raises(OSError):
+        store.save(str(path))
+    assert store.dirty
+
+    path.parent.mkdir()
+    store.save(str(path))
+    assert not store.dirty
+
+    other = type(store)(clock=lambda: NOW)
+    assert other.load(str(path))
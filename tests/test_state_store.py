@@ -0,0 +1,72 @@
+import json
+
+import pytest
+
+from state_store import StateStore
+
+
+def test_flush_writes_only_when_something_changed(tmp_path):
+    path = tmp_path / "state.json"
+    store = StateStore(str(path))
+    assert not store.dirty and store.flush() is False and not path.exists()
+
+    store.set("ladder", {"amount": 50_000})
+    store.set("cursor", 7)
+    assert store.dirty
+    assert store.flush() is True
+    assert store.flush() is False
+
+    # mesmo valor não suja a store; None remove a chave
+    store.set("cursor", 7)
+    assert not store.dirty
+    store.set("missing", None)
+    assert not store.dirty
+    store.set("cursor", None)
+    assert store.flush() is True
+
+    assert json.loads(path.read_text()) == {"ladder": {"amount": 50_000}}
+
+
+def test_changes_between_flushes_coalesce_into_one_snapshot(tmp_path):
+    path = tmp_path / "state.json"
+    store = StateStore(str(path))
+    for i in range(100):
+        store.update("runs", lambda n: n + 1, default=0)
+    store.set("last", "w3")
+
+    assert store.flush() is True
+    assert json.loads(path.read_text()) == {"runs": 100, "last": "w3"}
+    assert StateStore(str(path)).get("runs") == 100
+
+
+def test_failed_flush_keeps_the_store_dirty(tmp_path):
+    store = StateStore(str(tmp_path / "missing" / "state.json"))
+    store.set("cursor", 1)
+
+    with pytest.raises(OSError):
+        store.flush()
+    assert store.dirty
+
+    (tmp_path / "missing").mkdir()
+    assert store.flush() is True
+    assert not store.dirty
+
+
+def test_values_are_copied_in_and_out(tmp_path):
+    store = StateStore(str(tmp_path / "state.json"))
+    value = {"dates": ["2026-10-01"]}
+    store.set("report", value)
+    value["dates"].append("2026-10-02")
+    store.get("report")["dates"].append("2026-10-03")
+
+    assert store.get("report") == {"dates": ["2026-10-01"]}
+
+
+def test_legacy_files_are_imported_once(tmp_path):
+    path = tmp_path / "state.json"
+    store = StateStore(str(path), legacy={"amount": lambda: 30_000, "cursor": lambda: None})
+    assert store.imported == ["amount"] and store.dirty
+    store.flush()
+
+    again = StateStore(str(path), legacy={"amount": lambda: 1})
+    assert again.imported == [] and again.get("amount") == 30_000
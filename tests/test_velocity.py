@@ -0,0 +1,60 @@
+from datetime import datetime, timezone
+
+import pytest
+
+from velocity import ForwardVelocity, parse_forward
+
+NOW = 1_700_000_000.0
+
+
+def fw(fw_id, chan_out, sats, hours_ago=0.0):
+    ts = datetime.fromtimestamp(NOW - hours_ago * 3600, tz=timezone.utc)
+    return {"id": fw_id, "chan_id_out": chan_out, "amt_out_msat": sats * 1000,
+            "forward_date": ts.isoformat().replace("+00:00", "Z")}
+
+
+def index():
+    return ForwardVelocity(clock=lambda: NOW)
+
+
+def test_parse_forward():
+    assert parse_forward(fw(7, "123", 5000)) == (7, NOW, "123", 5000)
+    assert parse_forward({"id": 1, "chan_id_out": "1"}) is None
+    assert parse_forward({"id": "x"}) is None
+
+
+def test_rates_per_window():
+    v = index()
+    v.ingest([fw(1, "a", 24_000, hours_ago=0), fw(2, "a", 48_000, hours_ago=30), fw(3, "b", 6000, hours_ago=1)])
+
+    assert v.rates(24) == {"a": 1000, "b": 250}
+    assert v.rates(168)["a"] == pytest.approx(72_000 / 168)
+
+
+def test_ingest_skips_seen_ids():
+    v = index()
+    assert v.ingest([fw(2, "a", 1000), fw(1, "a", 1000)]) == 2
+    assert v.ingest([fw(3, "a", 1000), fw(2, "a", 1000)]) == 1
+    assert v.last_id == 3
+
+
+def test_wants_more_stops_at_last_id_or_horizon():
+    v = index()
+    v.ingest([fw(5, "a", 1000)])
+
+    assert v.wants_more([fw(7, "a", 1), fw(6, "a", 1)])
+    assert not v.wants_more([fw(6, "a", 1), fw(5, "a", 1)])
+    assert not index().wants_more([fw(1, "a", 1, hours_ago=200)])
+
+
+def test_save_load_round_trip(tmp_path):
+    path = str(tmp_path / "velocity.json")
+    v = index()
+    v.ingest([fw(1, "a", 24_000), fw(2, "b", 2400, hours_ago=3)])
+    v.save(path)
+    assert not v.dirty
+
+    other = index()
+    assert other.load(path)
+    assert other.rates(24) == v.rates(24)
+    assert other.last_id == 2
@@ -0,0 +1,209 @@
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from checkpoint import atomic_write_json, read_json
+
+# =========================
+# FORWARD VELOCITY INDEX
+# =========================
+
+# janelas (horas) reportadas; a maior define o que o índice guarda
+WINDOWS = (6, 24, 168)
+MAX_HOURS = max(WINDOWS)
+FORMAT_VERSION = 1
+
+
+def parse_forward(fw: Dict[str, Any]) -> Optional[Tuple[int, float, str, int]]:
+    """
+    (id, unix ts, chan_id_out, sats out) from an LNDg /api/forwards/
+    record, or None when it lacks one of them
+    """
+    try:
+        fw_id = int(fw["id"])
+        chan_out = fw.get("chan_id_out")
+        raw_ts = fw.get("forward_date")
+        if not chan_out or not raw_ts:
+            return None
+
+        dt = datetime.fromisoformat(raw_ts.replace("Z", "+00:00"))
+        if dt.tzinfo is None:
+            dt = dt.replace(tzinfo=timezone.utc)
+
+        return fw_id, dt.timestamp(), str(chan_out), int(fw.get("amt_out_msat") or 0) // 1000
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+class ForwardVelocity:
+    """
+    Outbound forwarding volume per channel, in hourly buckets covering
+    the last MAX_HOURS.
+
+    Fed incrementally: `ingest` takes LNDg forwards (any order) and
+    keeps only those above the highest id already seen, so a poll only
+    has to read pages until it reaches that id (see `wants_more`).
+    `rates(window)` is sats/hour over the last `window` hours: the
+    channels that drain fastest.
+    """
+
+    def __init__(self, clock: Callable[[], float] = time.time):
+        self.clock = clock
+
+        self._lock = threading.Lock()
+        self._buckets: Dict[str, Dict[int, int]] = {}  # canal → {hora: sats}
+        self.last_id: Optional[int] = None
+        self.ingested = 0
+        self.last_poll_at = None
+        self.dirty = False
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._buckets)
+
+    def _horizon(self, now: float) -> int:
+        return int(now // 3600) - MAX_HOURS
+
+    # ------------------------------------------------------------
+    # UPDATES
+    # ------------------------------------------------------------
+
+    def wants_more(self, rows: Iterable[Dict[str, Any]]) -> bool:
+        """
+        Whether a poll reading newest first should fetch the page after
+        `rows`: false once it reaches the last ingested id or forwards
+        older than the index keeps
+        """
+        oldest = self._horizon(self.clock()) * 3600
+        for fw in rows:
+            parsed = parse_forward(fw)
+            if parsed is None:
+                continue
+            if self.last_id is not None and parsed[0] <= self.last_id:
+                return False
+            if parsed[1] < oldest:
+                return False
+        return True
+
+    def ingest(self, rows: Iterable[Dict[str, Any]]) -> int:
+        """
+        Add forwards newer than `last_id`. Returns how many were added.
+        """
+        now = self.clock()
+        horizon = self._horizon(now)
+        added = 0
+
+        with self._lock:
+            last_id = self.last_id
+            top = last_id
+            for fw in rows:
+                parsed = parse_forward(fw)
+                if parsed is None:
+                    continue
+                fw_id, ts, chan_out, sats = parsed
+                top = fw_id if top is None else max(top, fw_id)
+                if last_id is not None and fw_id <= last_id:
+                    continue
+                hour = int(ts // 3600)
+                if hour <= horizon or sats <= 0:
+                    continue
+                b = self._buckets.setdefault(chan_out, {})
+                b[hour] = b.get(hour, 0) + sats
+                added += 1
+
+            self.last_id = top
+            self.ingested += added
+            self.last_poll_at = now
+            self._prune(horizon)
+            self.dirty = True
+        return added
+
+    def _prune(self, horizon: int) -> None:
+        for chan_id in list(self._buckets):
+            b = self._buckets[chan_id]
+            for hour in [h for h in b if h <= horizon]:
+                del b[hour]
+            if not b:
+                del self._buckets[chan_id]
+
+    # ------------------------------------------------------------
+    # QUERIES
+    # ------------------------------------------------------------
+
+    def rates(self, window_hours: float = 24) -> Dict[str, float]:
+        """
+        chan_id → outbound sats/hour over the last `window_hours` (the
+        current hour counts as one of them)
+        """
+        window = max(1, min(int(window_hours), MAX_HOURS))
+        first = int(self.clock() // 3600) - window + 1
+
+        with self._lock:
+            out = {}
+            for chan_id, b in self._buckets.items():
+                sats = sum(v for h, v in b.items() if h >= first)
+                if sats:
+                    out[chan_id] = sats / window
+            return out
+
+    def stats(self, top: int = 5) -> Dict[str, Any]:
+        per_window = {w: self.rates(w) for w in WINDOWS}
+        ranked = sorted(per_window[24].items(), key=lambda kv: kv[1], reverse=True)[:top]
+
+        with self._lock:
+            return {
+                "channels": len(self._buckets),
+                "last_id": self.last_id,
+                "ingested": self.ingested,
+                "last_poll_at": self.last_poll_at,
+                "top": [
+                    {"chan_id": chan_id,
+                     **{f"sats_h_{w}h": round(per_window[w].get(chan_id, 0.0)) for w in WINDOWS}}
+                    for chan_id, _ in ranked
+                ],
+            }
+
+    # ------------------------------------------------------------
+    # PERSISTENCE
+    # ------------------------------------------------------------
+
+    def save(self, path: str) -> None:
+        with self._lock:
+            self._prune(self._horizon(self.clock()))
+            rows: List[list] = [
+                [chan_id, {str(h): v for h, v in b.items()}]
+                for chan_id, b in self._buckets.items()
+            ]
+            last_id = self.last_id
+            self.dirty = False
+
+        try:
+            atomic_write_json(path, {
+                "version": FORMAT_VERSION,
+                "max_hours": MAX_HOURS,
+                "last_id": last_id,
+                "rows": rows,
+            })
+        except Exception:
+            # não salvou → próximo flush tenta de novo
+            with self._lock:
+                self.dirty = True
+            raise
+
+    def load(self, path: str) -> bool:
+        data = read_json(path)
+        if (not isinstance(data, dict) or data.get("version") != FORMAT_VERSION or
+                data.get("max_hours") != MAX_HOURS):
+            return False
+
+        buckets = {}
+        for chan_id, b in data.get("rows") or []:
+            buckets[str(chan_id)] = {int(h): int(v) for h, v in b.items()}
+
+        with self._lock:
+            self._buckets = buckets
+            self.last_id = data.get("last_id")
+            self._prune(self._horizon(self.clock()))
+            self.dirty = False
+        return True